@@ -32,26 +32,30 @@ def add_game_manual(request):
 def sync_games(request):
     """API endpoint to sync game stats from API to the blockchain."""
     try:
-        # Fetch game stats from API
-        response = requests.get('http://localhost:8000/api/gamestats/')
-        response.raise_for_status()
-        games = response.json()
-
         private_key = env('ETH_PRIVATE_KEY')
         if not private_key:
             raise ValueError("ETH_PRIVATE_KEY not set in environment")
 
-        # Process each game
+        # Fetch game stats from API page by page, only the fields needed here
+        url = ('http://localhost:8000/api/gamestats/?limit=100'
+               '&fields=player1,player1_username,player2_username,winner,created_at')
         tx_hashes = []
-        for game in games:
-            # Map winner ID to username
-            winner_tournament_name = (
-                game['player1_username'] if game['winner'] == game['player1']
-                else game['player2_username']
-            )
-            # Add game to blockchain
-            result = add_game(winner_tournament_name, game['created_at'], private_key)
-            tx_hashes.append(result.transactionHash.hex())
+        while url:
+            response = requests.get(url)
+            response.raise_for_status()
+            page = response.json()
+
+            # Process each game
+            for game in page['results']:
+                # Map winner ID to username
+                winner_tournament_name = (
+                    game['player1_username'] if game['winner'] == game['player1']
+                    else game['player2_username']
+                )
+                # Add game to blockchain
+                result = add_game(winner_tournament_name, game['created_at'], private_key)
+                tx_hashes.append(result.transactionHash.hex())
+            url = page['next']
 
         return Response({
             'status': 'success',
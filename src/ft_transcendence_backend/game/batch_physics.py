@@ -0,0 +1,184 @@
+import logging
+from models.game import PongGame
+
+try:
+    import numpy as np
+except ImportError:  # optional: ohne NumPy bleibt es bei der skalaren Physik
+    np = None
+
+logger = logging.getLogger('game')
+
+
+class BatchPhysicsEngine:
+    """
+    Vektorisierte Physik für viele PongGame-Instanzen.
+
+    Ball-Position, -Richtung, -Geschwindigkeit, Paddle-Positionen und -Höhen aller
+    registrierten Spiele liegen dauerhaft in NumPy-Arrays (ein Slot pro Spiel).
+    game.ball_pos und game.ball_direction sind Views auf die Zeile des Spiels, ein
+    Tick rechnet und schreibt also direkt in den Arrays, ohne Kopieren pro Spiel.
+    Abgeglichen wird nur bei add/remove, Paddle-Bewegung (move_paddle), Start und
+    den seltenen Ereignissen (Paddle-Treffer, Punkt), die pro Spiel über dieselben
+    PongGame-Methoden wie in der skalaren Physik laufen, damit die Ergebnisse
+    bitgenau übereinstimmen.
+    """
+
+    def __init__(self, capacity: int = 64):
+        if np is None:
+            raise RuntimeError("BatchPhysicsEngine requires numpy")
+        self.games = []       # slot -> PongGame
+        self.slots = {}       # PongGame -> slot
+        self.capacity = 0
+        self.allocate(capacity)
+
+    def allocate(self, capacity: int):
+        """(Neu-)Anlegen der Arrays; bestehende Slots werden übernommen und die Views neu gebunden"""
+        count = len(self.games)
+        arrays = {
+            "pos": np.zeros((capacity, 2)),
+            "direction": np.zeros((capacity, 2)),
+            "speed": np.zeros(capacity),
+            "paddle1": np.zeros(capacity),
+            "paddle2": np.zeros(capacity),
+            "height": np.zeros(capacity),
+            "active": np.zeros(capacity, dtype=bool),
+            "recording": np.zeros(capacity, dtype=bool),
+        }
+        for name, array in arrays.items():
+            if self.capacity:
+                array[:count] = getattr(self, name)[:count]
+            setattr(self, name, array)
+        self.capacity = capacity
+        for slot, game in enumerate(self.games):
+            self.bind(game, slot)
+
+    def bind(self, game: PongGame, slot: int):
+        game.ball_pos = self.pos[slot]
+        game.ball_direction = self.direction[slot]
+
+    def add(self, game: PongGame):
+        if game in self.slots:
+            return
+        if len(self.games) == self.capacity:
+            self.allocate(self.capacity * 2)
+        self.slots[game] = len(self.games)
+        self.games.append(game)
+        game.physics = self
+        self.sync(game)
+
+    def remove(self, game: PongGame):
+        slot = self.slots.pop(game, None)
+        if slot is None:
+            return
+        # Das Spiel behält seinen Zustand als normale Listen
+        game.ball_pos = self.pos[slot].tolist()
+        game.ball_direction = self.direction[slot].tolist()
+        game.physics = None
+
+        last = len(self.games) - 1
+        moved = self.games.pop()
+        if slot != last:
+            # Letzten Slot in die Lücke ziehen, damit die Arrays dicht bleiben
+            for array in (self.pos, self.direction, self.speed, self.paddle1, self.paddle2,
+                          self.height, self.active, self.recording):
+                array[slot] = array[last]
+            self.games[slot] = moved
+            self.slots[moved] = slot
+            self.bind(moved, slot)
+
+    def sync(self, game: PongGame):
+        """Übernimmt den kompletten Zustand eines Spiels in seinen Slot"""
+        slot = self.slots[game]
+        self.pos[slot] = game.ball_pos
+        self.direction[slot] = game.ball_direction
+        self.speed[slot] = game.ball_speed
+        self.paddle1[slot] = game.player1.paddle_pos
+        self.paddle2[slot] = game.player2.paddle_pos
+        self.height[slot] = game.PADDLE_HEIGHT
+        self.active[slot] = game.game_active
+        self.recording[slot] = game.recorder is not None
+        self.bind(game, slot)
+
+    def paddle_moved(self, game: PongGame, player):
+        paddles = self.paddle1 if player is game.player1 else self.paddle2
+        paddles[self.slots[game]] = player.paddle_pos
+
+    def step(self, dt: float = None) -> dict:
+        """
+        Ein Tick für alle laufenden registrierten Spiele (entspricht update_game_state(dt) je Spiel).
+        Gibt die Spiele mit Ereignissen zurück: {"hit": [...], "score": [...], "win": [...]}
+        """
+        events = {"hit": [], "score": [], "win": []}
+        slots = np.flatnonzero(self.active[:len(self.games)])
+        if not slots.size:
+            return events
+
+        x, y = self.pos[slots, 0], self.pos[slots, 1]
+        dx, dy = self.direction[slots, 0], self.direction[slots, 1]
+        paddle1, paddle2, height = self.paddle1[slots], self.paddle2[slots], self.height[slots]
+
+        first = self.games[slots[0]]
+        paddle_x = first.PADDLE_X
+
+        steps = 1.0 if dt is None else dt / first.REFERENCE_TICK
+        scaled_speed = self.speed[slots] * first.BALL_SPEED_SCALE * steps
+        next_x = x + dx * scaled_speed
+        next_y = y + dy * scaled_speed
+        unclamped_y = next_y
+
+        # Wand-Kollisionen
+        wall = np.abs(next_y) >= 1.0
+        next_y = np.where(wall, np.clip(next_y, -1.0, 1.0), next_y)
+        self.direction[slots[wall], 1] *= -1
+
+        # Swept-Test gegen die Paddle-Ebenen (gleiche Rechnung wie PongGame.sweep_y)
+        left = (next_x <= -paddle_x) & (-paddle_x < x)
+        right = ~left & (next_x >= paddle_x) & (paddle_x > x)
+        plane = np.where(left, -paddle_x, paddle_x)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = (plane - x) / (next_x - x)
+        hit_y = y + (unclamped_y - y) * t
+        hit_y = np.where(hit_y > 1.0, 2.0 - hit_y, np.where(hit_y < -1.0, -2.0 - hit_y, hit_y))
+
+        # Paddle-Kollisionen (gleiche Grenzen wie check_paddle_collision)
+        half = height / 2
+        hit_left = left & (hit_y >= paddle1 - half) & (hit_y <= paddle1 + half)
+        hit_right = right & (hit_y >= paddle2 - half) & (hit_y <= paddle2 + half)
+        hit = hit_left | hit_right
+
+        # Tore
+        goal_left = ~hit & (next_x < -1.0)
+        goal_right = ~hit & (next_x > 1.0)
+        goal = goal_left | goal_right
+
+        changed = []
+        for i in np.flatnonzero(hit):
+            game = self.games[slots[i]]
+            player = game.player1 if hit_left[i] else game.player2
+            next_x[i] = game.paddle_bounce(player, float(hit_y[i]))
+            next_y[i] = hit_y[i]
+            events["hit"].append(game)
+            changed.append(game)
+
+        for i in np.flatnonzero(goal):
+            game = self.games[slots[i]]
+            game.score_point(game.player2 if goal_left[i] else game.player1)
+            events["score"].append(game)
+            changed.append(game)
+            if not game.game_active:
+                events["win"].append(game)
+
+        moved = ~goal
+        self.pos[slots[moved], 0] = next_x[moved]
+        self.pos[slots[moved], 1] = next_y[moved]
+
+        # Neue Richtung/Geschwindigkeit bzw. zurückgesetzter Ball dieser Spiele
+        for game in changed:
+            self.sync(game)
+
+        moved_slots = slots[moved]
+        for slot in moved_slots[self.recording[moved_slots]]:
+            game = self.games[slot]
+            game.recorder.record(game)
+
+        return events
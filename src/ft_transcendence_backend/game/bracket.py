@@ -0,0 +1,138 @@
+import math
+import random
+from matchmaker import DEFAULT_RATING, parse_rating
+
+
+def seed_order(size: int) -> list:
+    """
+    Setzliste für ein KO-Feld der Größe 2^k (0-basiert), z.B. 8 -> [0, 7, 3, 4, 1, 6, 2, 5].
+    Benachbarte Paare spielen in Runde 1 gegeneinander; Platz 1 und 2 treffen frühestens im Finale aufeinander.
+    """
+    order = [0]
+    while len(order) < size:
+        mirror = len(order) * 2 - 1
+        order = [seed for s in order for seed in (s, mirror - s)]
+    return order
+
+
+def entry_rating(entry) -> float:
+    profile = getattr(entry["player"], "user_profile", None) or {}
+    return parse_rating(profile.get("rating")) if isinstance(profile, dict) else DEFAULT_RATING
+
+
+class BracketMatch:
+    """Ein Match; im KO-Baum kommen die Spieler aus den beiden Zubringer-Matches der Vorrunde"""
+
+    __slots__ = ("round", "slot", "players", "winner", "loser", "started")
+
+    def __init__(self, round: int, slot: int):
+        self.round = round
+        self.slot = slot
+        self.players = [None, None]  # player_entries, sobald die Zubringer entschieden sind
+        self.winner = None
+        self.loser = None
+        self.started = False
+
+    @property
+    def match_id(self) -> str:
+        return f"{self.round}-{self.slot}"
+
+    @property
+    def feeders(self):
+        """(Runde, Slot) der beiden Zubringer-Matches, in Runde 1 keine"""
+        if self.round == 1:
+            return ()
+        return ((self.round - 1, self.slot * 2), (self.round - 1, self.slot * 2 + 1))
+
+    def is_ready(self) -> bool:
+        return not self.started and self.winner is None and None not in self.players
+
+
+class Bracket:
+    """
+    KO-Baum für beliebig viele Spieler.
+
+    Die Spieler werden nach Rating gesetzt (gleiche Ratings zufällig) und auf ein
+    Feld der nächsten Zweierpotenz verteilt; fehlende Plätze sind Freilose für die
+    besten Setzplätze. Jedes Match hängt nur von seinen zwei Zubringer-Matches ab:
+    sobald beide entschieden sind, ist es bereit und kann sofort starten, ohne dass
+    der Rest der Runde fertig sein muss.
+    """
+
+    eliminates = True  # Verlierer scheiden aus
+    standings = None
+
+    def __init__(self, entries, rng: random.Random = None, seeded: bool = False):
+        rng = rng or random.Random()
+        self.entries = entries
+        # seeded=True: entries sind schon in Setzreihenfolge (z.B. beim Wiederherstellen)
+        self.seeds = list(entries) if seeded else sorted(entries, key=lambda entry: (-entry_rating(entry), rng.random()))
+        self.size = 1 << max(1, math.ceil(math.log2(max(2, len(entries)))))
+        self.total_rounds = int(math.log2(self.size))
+        self.matches = {}      # (Runde, Slot) -> BracketMatch
+        self.ready = {}        # (Runde, Slot) -> BracketMatch, startbereit (Einfügereihenfolge)
+        self.byes = []         # player_entries mit Freilos in Runde 1
+        self.champion = None
+
+        for round in range(1, self.total_rounds + 1):
+            for slot in range(self.size >> round):
+                self.matches[(round, slot)] = BracketMatch(round, slot)
+
+        order = seed_order(self.size)
+        for slot in range(self.size // 2):
+            match = self.matches[(1, slot)]
+            match.players = [self.seed(order[2 * slot]), self.seed(order[2 * slot + 1])]
+            if match.players[1] is None:
+                # Freilos: der gesetzte Spieler rückt kampflos vor
+                self.byes.append(match.players[0])
+                match.winner = match.players[0]
+                self.advance(match)
+            else:
+                self.ready[(1, slot)] = match
+
+    def seed(self, index: int):
+        return self.seeds[index] if index < len(self.seeds) else None
+
+    @property
+    def final(self) -> BracketMatch:
+        return self.matches[(self.total_rounds, 0)]
+
+    def parent(self, match: BracketMatch):
+        return self.matches.get((match.round + 1, match.slot // 2))
+
+    def advance(self, match: BracketMatch):
+        """Trägt den Sieger ins Folgematch ein; ist es damit vollständig, wird es startbereit"""
+        parent = self.parent(match)
+        if parent is None:
+            self.champion = match.winner
+            return None
+        parent.players[match.slot % 2] = match.winner
+        if parent.is_ready():
+            self.ready[(parent.round, parent.slot)] = parent
+            return parent
+        return None
+
+    def start_ready(self) -> list:
+        """Startet alle bereiten Matches und gibt sie zurück"""
+        started = list(self.ready.values())
+        self.ready.clear()
+        for match in started:
+            match.started = True
+        return started
+
+    def record(self, match: BracketMatch, winner_entry) -> list:
+        """Ergebnis eintragen; gibt die dadurch startbereiten Matches zurück (hier höchstens das Folgematch)"""
+        match.winner = winner_entry
+        match.loser = match.players[1] if match.players[0] is winner_entry else match.players[0]
+        parent = self.advance(match)
+        return [parent] if parent else []
+
+    def placements(self) -> list:
+        """Turniernamen nach Platzierung, soweit entschieden (Sieger, Finalverlierer)"""
+        if self.champion is None:
+            return []
+        final = self.final
+        names = [self.champion["player"].name]
+        if final.loser:
+            names.append(final.loser["player"].name)
+        return names
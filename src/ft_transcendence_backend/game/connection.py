@@ -0,0 +1,125 @@
+import asyncio
+import time
+import logging
+from collections import deque
+from fastapi import WebSocket
+from protocol import PROTOCOL_BINARY
+from metrics import SEND_LATENCY, FRAMES_DROPPED
+
+logger = logging.getLogger('game')
+
+
+class GameConnection:
+    """
+    Sendeseite einer /ws/game-Verbindung.
+
+    Der Tick legt bereits kodierte Frames nur in eine kleine, begrenzte Queue.
+    Ein eigener Writer-Task pro Verbindung sendet sie. Ist die Queue voll, wird
+    der älteste Frame verworfen (latest wins), damit ein langsamer Client den
+    Tick der anderen Spieler nicht aufhält.
+    """
+
+    def __init__(self, websocket: WebSocket, protocol: str, mode: str = "local", max_queue: int = 2):
+        self.websocket = websocket
+        self.protocol = protocol
+        self.mode = mode                  # Label für Metriken (local/ai/online/tournament)
+        self.role = None                  # player1/player2/both, vom GameServer vergeben (None = Zuschauer)
+        self.queue = deque()
+        self.max_queue = max_queue
+        self.wakeup = asyncio.Event()
+        self.writer_task = None
+        self.closed = False
+
+        # Binär-Clients brauchen zuerst Keyframe + Vollbild, ebenso nach verworfenen Deltas
+        self.needs_full_frame = protocol == PROTOCOL_BINARY
+        self.last_keyframe = None
+
+        # Statistiken
+        self.sent_frames = 0
+        self.dropped_frames = 0
+        self.max_depth = 0
+        self.last_send_latency = 0.0
+
+    @property
+    def is_binary(self) -> bool:
+        return self.protocol == PROTOCOL_BINARY
+
+    @property
+    def depth(self) -> int:
+        return len(self.queue)
+
+    def start(self):
+        if self.writer_task is None:
+            self.writer_task = asyncio.create_task(self.run_writer())
+
+    def close(self):
+        self.closed = True
+        self.queue.clear()
+        if self.writer_task is not None:
+            self.writer_task.cancel()
+            self.writer_task = None
+
+    def enqueue(self, frame):
+        """
+        frame ist entweder ein fertiger JSON-String oder für Binär-Clients ein
+        Tupel (keyframe oder None, delta, full) aus StateEncoder.encode().
+        Blockiert nie.
+        """
+        if self.closed:
+            return
+        if self.is_binary and frame[0]:
+            self.last_keyframe = frame[0]
+        if len(self.queue) >= self.max_queue:
+            self.queue.popleft()
+            self.dropped_frames += 1
+            FRAMES_DROPPED.labels(self.mode).inc()
+            if self.is_binary:
+                # Verworfenes Delta: der nächste Frame muss vollständig sein
+                self.needs_full_frame = True
+        self.queue.append(frame)
+        self.max_depth = max(self.max_depth, len(self.queue))
+        self.wakeup.set()
+
+    async def run_writer(self):
+        try:
+            while not self.closed:
+                await self.wakeup.wait()
+                self.wakeup.clear()
+                while self.queue:
+                    frame = self.queue.popleft()
+                    start = time.perf_counter()
+                    if self.is_binary:
+                        await self.send_binary(frame)
+                    else:
+                        await self.websocket.send_text(frame)
+                    self.last_send_latency = time.perf_counter() - start
+                    SEND_LATENCY.labels(self.mode).observe(self.last_send_latency)
+                    self.sent_frames += 1
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"Error sending game state: {e}")
+            self.closed = True
+            self.queue.clear()
+
+    async def send_binary(self, frame):
+        keyframe, delta, full = frame
+        if self.needs_full_frame:
+            self.needs_full_frame = False
+            if self.last_keyframe:
+                await self.websocket.send_text(self.last_keyframe)
+            await self.websocket.send_bytes(full)
+            return
+        if keyframe:
+            await self.websocket.send_text(keyframe)
+        await self.websocket.send_bytes(delta)
+
+    def get_stats(self) -> dict:
+        return {
+            "protocol": self.protocol,
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "sent_frames": self.sent_frames,
+            "dropped_frames": self.dropped_frames,
+            "last_send_latency": self.last_send_latency,
+        }
@@ -0,0 +1,102 @@
+import asyncio
+import json
+import os
+import socket
+import logging
+
+logger = logging.getLogger('game')
+
+# Mehrere Game-Worker teilen sich über Redis ein Spielverzeichnis und die Matchmaking-Queue.
+# Ohne GAME_CLUSTER_ENABLED=1 läuft alles wie bisher im Prozessspeicher eines Workers.
+CLUSTER_ENABLED = os.environ.get("GAME_CLUSTER_ENABLED") == "1"
+WORKER_ID = os.environ.get("GAME_WORKER_ID") or f"{socket.gethostname()}-{os.getpid()}"
+# Öffentliche Basis-URL dieses Workers für Websockets, z.B. "wss://pong.example/w1", "ws://host:8002"
+# oder ein Pfad hinter dem Reverse Proxy der Seite ("/game-2", siehe Caddyfile)
+WORKER_URL = os.environ.get("GAME_WORKER_URL", "")
+
+KEY_PREFIX = "game:"
+GAME_TTL = 3600            # Verzeichniseinträge verfallen, falls ein Worker nicht mehr aufräumt
+WORKER_TTL = 15            # Worker gilt als tot, wenn der Heartbeat so lange ausbleibt
+HEARTBEAT_INTERVAL = 5
+
+
+def create_redis():
+    """Async-Redis-Client für den bestehenden Redis-Container (REDIS_HOST/REDIS_PORT)"""
+    import redis.asyncio as aioredis
+    return aioredis.Redis(
+        host=os.environ.get("REDIS_HOST", "redis"),
+        port=int(os.environ.get("REDIS_PORT", 6379)),
+        decode_responses=True,
+    )
+
+
+class GameDirectory:
+    """
+    Redis-Verzeichnis game_id -> besitzender Worker (+ Settings).
+
+    Der Worker, der ein Spiel erstellt, trägt sich als Besitzer ein. Verbindet sich
+    ein Client mit einem anderen Worker, wird er per "redirect" an den Besitzer
+    weitergeleitet, sodass beide Spieler im selben Prozess beim selben PongGame landen.
+    """
+
+    def __init__(self, redis, worker_id: str = WORKER_ID, worker_url: str = WORKER_URL):
+        self.redis = redis
+        self.worker_id = worker_id
+        self.worker_url = worker_url
+        self.heartbeat_task = None
+
+    def game_key(self, game_id: str) -> str:
+        return f"{KEY_PREFIX}directory:{game_id}"
+
+    def worker_key(self, worker_id: str) -> str:
+        return f"{KEY_PREFIX}worker:{worker_id}"
+
+    async def register_game(self, game_id: str, settings: dict, worker_id: str = None, worker_url: str = None):
+        """Trägt ein neues Spiel ein (Standard: dieser Worker ist Besitzer)"""
+        key = self.game_key(game_id)
+        await self.redis.hset(key, mapping={
+            "worker": worker_id or self.worker_id,
+            "url": worker_url if worker_url is not None else self.worker_url,
+            "settings": json.dumps(settings),
+        })
+        await self.redis.expire(key, GAME_TTL)
+
+    async def lookup(self, game_id: str):
+        """Gibt {"worker", "url", "settings"} zurück oder None, wenn das Spiel unbekannt ist"""
+        entry = await self.redis.hgetall(self.game_key(game_id))
+        if not entry:
+            return None
+        return {
+            "worker": entry["worker"],
+            "url": entry.get("url", ""),
+            "settings": json.loads(entry.get("settings") or "{}"),
+        }
+
+    async def release_game(self, game_id: str):
+        await self.redis.delete(self.game_key(game_id))
+
+    async def heartbeat(self):
+        await self.redis.set(self.worker_key(self.worker_id), self.worker_url, ex=WORKER_TTL)
+
+    async def is_alive(self, worker_id: str) -> bool:
+        if worker_id == self.worker_id:
+            return True
+        return bool(await self.redis.exists(self.worker_key(worker_id)))
+
+    def start(self):
+        if self.heartbeat_task is None or self.heartbeat_task.done():
+            self.heartbeat_task = asyncio.create_task(self.run_heartbeat())
+        return self.heartbeat_task
+
+    def stop(self):
+        if self.heartbeat_task is not None:
+            self.heartbeat_task.cancel()
+            self.heartbeat_task = None
+
+    async def run_heartbeat(self):
+        while True:
+            try:
+                await self.heartbeat()
+            except Exception as e:
+                logger.error(f"Game directory heartbeat failed: {e}")
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
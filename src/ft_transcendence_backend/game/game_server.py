@@ -1,16 +1,35 @@
 import asyncio
+import os
+import secrets
 from fastapi import WebSocket
 import json
 from models.game import PongGame
 from models.player import Player, PlayerType, Controls
 from models.ai_player import AI
+from tick_scheduler import TickScheduler
+from protocol import StateEncoder, negotiate_protocol
+from connection import GameConnection
+from replay_recorder import ReplayRecorder, REPLAY_ENABLED
+from batch_physics import BatchPhysicsEngine
+from stats_submitter import StatsSubmitter
+from metrics import PHYSICS_STEP, SERIALIZATION, AI_DECISION, game_mode
+import time
 import logging
+from collections import OrderedDict
 from datetime import datetime
-import urllib.request
-import urllib.error
-import urllib.parse
 
 logger = logging.getLogger('game')
+
+# Settings von Spielen, die nie beigetreten werden, verfallen nach dieser Zeit (Sekunden)
+GAME_SETTINGS_TTL = 3600
+MAX_INPUT_SEQ = 2 ** 32  # seq wird im Binärprotokoll als u32 zurückgemeldet
+# Tasten, die eine Rolle steuern darf (player1: WASD, player2: Pfeile, lokal beide)
+ROLE_KEYS = {
+    "player1": ("a", "d"),
+    "player2": ("ArrowLeft", "ArrowRight"),
+    "both": ("a", "d", "ArrowLeft", "ArrowRight"),
+}
+
 # Static fields (repeated in each log call)
 DEFAULT_EXTRAS = {
     "_service": "pong_game",
@@ -27,13 +46,26 @@ class GameServer:
     def __init__(self):
         self.active_games = {}          # game_id -> PongGame
         self.game_websockets = {}       # game_id -> list of websockets
-        self.game_loops = {}            # game_id -> game loop task
         self.ai_players = {}
+        self.game_modes = {}            # game_id -> local/ai/online/tournament (Metrik-Label)
         self.game_user_profiles = {}    # game_id -> {player_role: user_profile}
         self.game_ready = {}            # game_id -> {player_role: bool}
-        self.UPDATE_RATE = 1/60         # 60 FPS
-        self.API_URL = "http://backend:8000/api/gamestats/"  # URL zum Backend-Container
-        self.stats_file = "game_stats.json"
+        self.game_settings = OrderedDict()  # game_id -> (erstellt_um, settings), vom Menü beim Erstellen hinterlegt
+        self.directory = None           # GameDirectory (Redis), wenn mehrere Worker im Cluster laufen
+        # 60 FPS; unter Last auch niedriger (z.B. 30), die Swept-Kollision bleibt korrekt
+        self.UPDATE_RATE = 1 / int(os.environ.get("GAME_TICK_RATE", 60))
+        self.pending_states = {}        # game_id -> Zustand des letzten Ticks, wird pro Frame gesendet
+        self.connections = {}           # websocket -> GameConnection (Send-Queue + Writer-Task)
+        self.game_inputs = {}           # game_id -> {player_role: {"keys": dict, "seq": int}} (gehaltene Tasten)
+        self.processed_input_seq = {}   # game_id -> {player_role: zuletzt angewendete seq}
+        self.state_encoders = {}        # game_id -> StateEncoder (nur für Binär-Clients)
+        self.failed_games = set()       # game_ids, die im Tick einen Fehler hatten und abgeräumt werden
+        self.game_seats = {}            # game_id -> {seat_token: player_role}, vom Menü bei der Rollenvergabe
+        # "batch" = vektorisierte NumPy-Physik für alle Spiele, sonst skalar pro Spiel
+        self.physics_engine = os.environ.get("GAME_PHYSICS_ENGINE", "scalar")
+        self.batch_physics = BatchPhysicsEngine() if self.physics_engine == "batch" else None
+        self.scheduler = TickScheduler(self.step_games, self.broadcast_states, tick_rate=self.UPDATE_RATE)
+        self.stats_submitter = StatsSubmitter()  # Spielergebnisse gebündelt an /api/gamestats/bulk/
         # Example usage for game startup
         logger.info(
 			"Game server starting",
@@ -54,13 +86,17 @@ class GameServer:
             ws_count = len(self.game_websockets.get(game_id, []))
             print(f"\nGame ID: {game_id}")
             print(f"Connected WebSockets: {ws_count}")
-            print(f"Game Loop Active: {game_id in self.game_loops}")
+            print(f"Scheduler Active: {self.scheduler.is_running()}")
             print(f"Game Active: {game.game_active}")
             print(f"Ready States: {self.game_ready.get(game_id)}")
             print("------------------------")
 
     async def handle_game(self, websocket: WebSocket, game_id: str, settings: dict):
         await websocket.accept()
+        connection = GameConnection(websocket, negotiate_protocol(websocket.query_params.get("protocol")),
+                                    mode=game_mode(settings))
+        self.connections[websocket] = connection
+        connection.start()
     
         
         #print(f"\n=== Game Settings ===")
@@ -69,7 +105,9 @@ class GameServer:
         
         is_ai_mode = settings.get("mode") == "ai"
         is_online_mode = settings.get("mode") == "online"
-        player_role = settings.get("player_role")  # z.B. "player1", "player2" oder "both" bei lokal
+        # Rolle kommt vom Server (Seat-Token aus dem Menü), nie aus den Nachrichten des Clients
+        player_role = self.connection_role(websocket, game_id, settings)
+        connection.role = player_role
         
         #print(f"\n=== New Game Connection ===")
         #print(f"Game ID: {game_id}")
@@ -82,7 +120,11 @@ class GameServer:
         if game_id not in self.game_ready:
             self.game_ready[game_id] = {}
         
-        if is_online_mode:
+        if game_id in self.active_games and not is_online_mode:
+            # Nach einem Neustart wiederhergestelltes Spiel: Rolle übernehmen statt neu anlegen
+            game = self.active_games[game_id]
+            self.game_websockets.setdefault(game_id, []).append(websocket)
+        elif is_online_mode:
             if game_id in self.active_games:
                 #print(f"Joining existing game {game_id}")
                 game = self.active_games[game_id]
@@ -110,7 +152,7 @@ class GameServer:
                 #print(f"Player ;;;;;1: {player1}")
                 #print(f"Player ;;;;;2: {player2}")
 
-                game = PongGame(settings, player1, player2)
+                game = self.create_game(game_id, settings, player1, player2)
                 self.active_games[game_id] = game
                 self.game_websockets[game_id] = [websocket]
                 #print("Online game created – waiting for both players to send ready signals...")
@@ -121,7 +163,7 @@ class GameServer:
                 player1 = Player(id="p1", name="Player 1", player_type=PlayerType.HUMAN, controls=Controls.WASD)
                 player2 = Player(id="p2", name="AI Player", player_type=PlayerType.AI, controls=Controls.ARROWS)
                 self.ai_players[game_id] = AI(settings.get("difficulty", "medium"))
-                game = PongGame(settings, player1, player2)
+                game = self.create_game(game_id, settings, player1, player2)
                 self.active_games[game_id] = game
                 self.game_websockets[game_id] = [websocket]
                 # Markiere den AI-Spieler automatisch als ready
@@ -132,7 +174,7 @@ class GameServer:
                 #print("Creating local game...")
                 player1 = Player(id="p1", name="Player 1", player_type=PlayerType.HUMAN, controls=Controls.WASD)
                 player2 = Player(id="p2", name="Player 2", player_type=PlayerType.HUMAN, controls=Controls.ARROWS)
-                game = PongGame(settings, player1, player2)
+                game = self.create_game(game_id, settings, player1, player2)
                 self.active_games[game_id] = game
                 self.game_websockets[game_id] = [websocket]
                 # Im Local Mode setzen wir KEINE Ready-Flags automatisch – der Spieler muss den Ready-Button klicken.
@@ -146,7 +188,7 @@ class GameServer:
                 
                 # Verarbeite Benutzerprofilinformationen
                 if data["action"] == "player_info":
-                    pr = data.get("player_role")
+                    pr = player_role
                     user_profile = data.get("user_profile")
                     if pr and user_profile:
                         self.game_user_profiles[game_id][pr] = user_profile
@@ -160,7 +202,7 @@ class GameServer:
                 
                 # Verarbeite Ready-Signale
                 elif data["action"] == "player_ready":
-                    pr = data.get("player_role")
+                    pr = player_role
                     if pr:
                         if game_id not in self.game_ready:
                             self.game_ready[game_id] = {}
@@ -177,33 +219,193 @@ class GameServer:
                             if not game.game_active:
                                 #print("Both players ready, starting game!")
                                 game.start_game()
-                                if game_id not in self.game_loops:
-                                    self.game_loops[game_id] = asyncio.create_task(self.game_loop(game_id))
+                                self.scheduler.start()
                 
                 # Verarbeite Tasteneingaben
                 elif data["action"] == "key_update":
-                    self.handle_input(game, data["keys"])
+                    if player_role is None or not isinstance(data.get("keys"), dict):
+                        continue  # Zuschauer bzw. ungültige Nachricht
+                    keys = {key: bool(data["keys"].get(key)) for key in ROLE_KEYS[player_role]}
+                    if "seq" in data:
+                        # Neue Clients senden nur Änderungen des Tastenzustands, angewendet wird pro Tick
+                        seq = data["seq"]
+                        if type(seq) is not int or not 0 <= seq < MAX_INPUT_SEQ:
+                            continue
+                        self.update_held_keys(game_id, player_role, seq, keys)
+                    else:
+                        # Alte Clients: jede Nachricht bewegt das Paddle sofort um einen Schritt
+                        self.handle_input(game, keys)
                 
                 # Weitere Aktionen können hier hinzugefügt werden
                 
         except Exception as e:
             #print(f"\nError in game {game_id}: {e}")
+            connection.close()
+            self.connections.pop(websocket, None)
             if game_id in self.game_websockets:
-                self.game_websockets[game_id].remove(websocket)
+                if websocket in self.game_websockets[game_id]:
+                    self.game_websockets[game_id].remove(websocket)
                 #print(f"Player disconnected from game {game_id}")
                 if not self.game_websockets[game_id]:
-                    if game_id in self.game_loops:
-                        self.game_loops[game_id].cancel()
-                        del self.game_loops[game_id]
-                    del self.active_games[game_id]
-                    del self.game_websockets[game_id]
-                    #print(f"Game {game_id} cleaned up")
-                    if game_id in self.ai_players:
-                        del self.ai_players[game_id]
+                    await self.cleanup_game(game_id)
             #self.print_active_games()
 
-    def handle_input(self, game: PongGame, keys: dict):
-        movement_multiplier = game.paddle_speed  # Verwende die Geschwindigkeit aus den Settings
+    async def cleanup_game(self, game_id: str):
+        """Räumt ein Spiel ab, sobald keine Verbindung mehr besteht"""
+        finished_game = self.active_games.pop(game_id, None)
+        if finished_game and finished_game.recorder:
+            finished_game.recorder.flush()
+        if finished_game and self.batch_physics:
+            self.batch_physics.remove(finished_game)
+        self.failed_games.discard(game_id)
+        self.game_websockets.pop(game_id, None)
+        self.pending_states.pop(game_id, None)
+        self.state_encoders.pop(game_id, None)
+        self.game_inputs.pop(game_id, None)
+        self.processed_input_seq.pop(game_id, None)
+        self.game_modes.pop(game_id, None)
+        self.game_settings.pop(game_id, None)
+        self.game_ready.pop(game_id, None)
+        self.game_user_profiles.pop(game_id, None)
+        self.game_seats.pop(game_id, None)
+        if self.directory:
+            await self.directory.release_game(game_id)
+        if not self.active_games:
+            self.scheduler.stop()
+        #print(f"Game {game_id} cleaned up")
+        self.ai_players.pop(game_id, None)
+
+    def snapshot_game(self, game_id: str) -> dict:
+        """Alles, was für die Wiederherstellung eines Spiels nach einem Neustart nötig ist"""
+        return {
+            "settings": self.get_game_settings(game_id, {}),
+            "game": self.active_games[game_id].to_snapshot(),
+            "profiles": self.game_user_profiles.get(game_id, {}),
+            "seats": self.game_seats.get(game_id, {}),
+        }
+
+    def restore_game(self, game_id: str, snapshot: dict) -> PongGame:
+        """
+        Legt ein Spiel aus einem Snapshot wieder an (pausiert, Spielstand erhalten).
+        Die Clients verbinden sich neu mit /ws/game/{game_id}, übernehmen ihre Rolle
+        und setzen das Spiel mit "player_ready" fort.
+        """
+        settings = snapshot.get("settings") or {}
+        player1, player2 = (Player.from_snapshot(player) for player in snapshot["game"]["players"])
+        game = self.create_game(game_id, settings, player1, player2)
+        self.active_games[game_id] = game
+        self.game_websockets[game_id] = []
+        self.register_game_settings(game_id, settings)
+        self.game_user_profiles[game_id] = dict(snapshot.get("profiles") or {})
+        if snapshot.get("seats"):
+            self.game_seats[game_id] = dict(snapshot["seats"])
+        self.game_ready[game_id] = {}
+        if settings.get("mode") == "ai":
+            self.ai_players[game_id] = AI(settings.get("difficulty", "medium"))
+            self.game_ready[game_id]["player2"] = True
+        return game
+
+    def register_game_settings(self, game_id: str, settings: dict):
+        """Hinterlegt die Settings eines neuen Spiels, /ws/game/{game_id} liest sie beim Beitritt"""
+        now = time.monotonic()
+        self.game_settings[game_id] = (now, settings)
+        self.game_settings.move_to_end(game_id)
+
+        # Verfallene Einträge nie gestarteter Spiele vorne abräumen
+        while self.game_settings:
+            oldest_id, (created_at, _) = next(iter(self.game_settings.items()))
+            if now - created_at < GAME_SETTINGS_TTL:
+                break
+            if oldest_id in self.active_games:
+                self.game_settings[oldest_id] = (now, self.game_settings[oldest_id][1])
+                self.game_settings.move_to_end(oldest_id)
+            else:
+                del self.game_settings[oldest_id]
+
+    def assign_seats(self, game_id: str) -> dict:
+        """
+        Vergibt je Rolle ein geheimes Seat-Token ({player_role: token}). Der Client verbindet sich
+        mit /ws/game/{game_id}?seat=<token>, daran erkennt der Server seine Rolle.
+        """
+        tokens = {role: secrets.token_urlsafe(16) for role in ("player1", "player2")}
+        self.game_seats[game_id] = {token: role for role, token in tokens.items()}
+        return tokens
+
+    def connection_role(self, websocket: WebSocket, game_id: str, settings: dict):
+        """Rolle einer neuen Verbindung; None = Zuschauer (Eingaben werden ignoriert)"""
+        mode = settings.get("mode")
+        if mode == "local":
+            return "both"
+        if mode == "ai":
+            return "player1"
+        seats = self.game_seats.get(game_id)
+        if seats is not None:
+            return seats.get(websocket.query_params.get("seat"))
+        # Spiele ohne Seat-Tokens (Host/Join): Rollen in Beitrittsreihenfolge vergeben
+        taken = {self.connections[ws].role for ws in self.game_websockets.get(game_id, []) if ws in self.connections}
+        for role in ("player1", "player2"):
+            if role not in taken:
+                return role
+        return None
+
+    def get_game_settings(self, game_id: str, default: dict = None) -> dict:
+        entry = self.game_settings.get(game_id)
+        if entry is None:
+            return default
+        return entry[1]
+
+    async def route_game(self, game_id: str):
+        """
+        Sticky Routing für /ws/game/{game_id}: gibt (redirect_url, settings) zurück.
+        redirect_url ist gesetzt, wenn das Spiel laut Verzeichnis auf einem anderen Worker läuft.
+        """
+        settings = self.get_game_settings(game_id)
+        if settings is not None or game_id in self.active_games or not self.directory:
+            return None, settings
+
+        entry = await self.directory.lookup(game_id)
+        if entry is None:
+            return None, None
+        if entry["worker"] != self.directory.worker_id:
+            return entry["url"], entry["settings"]
+        return None, entry["settings"]
+
+    def create_game(self, game_id: str, settings: dict, player1: Player, player2: Player) -> PongGame:
+        game = PongGame(settings, player1, player2)
+        self.game_modes[game_id] = game_mode(settings)
+        # Replay-Aufzeichnung pro Spiel zuschaltbar (Default über GAME_REPLAY_ENABLED)
+        if settings.get("record_replay", REPLAY_ENABLED):
+            game.recorder = ReplayRecorder(game_id, game)
+        if self.batch_physics:
+            self.batch_physics.add(game)
+        return game
+
+    def update_held_keys(self, game_id: str, player_role: str, seq: int, keys: dict):
+        """Speichert den gehaltenen Tastenzustand einer Rolle; veraltete Nachrichten werden ignoriert"""
+        inputs = self.game_inputs.setdefault(game_id, {})
+        current = inputs.get(player_role)
+        if current is not None and seq <= current["seq"]:
+            return
+        inputs[player_role] = {"keys": keys, "seq": seq}
+
+    def apply_held_keys(self, game_id: str, game: PongGame, steps: float):
+        """Wendet die gehaltenen Tasten aller Rollen für einen Tick an und merkt sich die seq"""
+        inputs = self.game_inputs.get(game_id)
+        if not inputs:
+            return
+        held = {}
+        processed = self.processed_input_seq.setdefault(game_id, {})
+        for player_role, player_input in inputs.items():
+            for key, pressed in player_input["keys"].items():
+                if pressed:
+                    held[key] = True
+            processed[player_role] = player_input["seq"]
+        if held:
+            self.handle_input(game, held, steps)
+
+    def handle_input(self, game: PongGame, keys: dict, steps: float = 1.0):
+        # Verwende die Geschwindigkeit aus den Settings, skaliert auf die Tick-Länge
+        movement_multiplier = game.paddle_speed * steps
 
         # Player 1 (WASD)
         if keys.get('a'):
@@ -217,38 +419,126 @@ class GameServer:
         elif keys.get('ArrowLeft'):
             game.move_paddle(game.player2, 1 * movement_multiplier)
 
-    async def game_loop(self, game_id: str):
-        #print(f"Starting game loop for game {game_id}")
-        logger.info(f"Starting game loop for game {game_id}")
-        game = self.active_games[game_id]
-        previous_winner = None
-        
-        while game_id in self.active_games:
-            if game.game_active:
+    def step_games(self, dt: float):
+        """
+        Ein fester Physik-Schritt für alle aktiven Spiele (vom TickScheduler aufgerufen).
+        Ein Fehler in einem Spiel beendet nur dieses Spiel, nicht den Tick der anderen.
+        """
+        running = [(game_id, game) for game_id, game in self.active_games.items() if game.game_active]
+        steps = dt * 60  # Paddle-Schritte sind wie die Ballgeschwindigkeit pro 60-Hz-Tick definiert
+
+        for game_id, game in running:
+            try:
+                self.apply_held_keys(game_id, game, steps)
+
                 # Falls es ein AI-Spiel ist, berechne den AI-Zug
                 if game_id in self.ai_players:
                     ai = self.ai_players[game_id]
-                    ai_move = ai.calculate_move(game.get_game_state())
-                    self.handle_input(game, ai_move["keys"])
+                    start = time.perf_counter()
+                    direction = ai.decide(game)
+                    AI_DECISION.labels(ai.difficulty).observe(time.perf_counter() - start)
+                    if direction:
+                        game.move_paddle(game.player2, direction * game.paddle_speed * steps)
+            except Exception:
+                self.fail_game(game_id, game)
+        running = [(game_id, game) for game_id, game in running if game.game_active]
 
-                game_state = game.update_game_state()
-                
-                # Prüfe, ob das Spiel beendet wurde und ein Gewinner feststeht
-                if not game.game_active and game.winner and previous_winner is None:
-                    previous_winner = game.winner  # Speichere den Gewinner, um mehrfache API-Aufrufe zu vermeiden
-                    
-                    if game_id in self.game_user_profiles and len(self.game_user_profiles[game_id]) >= 2:
-                        asyncio.create_task(self.send_game_stats(game_id, game))
-                
-                for ws in self.game_websockets[game_id]:
-                    try:
-                        await ws.send_json(game_state)
-                    except Exception as e:
-                        #print(f"Error sending game state: {e}")
-                        logger.error(f"Error sending game state: {e}")
-                        if ws in self.game_websockets[game_id]:
-                            self.game_websockets[game_id].remove(ws)
-            await asyncio.sleep(self.UPDATE_RATE)
+        start = time.perf_counter()
+        if self.batch_physics:
+            # Alle registrierten laufenden Spiele in einem Aufruf, ohne Kopieren pro Spiel
+            self.batch_physics.step(dt)
+        else:
+            for game_id, game in running:
+                try:
+                    game.update_game_state(dt)
+                except Exception:
+                    self.fail_game(game_id, game)
+        PHYSICS_STEP.observe(time.perf_counter() - start)
+
+        for game_id, game in running:
+            if game_id in self.failed_games:
+                continue
+            try:
+                state = game.get_game_state()
+                if game_id in self.processed_input_seq:
+                    # Für Client-Prediction/Reconciliation: zuletzt angewendete Eingabe je Rolle
+                    state["input_seq"] = dict(self.processed_input_seq[game_id])
+                self.pending_states[game_id] = state
+            except Exception:
+                self.fail_game(game_id, game)
+                continue
+
+            # Spiel wurde in diesem Schritt beendet: Statistiken genau einmal senden
+            if not game.game_active and game.winner:
+                if game_id in self.game_user_profiles and len(self.game_user_profiles[game_id]) >= 2:
+                    asyncio.create_task(self.send_game_stats(game_id, game))
+
+    def fail_game(self, game_id: str, game: PongGame):
+        """Nimmt ein Spiel nach einem Fehler im Tick aus dem Loop und räumt es ab"""
+        logger.exception(f"Error in game {game_id}, removing it from the tick loop")
+        game.game_active = False
+        if self.batch_physics:
+            self.batch_physics.remove(game)
+        self.failed_games.add(game_id)
+        self.pending_states.pop(game_id, None)
+        asyncio.get_running_loop().create_task(self.abort_game(game_id))
+
+    async def abort_game(self, game_id: str):
+        # Clients trennen (1011: interner Fehler), damit sie nicht auf einem toten Spiel hängen bleiben
+        for ws in list(self.game_websockets.get(game_id, [])):
+            connection = self.connections.pop(ws, None)
+            if connection:
+                connection.close()
+            try:
+                await ws.close(code=1011)
+            except Exception:
+                pass
+        await self.cleanup_game(game_id)
+
+    async def broadcast_states(self):
+        """
+        Kodiert den letzten Zustand jedes Spiels einmal pro Frame und legt dieselben
+        Bytes in die Send-Queues aller Verbindungen. Gesendet wird von den Writer-Tasks.
+        """
+        states, self.pending_states = self.pending_states, {}
+        for game_id, game_state in states.items():
+            json_frame = None
+            binary_frame = None
+            for ws in list(self.game_websockets.get(game_id, [])):
+                connection = self.connections.get(ws)
+                if connection is None:
+                    continue
+                if connection.closed:
+                    # Writer ist beim Senden fehlgeschlagen
+                    if ws in self.game_websockets.get(game_id, []):
+                        self.game_websockets[game_id].remove(ws)
+                    continue
+                if connection.is_binary:
+                    if binary_frame is None:
+                        start = time.perf_counter()
+                        encoder = self.state_encoders.setdefault(game_id, StateEncoder())
+                        binary_frame = encoder.encode(game_state)
+                        SERIALIZATION.labels("binary").observe(time.perf_counter() - start)
+                    if connection.last_keyframe is None:
+                        connection.last_keyframe = self.state_encoders[game_id].current_keyframe()
+                    connection.enqueue(binary_frame)
+                else:
+                    if json_frame is None:
+                        start = time.perf_counter()
+                        json_frame = json.dumps(game_state, separators=(",", ":"), ensure_ascii=False)
+                        SERIALIZATION.labels("json").observe(time.perf_counter() - start)
+                    connection.enqueue(json_frame)
+
+    def get_connection_stats(self) -> dict:
+        """Queue-Tiefe und verworfene Frames über alle Verbindungen"""
+        connections = list(self.connections.values())
+        return {
+            "connections": len(connections),
+            "queue_depth": sum(c.depth for c in connections),
+            "max_queue_depth": max((c.max_depth for c in connections), default=0),
+            "dropped_frames": sum(c.dropped_frames for c in connections),
+            "sent_frames": sum(c.sent_frames for c in connections),
+        }
 
     async def send_game_stats(self, game_id: str, game: PongGame):
         """Sendet die Spielstatistiken an die Django-API"""
@@ -284,30 +574,11 @@ class GameServer:
             
             #print(f"Sende Daten an Django-API: {api_data}")
             
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(None, self._send_stats_http, api_data)
+            # Nicht blockierend: Batching, Retries und Journal übernimmt der StatsSubmitter
+            self.stats_submitter.submit(api_data)
                     
         except Exception as e:
             print(f"FEHLER beim Senden der Spielstatistiken an API: {str(e)}")
-    
-    def _send_stats_http(self, data):
-        """Sendet HTTP-Anfrage in einem separaten Thread"""
-        try:
-            data_json = json.dumps(data).encode('utf-8')
-            req = urllib.request.Request(
-                self.API_URL,
-                data=data_json,
-                headers={'Content-Type': 'application/json'}
-            )
-            with urllib.request.urlopen(req) as response:
-                response_data = response.read().decode('utf-8')
-                #print(f"API-Antwort: {response.status} {response_data}")
-        except urllib.error.HTTPError as e:
-            print(f"HTTP-Fehler: {e.code} {e.reason}")
-        except urllib.error.URLError as e:
-            print(f"URL-Fehler: {e.reason}")
-        except Exception as e:
-            print(f"Unerwarteter Fehler: {str(e)}")
 
     # Weitere Log-Ausgaben, etc.
     # logger.info("Application starting with OpenTelemetry logging enabled")
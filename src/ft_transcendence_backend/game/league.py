@@ -0,0 +1,285 @@
+import math
+import random
+from bracket import BracketMatch, entry_rating
+
+PAIRING_BUDGET = 20000  # max. Suchschritte pro Score-Gruppe, danach Paarung mit erlaubten Rematches
+
+
+def entry_name(entry) -> str:
+    return entry["player"].name
+
+
+def entry_key(entry) -> str:
+    """Platz-Token als Schlüssel: Turniernamen sind nicht eindeutig (Default "Unknown")"""
+    return entry["token"]
+
+
+class Standings:
+    """
+    Tabelle, die bei jedem Ergebnis fortgeschrieben wird (nicht aus der History neu berechnet).
+
+    Buchholz = Summe der Siege aller bisherigen Gegner. Ein Sieg erhöht daher die
+    Buchholz-Wertung aller bisherigen Gegner des Siegers um 1 (O(Gegnerzahl)).
+    """
+
+    def __init__(self, entries):
+        self.entries = {entry_key(entry): entry for entry in entries}
+        self.seed_rank = {entry_key(entry): rank for rank, entry in enumerate(entries)}
+        self.wins = {name: 0 for name in self.entries}
+        self.buchholz = {name: 0 for name in self.entries}
+        self.opponents = {name: [] for name in self.entries}
+        self.played = {name: set() for name in self.entries}
+        self.byes = set()
+
+    def add_win(self, name):
+        self.wins[name] += 1
+        for opponent in self.opponents[name]:
+            self.buchholz[opponent] += 1
+
+    def record(self, winner, loser):
+        self.add_win(winner)
+        self.opponents[winner].append(loser)
+        self.opponents[loser].append(winner)
+        self.played[winner].add(loser)
+        self.played[loser].add(winner)
+        self.buchholz[winner] += self.wins[loser]
+        self.buchholz[loser] += self.wins[winner]
+
+    def record_bye(self, name):
+        """Freilos zählt als Sieg ohne Gegner"""
+        self.byes.add(name)
+        self.add_win(name)
+
+    def rank_key(self, name):
+        return (-self.wins[name], -self.buchholz[name], self.seed_rank[name])
+
+    def ranking(self) -> list:
+        return sorted(self.entries, key=self.rank_key)
+
+    def table(self) -> list:
+        return [
+            {
+                "name": entry_name(self.entries[key]),
+                "wins": self.wins[key],
+                "buchholz": self.buchholz[key],
+                "played": len(self.opponents[key]),
+            }
+            for key in self.ranking()
+        ]
+
+
+def circle_rounds(entries) -> list:
+    """Rundenturnier nach der Kreismethode: n-1 Runden (n gerade), jeder spielt einmal gegen jeden"""
+    players = list(entries)
+    if len(players) % 2:
+        players.append(None)  # spielfrei
+    rounds = []
+    for _ in range(len(players) - 1):
+        half = len(players) // 2
+        rounds.append([(players[i], players[-1 - i]) for i in range(half)])
+        # Erster Spieler bleibt fest, alle anderen rotieren um eine Position
+        players = [players[0], players[-1]] + players[1:-1]
+    return rounds
+
+
+def _pair(players, played, leftovers, budget):
+    """
+    Tiefensuche: paart die (sortierten) Spieler ohne Rematches, genau `leftovers` bleiben übrig.
+    Kandidaten werden nach dem Schema obere Hälfte gegen untere Hälfte probiert.
+    """
+    if len(players) == leftovers:
+        return [], list(players)
+    first, rest = players[0], players[1:]
+    half = len(players) // 2
+    for other in rest[half - 1:] + rest[:half - 1]:
+        if other in played[first]:
+            continue
+        budget[0] -= 1
+        if budget[0] < 0:
+            return None
+        remaining = [p for p in rest if p is not other]
+        result = _pair(remaining, played, leftovers, budget)
+        if result is not None:
+            return [(first, other)] + result[0], result[1]
+    if leftovers:
+        # Kein Gegner in der Gruppe: der Spieler rutscht in die nächste Score-Gruppe
+        result = _pair(rest, played, leftovers - 1, budget)
+        if result is not None:
+            return result[0], [first] + result[1]
+    return None
+
+
+def pair_score_groups(ranking, wins, played, budget=PAIRING_BUDGET):
+    """
+    Swiss-Paarung: Score-Gruppen (gleiche Siegzahl) von oben nach unten paaren, ohne Rematches.
+    Wer in seiner Gruppe keinen Gegner findet, wird in die nächste Gruppe weitergereicht.
+    Gibt (pairs, unpaired) zurück; unpaired sind nur Spieler, die ohne Rematch nicht paarbar sind.
+    """
+    groups = []
+    for name in ranking:
+        if groups and wins[groups[-1][0]] == wins[name]:
+            groups[-1].append(name)
+        else:
+            groups.append([name])
+
+    pairs = []
+    floaters = []
+    for group in groups:
+        members = floaters + group
+        floaters = []
+        for leftovers in range(len(members) % 2, len(members) + 1, 2):
+            result = _pair(members, played, leftovers, [budget])
+            if result is not None:
+                pairs.extend(result[0])
+                floaters = result[1]
+                break
+        else:
+            floaters = members
+    return pairs, floaters
+
+
+class LeagueSchedule:
+    """Gemeinsame Basis für Swiss und Rundenturnier (gleiche Schnittstelle wie bracket.Bracket)"""
+
+    eliminates = False  # Verlierer scheiden nicht aus
+
+    def __init__(self, entries, rng: random.Random = None, seeded: bool = False):
+        rng = rng or random.Random()
+        self.entries = entries
+        self.seeds = list(entries) if seeded else sorted(entries, key=lambda entry: (-entry_rating(entry), rng.random()))
+        self.standings = Standings(self.seeds)
+        self.matches = {}      # (Runde, Slot) -> BracketMatch
+        self.ready = {}        # (Runde, Slot) -> BracketMatch, startbereit
+        self.byes = []
+        self.champion = None
+        self.open_matches = 0  # angesetzte, noch nicht entschiedene Matches
+
+    def add_match(self, round, slot, p1, p2):
+        match = BracketMatch(round, slot)
+        match.players = [p1, p2]
+        self.matches[(round, slot)] = match
+        self.open_matches += 1
+        return match
+
+    def start_ready(self) -> list:
+        started = list(self.ready.values())
+        self.ready.clear()
+        for match in started:
+            match.started = True
+        return started
+
+    def record(self, match, winner_entry) -> list:
+        match.winner = winner_entry
+        match.loser = match.players[1] if match.players[0] is winner_entry else match.players[0]
+        self.standings.record(entry_key(match.winner), entry_key(match.loser))
+        self.open_matches -= 1
+        return self.after_result(match)
+
+    def finish(self):
+        self.champion = self.standings.entries[self.standings.ranking()[0]]
+
+    def placements(self) -> list:
+        """Turniernamen nach Tabellenplatz"""
+        return [entry_name(self.standings.entries[key]) for key in self.standings.ranking()]
+
+
+class RoundRobin(LeagueSchedule):
+    """
+    Jeder gegen jeden (Kreismethode). Alle Matches stehen von Anfang an fest; ein Match
+    der Runde k+1 startet, sobald beide Spieler ihr Match aus Runde k beendet haben.
+    """
+
+    def __init__(self, entries, rng: random.Random = None, seeded: bool = False):
+        super().__init__(entries, rng, seeded)
+        self.schedule = {entry_key(entry): [] for entry in self.seeds}   # Token -> Matches in Rundenfolge
+        self.position = {name: 0 for name in self.schedule}              # Index des nächsten Matches
+
+        rounds = circle_rounds(self.seeds)
+        self.total_rounds = len(rounds)
+        for round, pairs in enumerate(rounds, start=1):
+            for slot, (p1, p2) in enumerate(pairs):
+                if p1 is None or p2 is None:
+                    continue  # spielfrei
+                match = self.add_match(round, slot, p1, p2)
+                self.schedule[entry_key(p1)].append(match)
+                self.schedule[entry_key(p2)].append(match)
+
+        for name in self.schedule:
+            self.check_ready(name)
+        if not self.open_matches:
+            self.finish()
+
+    def current_match(self, name):
+        matches = self.schedule[name]
+        position = self.position[name]
+        return matches[position] if position < len(matches) else None
+
+    def check_ready(self, name):
+        """Bereit ist ein Match, wenn es für beide Spieler das nächste offene ist"""
+        match = self.current_match(name)
+        if match is None or not match.is_ready():
+            return None
+        p1, p2 = (entry_key(entry) for entry in match.players)
+        if self.current_match(p1) is match and self.current_match(p2) is match:
+            self.ready[(match.round, match.slot)] = match
+            return match
+        return None
+
+    def after_result(self, match) -> list:
+        newly_ready = []
+        for entry in match.players:
+            key = entry_key(entry)
+            self.position[key] += 1
+            ready = self.check_ready(key)
+            if ready is not None and ready not in newly_ready:
+                newly_ready.append(ready)
+        if not self.open_matches:
+            self.finish()
+        return newly_ready
+
+
+class Swiss(LeagueSchedule):
+    """
+    Schweizer System: log2(n) Runden (aufgerundet), jede Runde wird nach dem Stand
+    gepaart (Score-Gruppen, keine Rematches). Ungerade Teilnehmerzahl: der
+    schwächste Spieler ohne bisheriges Freilos bekommt ein Freilos (= Sieg).
+    """
+
+    def __init__(self, entries, rng: random.Random = None, seeded: bool = False, rounds: int = None):
+        super().__init__(entries, rng, seeded)
+        self.total_rounds = rounds or max(1, math.ceil(math.log2(max(2, len(entries)))))
+        self.current_round = 0
+        if len(self.seeds) < 2:
+            self.finish()
+        else:
+            self.pair_next_round()
+
+    def pair_next_round(self) -> list:
+        self.current_round += 1
+        standings = self.standings
+        ranking = standings.ranking()
+
+        if len(ranking) % 2:
+            bye = next((name for name in reversed(ranking) if name not in standings.byes), ranking[-1])
+            ranking.remove(bye)
+            standings.record_bye(bye)
+            self.byes.append(standings.entries[bye])
+
+        pairs, unpaired = pair_score_groups(ranking, standings.wins, standings.played)
+        # Nur wenn ohne Rematch nicht mehr paarbar (sehr kleine Felder, viele Runden)
+        pairs.extend(zip(unpaired[::2], unpaired[1::2]))
+
+        created = []
+        for slot, (p1, p2) in enumerate(pairs):
+            match = self.add_match(self.current_round, slot, standings.entries[p1], standings.entries[p2])
+            self.ready[(match.round, match.slot)] = match
+            created.append(match)
+        return created
+
+    def after_result(self, match) -> list:
+        if self.open_matches:
+            return []
+        if self.current_round >= self.total_rounds:
+            self.finish()
+            return []
+        return self.pair_next_round()
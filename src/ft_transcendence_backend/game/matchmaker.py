@@ -0,0 +1,419 @@
+import asyncio
+import bisect
+import json
+import time
+import uuid
+import logging
+
+logger = logging.getLogger('game')
+
+DEFAULT_RATING = 1000.0   # entspricht CustomUser.rating im Backend
+MIN_RATING = 0.0          # plausibler Bereich für vom Client gemeldete Ratings
+MAX_RATING = 4000.0
+BASE_WINDOW = 100.0       # erlaubte Rating-Differenz direkt nach dem Beitritt
+WINDOW_GROWTH = 50.0      # zusätzliche Differenz pro Sekunde Wartezeit
+SWEEP_INTERVAL = 1.0      # wie oft wartende Spieler mit gewachsenem Fenster neu gepaart werden
+
+
+def parse_rating(value) -> float:
+    """
+    Rating aus dem (vom Client gesendeten) userProfile. Keine Zahl, nicht endlich oder außerhalb
+    des plausiblen Bereichs: DEFAULT_RATING, statt beim Einreihen mit ValueError abzubrechen.
+    """
+    if isinstance(value, bool):
+        return DEFAULT_RATING
+    try:
+        rating = float(value)
+    except (TypeError, ValueError):
+        return DEFAULT_RATING
+    if not MIN_RATING <= rating <= MAX_RATING:  # auch nan/inf
+        return DEFAULT_RATING
+    return rating
+
+
+class Ticket:
+    """Ein suchender Spieler in der Matchmaking-Queue"""
+
+    __slots__ = ("websocket", "player_name", "rating", "enqueued_at", "cancelled", "ticket_id", "worker_id")
+
+    def __init__(self, websocket, player_name: str, rating: float, enqueued_at: float,
+                 ticket_id: str = None, worker_id: str = None):
+        self.websocket = websocket        # None, wenn der Spieler an einem anderen Worker wartet
+        self.player_name = player_name
+        self.rating = rating
+        self.enqueued_at = enqueued_at
+        self.cancelled = False
+        self.ticket_id = ticket_id
+        self.worker_id = worker_id
+
+
+class Matchmaker:
+    """
+    Ereignisgesteuertes, skill-basiertes Online-Matchmaking.
+
+    Neue Spieler kommen über eine asyncio.Queue herein und werden sofort gegen
+    den nächstgelegenen wartenden Gegner im nach Rating sortierten Pool geprüft
+    (bisect, O(log n)). Passt keiner, wartet der Spieler im Pool; das erlaubte
+    Rating-Fenster wächst mit der Wartezeit und wird alle SWEEP_INTERVAL Sekunden
+    neu ausgewertet, solange jemand wartet.
+
+    Abbrechen ist O(1): das Ticket wird nur als abgebrochen markiert und beim
+    nächsten Durchlauf aus dem Pool entfernt.
+    """
+
+    def __init__(self, on_match, clock=time.monotonic, sweep_interval: float = SWEEP_INTERVAL):
+        self.on_match = on_match          # async on_match(ticket1, ticket2), kann Tickets selbst neu einreihen
+        self.clock = clock
+        self.sweep_interval = sweep_interval
+        self.queue = asyncio.Queue()      # neu beigetretene Tickets
+        self.tickets = {}                 # websocket -> Ticket (nur aktive)
+        self.ratings = []                 # sortierte Ratings, parallel zu self.pool
+        self.pool = []                    # wartende Tickets, sortiert nach Rating
+        self.task = None
+
+    def __len__(self):
+        return len(self.tickets)
+
+    def __contains__(self, websocket):
+        return websocket in self.tickets
+
+    def enqueue(self, websocket, player_name: str, rating: float = DEFAULT_RATING) -> Ticket:
+        if websocket in self.tickets:
+            return self.tickets[websocket]
+        ticket = Ticket(websocket, player_name, float(rating), self.clock())
+        self.tickets[websocket] = ticket
+        self.queue.put_nowait(ticket)
+        self.start()
+        return ticket
+
+    def cancel(self, websocket) -> bool:
+        ticket = self.tickets.pop(websocket, None)
+        if ticket is None:
+            return False
+        ticket.cancelled = True
+        return True
+
+    def start(self):
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+        return self.task
+
+    def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    def window(self, ticket: Ticket, now: float) -> float:
+        """Erlaubte Rating-Differenz, wächst linear mit der Wartezeit"""
+        return BASE_WINDOW + WINDOW_GROWTH * (now - ticket.enqueued_at)
+
+    def acceptable(self, ticket1: Ticket, ticket2: Ticket, now: float) -> bool:
+        # Das größere Fenster zählt: lange Wartende dürfen auch weiter entfernte Gegner bekommen
+        limit = max(self.window(ticket1, now), self.window(ticket2, now))
+        return abs(ticket1.rating - ticket2.rating) <= limit
+
+    def find_opponent(self, ticket: Ticket, now: float):
+        """Nächster nicht abgebrochener Nachbar links/rechts im Pool, falls im Fenster"""
+        index = bisect.bisect_left(self.ratings, ticket.rating)
+        best = None
+
+        below = index - 1
+        while below >= 0 and self.pool[below].cancelled:
+            below -= 1
+        if below >= 0:
+            best = below
+
+        above = index
+        while above < len(self.pool) and self.pool[above].cancelled:
+            above += 1
+        if above < len(self.pool):
+            if best is None or self.ratings[above] - ticket.rating < ticket.rating - self.ratings[best]:
+                best = above
+
+        if best is not None and self.acceptable(self.pool[best], ticket, now):
+            return best
+        return None
+
+    def insert(self, ticket: Ticket):
+        index = bisect.bisect_right(self.ratings, ticket.rating)
+        self.ratings.insert(index, ticket.rating)
+        self.pool.insert(index, ticket)
+
+    def take(self, index: int) -> Ticket:
+        del self.ratings[index]
+        return self.pool.pop(index)
+
+    def sweep(self, now: float) -> list:
+        """Paart benachbarte Wartende, deren Fenster inzwischen passt, und räumt Abbrüche weg (O(n))"""
+        pairs = []
+        remaining = []
+        previous = None
+        for ticket in self.pool:
+            if ticket.cancelled:
+                continue
+            if previous is not None and self.acceptable(previous, ticket, now):
+                pairs.append((previous, ticket))
+                previous = None
+                continue
+            if previous is not None:
+                remaining.append(previous)
+            previous = ticket
+        if previous is not None:
+            remaining.append(previous)
+
+        self.pool = remaining
+        self.ratings = [ticket.rating for ticket in remaining]
+        return pairs
+
+    async def run(self):
+        next_sweep = self.clock() + self.sweep_interval
+        while True:
+            # Ohne Wartende blockiert der Loop, bis jemand beitritt
+            timeout = max(0.0, next_sweep - self.clock()) if self.pool else None
+            try:
+                ticket = await asyncio.wait_for(self.queue.get(), timeout)
+            except asyncio.TimeoutError:
+                ticket = None
+
+            if ticket is not None and not ticket.cancelled:
+                index = self.find_opponent(ticket, self.clock())
+                if index is None:
+                    self.insert(ticket)
+                else:
+                    await self.start_match(self.take(index), ticket)
+
+            now = self.clock()
+            if not self.pool:
+                next_sweep = now + self.sweep_interval
+            elif now >= next_sweep:
+                next_sweep = now + self.sweep_interval
+                for pair in self.sweep(now):
+                    await self.start_match(*pair)
+
+    async def start_match(self, ticket1: Ticket, ticket2: Ticket):
+        self.tickets.pop(ticket1.websocket, None)
+        self.tickets.pop(ticket2.websocket, None)
+        try:
+            await self.on_match(ticket1, ticket2)
+        except Exception as e:
+            logger.error(f"Error starting online match: {e}")
+
+    async def notify(self, ticket: Ticket, message: dict):
+        await ticket.websocket.send_json(message)
+
+    async def requeue(self, ticket: Ticket):
+        self.enqueue(ticket.websocket, ticket.player_name, ticket.rating)
+
+
+class RedisMatchmaker:
+    """
+    Worker-übergreifendes Matchmaking mit demselben Interface wie Matchmaker.
+
+    Wartende Spieler aller Worker liegen in einem Redis-ZSET (Score = Rating), die
+    Ticketdaten in einem Hash. Gegner werden per ZRANGEBYSCORE um das eigene Rating
+    gesucht (O(log n)) und per ZREM beansprucht: ZREM gelingt genau einem Worker,
+    damit wird kein Ticket doppelt gepaart. Spieler an anderen Workern werden über
+    deren Pub/Sub-Kanal benachrichtigt.
+    """
+
+    def __init__(self, on_match, directory, clock=time.time, sweep_interval: float = SWEEP_INTERVAL,
+                 search_limit: int = 5):
+        self.on_match = on_match
+        self.directory = directory
+        self.redis = directory.redis
+        self.worker_id = directory.worker_id
+        self.clock = clock                # Wanduhr: Wartezeiten werden workerübergreifend verglichen
+        self.sweep_interval = sweep_interval
+        self.search_limit = search_limit  # Kandidaten pro Seite des eigenen Ratings
+        self.pool_key = "game:matchmaking:pool"
+        self.ticket_key = "game:matchmaking:tickets"
+        self.channel = f"game:matchmaking:{self.worker_id}"
+        self.queue = asyncio.Queue()      # neu beigetretene lokale Tickets
+        self.tickets = {}                 # websocket -> Ticket (lokal wartend)
+        self.by_id = {}                   # ticket_id -> Ticket (lokal wartend)
+        self.task = None
+        self.listener_task = None
+
+    def __len__(self):
+        return len(self.tickets)
+
+    def __contains__(self, websocket):
+        return websocket in self.tickets
+
+    def enqueue(self, websocket, player_name: str, rating: float = DEFAULT_RATING) -> Ticket:
+        if websocket in self.tickets:
+            return self.tickets[websocket]
+        ticket = Ticket(websocket, player_name, float(rating), self.clock(),
+                        ticket_id=uuid.uuid4().hex, worker_id=self.worker_id)
+        self.tickets[websocket] = ticket
+        self.by_id[ticket.ticket_id] = ticket
+        self.queue.put_nowait(ticket)
+        self.start()
+        return ticket
+
+    def cancel(self, websocket) -> bool:
+        ticket = self.tickets.pop(websocket, None)
+        if ticket is None:
+            return False
+        self.by_id.pop(ticket.ticket_id, None)
+        ticket.cancelled = True
+        asyncio.create_task(self.remove_from_pool(ticket.ticket_id))
+        return True
+
+    def start(self):
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+        if self.listener_task is None or self.listener_task.done():
+            self.listener_task = asyncio.create_task(self.listen())
+        self.directory.start()
+        return self.task
+
+    def stop(self):
+        for task in (self.task, self.listener_task):
+            if task is not None:
+                task.cancel()
+        self.task = None
+        self.listener_task = None
+        self.directory.stop()
+
+    window = Matchmaker.window
+    acceptable = Matchmaker.acceptable
+
+    async def add_to_pool(self, ticket: Ticket):
+        await self.redis.hset(self.ticket_key, ticket.ticket_id, json.dumps({
+            "worker": ticket.worker_id,
+            "name": ticket.player_name,
+            "enqueued_at": ticket.enqueued_at,
+        }))
+        await self.redis.zadd(self.pool_key, {ticket.ticket_id: ticket.rating})
+
+    async def remove_from_pool(self, ticket_id: str) -> bool:
+        removed = await self.redis.zrem(self.pool_key, ticket_id)
+        await self.redis.hdel(self.ticket_key, ticket_id)
+        return bool(removed)
+
+    async def claim_opponent(self, ticket: Ticket):
+        """Sucht die nächsten Ratings ober- und unterhalb und beansprucht den ersten passenden Gegner"""
+        now = self.clock()
+        above = await self.redis.zrangebyscore(self.pool_key, ticket.rating, "+inf",
+                                               start=0, num=self.search_limit, withscores=True)
+        below = await self.redis.zrevrangebyscore(self.pool_key, ticket.rating, "-inf",
+                                                  start=0, num=self.search_limit, withscores=True)
+        candidates = {}
+        for ticket_id, rating in above + below:
+            if ticket_id != ticket.ticket_id:
+                candidates[ticket_id] = rating
+        if not candidates:
+            return None
+
+        ordered = sorted(candidates.items(), key=lambda item: abs(item[1] - ticket.rating))
+        raw_tickets = await self.redis.hmget(self.ticket_key, [ticket_id for ticket_id, _ in ordered])
+        for (ticket_id, rating), raw in zip(ordered, raw_tickets):
+            if raw is None:
+                await self.remove_from_pool(ticket_id)
+                continue
+            data = json.loads(raw)
+            opponent = Ticket(None, data["name"], rating, data["enqueued_at"],
+                              ticket_id=ticket_id, worker_id=data["worker"])
+            if not self.acceptable(opponent, ticket, now):
+                continue
+            if not await self.directory.is_alive(opponent.worker_id):
+                # Worker ohne Heartbeat: Ticket kann nie benachrichtigt werden
+                await self.remove_from_pool(ticket_id)
+                continue
+            if not await self.remove_from_pool(ticket_id):
+                continue  # ein anderer Worker war schneller
+
+            if opponent.worker_id == self.worker_id:
+                local = self.by_id.pop(ticket_id, None)
+                if local is None or local.cancelled:
+                    continue
+                self.tickets.pop(local.websocket, None)
+                return local
+            return opponent
+        return None
+
+    async def match_or_wait(self, ticket: Ticket):
+        opponent = await self.claim_opponent(ticket)
+        if ticket.cancelled:
+            if opponent is not None:
+                await self.requeue(opponent)
+            return
+        if opponent is None:
+            await self.add_to_pool(ticket)
+            if ticket.cancelled:
+                await self.remove_from_pool(ticket.ticket_id)
+            return
+        await self.start_match(opponent, ticket)
+
+    async def sweep(self):
+        """Lokale Wartende mit gewachsenem Fenster neu paaren"""
+        for ticket in list(self.by_id.values()):
+            if ticket.cancelled or ticket.ticket_id not in self.by_id:
+                continue
+            # Sich selbst aus dem Pool nehmen; schlägt fehl, wenn gerade ein anderer Worker gepaart hat
+            if not await self.redis.zrem(self.pool_key, ticket.ticket_id):
+                continue
+            await self.match_or_wait(ticket)
+
+    async def run(self):
+        next_sweep = self.clock() + self.sweep_interval
+        while True:
+            timeout = max(0.0, next_sweep - self.clock()) if self.by_id else None
+            try:
+                ticket = await asyncio.wait_for(self.queue.get(), timeout)
+            except asyncio.TimeoutError:
+                ticket = None
+
+            try:
+                if ticket is not None and not ticket.cancelled:
+                    await self.match_or_wait(ticket)
+                if self.clock() >= next_sweep:
+                    next_sweep = self.clock() + self.sweep_interval
+                    await self.sweep()
+            except Exception as e:
+                logger.error(f"Redis matchmaking failed: {e}")
+
+    async def listen(self):
+        """Empfängt Paarungen, die ein anderer Worker für lokale Tickets gefunden hat"""
+        pubsub = self.redis.pubsub()
+        await pubsub.subscribe(self.channel)
+        try:
+            while True:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if message is None:
+                    continue
+                data = json.loads(message["data"])
+                ticket = self.by_id.pop(data["ticket_id"], None)
+                if ticket is None or ticket.cancelled:
+                    continue
+                self.tickets.pop(ticket.websocket, None)
+                try:
+                    await ticket.websocket.send_json(data["message"])
+                except Exception as e:
+                    logger.error(f"Error notifying matched player: {e}")
+        finally:
+            await pubsub.unsubscribe(self.channel)
+
+    async def start_match(self, ticket1: Ticket, ticket2: Ticket):
+        for ticket in (ticket1, ticket2):
+            if ticket.worker_id == self.worker_id:
+                self.tickets.pop(ticket.websocket, None)
+                self.by_id.pop(ticket.ticket_id, None)
+        try:
+            await self.on_match(ticket1, ticket2)
+        except Exception as e:
+            logger.error(f"Error starting online match: {e}")
+
+    async def notify(self, ticket: Ticket, message: dict):
+        if ticket.worker_id == self.worker_id:
+            await ticket.websocket.send_json(message)
+            return
+        await self.redis.publish(f"game:matchmaking:{ticket.worker_id}",
+                                 json.dumps({"ticket_id": ticket.ticket_id, "message": message}))
+
+    async def requeue(self, ticket: Ticket):
+        if ticket.worker_id == self.worker_id:
+            self.enqueue(ticket.websocket, ticket.player_name, ticket.rating)
+            return
+        await self.add_to_pool(ticket)
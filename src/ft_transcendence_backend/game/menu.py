@@ -1,26 +1,38 @@
 from fastapi import WebSocket
+from collections import OrderedDict
 import json
+import secrets
 import uuid
-import asyncio
 from settings import GameSettings
 from models.player import Player, PlayerType, Controls
-from tournament_manager import TournamentManager
+from tournament_registry import TournamentRegistry
 from game_server import GameServer
+from matchmaker import Matchmaker, RedisMatchmaker, DEFAULT_RATING, parse_rating
 
+MAX_SESSIONS = 10000  # Sessions mit Token, die ältesten werden verworfen
 
 
-class Menu:
+class MenuSession:
+    """Menü-Zustand eines Clients: eigener Menü-Stack, Turnier-Flag und Spieleinstellungen"""
+
     def __init__(self):
-        self.game_settings = GameSettings()
-        self.current_menu_stack = []
-        self.current_game_settings = None
+        self.menu_stack = []
         self.is_tournament = False
-        self.searching_players = {}  # {websocket: player_name}
-        self.matchmaking_task = None
-        self.tournament_queue = []  # list of {"websocket": ..., "player": Player}
-        self.tournament_task = None
-        self.tournament_manager = None
-        self.game_server = GameServer()
+        self.game_settings = GameSettings()
+
+
+class Menu:
+    def __init__(self, game_server: GameServer = None):
+        self.game_settings = GameSettings()  # Standardwerte für Turniere und unbekannte Spiele
+        self.sessions = OrderedDict()  # session_key (Verbindung oder Session-Token) -> MenuSession
+        self.session_of = {}  # websocket -> Session-Token
+        self.tournaments = TournamentRegistry()  # tournament_id -> TournamentManager, Warteschlangen pro Größe
+        self.game_server = game_server or GameServer()
+        # Online-Suche nach Rating, paart sofort beim Beitritt; im Cluster workerübergreifend über Redis
+        if self.game_server.directory:
+            self.matchmaker = RedisMatchmaker(self.start_online_match, self.game_server.directory)
+        else:
+            self.matchmaker = Matchmaker(self.start_online_match)
 
         # Hauptmenü
         self.menu_items = [
@@ -53,6 +65,14 @@ class Menu:
             {"id": "back", "text": "Back"}
         ]
 
+        # Turnierformat (ids wie in tournament_manager.FORMATS)
+        self.tournament_format_items = [
+            {"id": "knockout", "text": "Knockout"},
+            {"id": "swiss", "text": "Swiss"},
+            {"id": "round_robin", "text": "Round Robin"},
+            {"id": "back", "text": "Back"}
+        ]
+
         # Neues Online-Modus-Menü
         self.online_mode_items = [
             {"id": "host", "text": "Host Game"},
@@ -60,31 +80,30 @@ class Menu:
             {"id": "back", "text": "Back"}
         ]
 
-    async def start_matchmaking_loop(self):
-        #print("Starting matchmaking loop")
-        while True:
-            #print(f"Current searching players: {[name for name in self.searching_players.values()]}")
-            await self.match_players()
-            await asyncio.sleep(1)
-
-    async def handle_menu_selection(self, websocket: WebSocket, selection: str, userProfile=None):
+    async def handle_menu_selection(self, websocket: WebSocket, selection: str, userProfile=None,
+                                    tournament_size=None, tournament_format=None):
         #print(f"\n=== Menu Selection ===")
         #print(f"Selection: {selection}")
-        #print(f"Current Menu Stack: {self.current_menu_stack}")
+        #print(f"Current Menu Stack: {session.menu_stack}")
+        session = self.get_session(websocket)
 
         if selection == "main":
-            self.is_tournament = False
-            self.current_menu_stack = []
+            session.is_tournament = False
+            session.menu_stack = []
             return {"action": "show_main_menu", "menu_items": self.menu_items}
 
         elif selection == "play_game":
-            self.is_tournament = False
-            self.current_menu_stack.append("main")
+            session.is_tournament = False
+            session.menu_stack.append("main")
             return {"action": "show_submenu", "menu_items": self.play_mode_items}
 
         elif selection == "play_tournament":
-            self.is_tournament = True
-            self.current_menu_stack.append("main")
+            if tournament_size is None:
+                # Aus dem Hauptmenü: erst Größe, dann Format wählen; der Client schickt beides beim Beitritt mit
+                session.is_tournament = True
+                session.menu_stack.append("main")
+                return {"action": "show_submenu", "menu_items": self.tournament_size_items}
+            session.is_tournament = True
 
             tournament_name = "Unknown"
             if userProfile and "tournament_name" in userProfile:
@@ -102,15 +121,13 @@ class Menu:
             if userProfile:
                 player.user_profile = userProfile
 
-            self.tournament_queue.append({
-                "websocket": websocket,
-                "player": player
-            })
-
-            if not self.tournament_task or self.tournament_task.done():
-                self.tournament_task = asyncio.create_task(self.start_tournament())
-
-            await self.broadcast_tournament_queue_update()
+            size = self.tournaments.normalize_size(tournament_size)
+            format = self.tournaments.normalize_format(tournament_format)
+            manager = self.tournaments.join(websocket, player, size, format)
+            if manager:
+                await self.announce_tournament(manager)
+            else:
+                await self.broadcast_tournament_queue_update(size, format)
             return None  # da die Nachricht schon direkt gesendet wurde
 
 
@@ -123,13 +140,15 @@ class Menu:
             }
 
         elif selection == "local":
-            game_settings = self.game_settings.get_settings()
-            game_settings.update({"mode": selection, "is_tournament": self.is_tournament})
-            self.current_game_settings = game_settings
+            game_id = str(uuid.uuid4())
+            game_settings = session.game_settings.get_settings()
+            game_settings.update({"mode": selection, "is_tournament": session.is_tournament})
+            await self.register_game(game_id, game_settings)
 
             return {
                 "action": "game_found",
-                "game_id": str(uuid.uuid4()),
+                "game_id": game_id,
+                "game_url": self.game_url(),
                 "settings": game_settings,
                 "player1": "Player 1",
                 "player2": "Player 2",
@@ -138,10 +157,8 @@ class Menu:
 
         elif selection == "online":
             player_name = "Player"
-            self.searching_players[websocket] = player_name
-
-            if not self.matchmaking_task or self.matchmaking_task.done():
-                self.matchmaking_task = asyncio.create_task(self.start_matchmaking_loop())
+            rating = parse_rating(userProfile.get("rating")) if isinstance(userProfile, dict) else DEFAULT_RATING
+            self.matchmaker.enqueue(websocket, player_name, rating)
 
             return {
                 "action": "searching_opponent",
@@ -149,48 +166,46 @@ class Menu:
             }
 
         elif selection == "cancel_search":
-            if websocket in self.searching_players:
-                del self.searching_players[websocket]
-            self.tournament_queue = [
-                entry for entry in self.tournament_queue if entry["websocket"] != websocket
-            ]
-
-            if not self.searching_players and self.matchmaking_task:
-                self.matchmaking_task.cancel()
-                self.matchmaking_task = None
+            self.matchmaker.cancel(websocket)
+            self.tournaments.leave(websocket)
+            session.is_tournament = False
+            session.menu_stack = []
 
             return {"action": "show_main_menu", "menu_items": self.menu_items}
 
         elif selection in ["host", "join"]:
-            game_settings = self.game_settings.get_settings()
+            game_id = str(uuid.uuid4())
+            game_settings = session.game_settings.get_settings()
             game_settings.update({
                 "mode": "online",
                 "online_type": selection,
-                "is_tournament": self.is_tournament
+                "is_tournament": session.is_tournament
             })
-            self.current_game_settings = game_settings
 
-            if self.is_tournament:
-                self.current_menu_stack.append("online_mode")
+            if session.is_tournament:
+                session.menu_stack.append("online_mode")
                 return {"action": "show_submenu", "menu_items": self.tournament_size_items}
-            return {"action": "start_game", "settings": game_settings}
+            await self.register_game(game_id, game_settings)
+            return {"action": "start_game", "game_id": game_id, "game_url": self.game_url(), "settings": game_settings}
 
         elif selection == "ai":
-            self.current_menu_stack.append("play_mode")
+            session.menu_stack.append("play_mode")
             return {"action": "show_submenu", "menu_items": self.ai_difficulty_items}
 
         elif selection in ["easy", "medium", "impossible"]:
-            game_settings = self.game_settings.get_settings()
+            game_id = str(uuid.uuid4())
+            game_settings = session.game_settings.get_settings()
             game_settings.update({
                 "mode": "ai",
                 "difficulty": selection,
-                "is_tournament": self.is_tournament
+                "is_tournament": session.is_tournament
             })
-            self.current_game_settings = game_settings
+            await self.register_game(game_id, game_settings)
 
             return {
                 "action": "game_found",
-                "game_id": str(uuid.uuid4()),
+                "game_id": game_id,
+                "game_url": self.game_url(),
                 "settings": game_settings,
                 "player1": "Player 1",
                 "player2": "AI Player",
@@ -199,6 +214,9 @@ class Menu:
 
         elif selection in ["4_players", "6_players", "8_players"]:
             num_players = int(selection.split("_")[0])
+            if session.is_tournament and session.menu_stack[-1:] == ["main"]:
+                session.menu_stack.append("tournament_size")
+                return {"action": "show_submenu", "menu_items": self.tournament_format_items}
             return {
                 "action": "show_player_names",
                 "num_players": num_players,
@@ -206,77 +224,118 @@ class Menu:
             }
 
         elif selection == "back":
-            if self.current_menu_stack:
-                last_menu = self.current_menu_stack.pop()
+            if session.menu_stack:
+                last_menu = session.menu_stack.pop()
                 if last_menu == "main":
-                    self.is_tournament = False
+                    session.is_tournament = False
                     return {"action": "show_main_menu", "menu_items": self.menu_items}
                 elif last_menu == "play_mode":
                     return {"action": "show_submenu", "menu_items": self.play_mode_items}
-            self.is_tournament = False
+                elif last_menu == "tournament_size":
+                    return {"action": "show_submenu", "menu_items": self.tournament_size_items}
+            session.is_tournament = False
             return {"action": "show_main_menu", "menu_items": self.menu_items}
 
 
-    async def update_settings(self, settings_data):
+    def open_session(self, websocket: WebSocket):
+        """
+        Bindet eine Menü-Verbindung mit ?session= an ihre Session: ein vom Server vergebenes
+        Token (unratbar, anders als eine user_id) übernimmt Menü-Zustand und Settings über
+        Reconnects, sonst gibt es ein neues Token. Ohne ?session= bleibt die Session an der Verbindung.
+        """
+        token = websocket.query_params.get("session")
+        if token is None:
+            return None
+        if token not in self.sessions:
+            token = secrets.token_urlsafe(16)
+            self.sessions[token] = MenuSession()
+            while len(self.sessions) > MAX_SESSIONS:
+                self.sessions.popitem(last=False)
+        self.sessions.move_to_end(token)
+        self.session_of[websocket] = token
+        return token
+
+    def session_key(self, websocket: WebSocket):
+        return self.session_of.get(websocket, websocket)
+
+    def get_session(self, websocket: WebSocket) -> MenuSession:
+        key = self.session_key(websocket)
+        session = self.sessions.get(key)
+        if session is None:
+            session = self.sessions[key] = MenuSession()
+        return session
+
+    def close_session(self, websocket: WebSocket):
+        """Verbindungsgebundene Sessions beim Trennen verwerfen (Sessions mit Token bleiben erhalten)"""
+        self.sessions.pop(websocket, None)
+        self.session_of.pop(websocket, None)
+
+    async def update_settings(self, websocket: WebSocket, settings_data):
         #print(f"Menu update_settings called with: {settings_data}")
-        return await self.game_settings.update_settings(settings_data)
+        return await self.get_session(websocket).game_settings.update_settings(settings_data)
 
     async def get_menu_items(self):
         return self.menu_items
 
-    def get_current_settings(self):
-        if self.current_game_settings is not None:
-            #print(f"Using current game settings: {self.current_game_settings}")
-            return self.current_game_settings
-        return self.game_settings.get_settings()
-
-    async def match_players(self):
-        #print(f"Checking for matches... Current players: {len(self.searching_players)}")
-
-        if len(self.searching_players) >= 2:
-            player1_ws, player1_name = list(self.searching_players.items())[0]
-            player2_ws, player2_name = list(self.searching_players.items())[1]
-
-            #print(f"Found match: {player1_name} vs {player2_name}")
-
-            del self.searching_players[player1_ws]
-            del self.searching_players[player2_ws]
-
-            game_id = str(uuid.uuid4())
-            game_settings = self.game_settings.get_settings()
-            game_settings.update({
-                "mode": "online",
-                "online_type": "host",
-                "player1_name": player1_name,
-                "player2_name": player2_name,
-                "game_id": game_id
-            })
-
-            self.current_game_settings = game_settings.copy()
-
-            try:
-                match_data = {
-                    "action": "game_found",
-                    "game_id": game_id,
-                    "settings": game_settings,
-                    "player1": player1_name,
-                    "player2": player2_name,
-                }
-
-                await player1_ws.send_json({**match_data, "playerRole": "player1"})
-                await player2_ws.send_json({**match_data, "playerRole": "player2"})
+    async def register_game(self, game_id: str, settings: dict):
+        """Settings lokal (O(1) beim Beitritt) und, im Cluster, im Redis-Spielverzeichnis hinterlegen"""
+        self.game_server.register_game_settings(game_id, settings)
+        if self.game_server.directory:
+            await self.game_server.directory.register_game(game_id, settings)
+
+    def game_url(self) -> str:
+        """Websocket-Basis-URL dieses Workers ("" = gleicher Host wie die Seite)"""
+        if self.game_server.directory:
+            return self.game_server.directory.worker_url
+        return ""
+
+    async def start_online_match(self, ticket1, ticket2):
+        """Wird vom Matchmaker aufgerufen, sobald zwei Spieler gepaart sind (das Spiel läuft auf diesem Worker)"""
+        if ticket1.websocket is None:
+            # Im Cluster kann ein Spieler an einem anderen Worker warten; der lokale ist player1
+            ticket1, ticket2 = ticket2, ticket1
+        player1_name, player2_name = ticket1.player_name, ticket2.player_name
+
+        game_id = str(uuid.uuid4())
+        game_settings = self.get_session(ticket1.websocket).game_settings.get_settings()
+        game_settings.update({
+            "mode": "online",
+            "online_type": "host",
+            "player1_name": player1_name,
+            "player2_name": player2_name,
+            "game_id": game_id
+        })
+        await self.register_game(game_id, game_settings.copy())
+        seats = self.game_server.assign_seats(game_id)
+
+        match_data = {
+            "action": "game_found",
+            "game_id": game_id,
+            "game_url": self.game_url(),
+            "settings": game_settings,
+            "player1": player1_name,
+            "player2": player2_name,
+        }
+
+        try:
+            await self.matchmaker.notify(ticket1, {**match_data, "playerRole": "player1", "seatToken": seats["player1"]})
+        except Exception as e:
+            # Spieler 1 nicht erreichbar: Spieler 2 wurde noch nicht benachrichtigt und sucht weiter
+            print(f"Error notifying players: {e}")
+            await self.matchmaker.requeue(ticket2)
+            return
 
-                #print(f"Game {game_id} created and both players notified")
-            except Exception as e:
-                #print(f"Error notifying players: {e}")
-                self.searching_players[player1_ws] = player1_name
-                self.searching_players[player2_ws] = player2_name
+        try:
+            await self.matchmaker.notify(ticket2, {**match_data, "playerRole": "player2", "seatToken": seats["player2"]})
+        except Exception as e:
+            print(f"Error notifying players: {e}")
 
-    async def broadcast_tournament_queue_update(self):
-        names = [entry["player"].name for entry in self.tournament_queue]
-        message = f"Waiting for more players to join the tournament: {', '.join(names)}"
+    async def broadcast_tournament_queue_update(self, size, format):
+        entries = self.tournaments.waiting(size, format)
+        names = [entry["player"].name for entry in entries]
+        message = f"Waiting for more players to join the tournament ({len(names)}/{size}): {', '.join(names)}"
         
-        for entry in self.tournament_queue:
+        for entry in entries:
             try:
                 await entry["websocket"].send_json({
                     "action": "searching_opponent",
@@ -286,71 +345,62 @@ class Menu:
                 print(f"Fehler beim Senden an {entry['player'].name}: {e}")
 
 
-    async def start_tournament(self):
-        #print("Starting tournament check loop")
-        while True:
-            #print(f"Tournament Queue: {len(self.tournament_queue)} Spieler")
-            if len(self.tournament_queue) == 4:
-                #print("Tournament is ready to show grid with 4 players")
-                entries = [self.tournament_queue.pop(0) for _ in range(4)]
-
-                # Debug-Ausgabe der User-Profile
-                for i, entry in enumerate(entries):
-                    player = entry["player"]
-                    print(f"Player {i+1}: {player.name}")
-                    if hasattr(player, 'user_profile') and player.user_profile:
-                        print(f"  User Profile: {player.user_profile}")
-                    else:
-                        print("  No user profile found!")
-
-                # Speichere Entries im Manager, aber starte noch nicht
-                self.tournament_manager = TournamentManager(entries)
-
-                # Erstelle Player-Infos mit Tournament-Namen
-                player_infos = []
-                for e in entries:
-                    player = e["player"]
-                    info = {"tournament_name": player.name}
-                    
-                    # Füge das vollständige User-Profil hinzu, falls vorhanden
-                    if hasattr(player, 'user_profile') and player.user_profile:
-                        info["user_profile"] = player.user_profile
-                        # Für einfacheren Zugriff auch den Username direkt hinzufügen
-                        if "username" in player.user_profile:
-                            info["username"] = player.user_profile["username"]
-                    
-                    player_infos.append(info)
-                #print(f"Player Infos:___________ {player_infos}")
-
-
-                for entry in entries:
-                    try:
-                        await entry["websocket"].send_json({
-                            "action": "tournament_ready",
-                            "players": player_infos,
-                            "round": 1,
-                            "total_rounds": 2
-                        })
-                    except Exception as e:
-                        print(f"Fehler beim Senden an Spieler: {e}")
-
-                break  # Brich die Schleife ab, jetzt warten wir auf Button "Start Tournament"
-
-            await asyncio.sleep(1)
+    async def announce_tournament(self, manager):
+        """Turnier ist voll: allen Teilnehmern das Bracket zeigen, gestartet wird per start_tournament_now"""
+        message = self.tournament_ready_message(manager)
+        for entry in manager.players:
+            try:
+                # Jeder bekommt sein Platz-Token, damit übernimmt er den Platz nach einem Neustart
+                await entry["websocket"].send_json(dict(message, tournamentToken=entry["token"]))
+            except Exception as e:
+                print(f"Fehler beim Senden an Spieler: {e}")
+
+    async def reclaim_tournaments(self, websocket: WebSocket):
+        """Neu verbundener Spieler (?tournament_token=...) übernimmt seinen Platz im laufenden Turnier"""
+        token = websocket.query_params.get("tournament_token")
+        manager = self.tournaments.reclaim(token, websocket)
+        if manager:
+            message = self.tournament_ready_message(manager)
+            message["results"] = manager.results
+            message["standings"] = manager.get_standings()
+            message["tournamentToken"] = token
+            await websocket.send_json(message)
+
+    def tournament_ready_message(self, manager) -> dict:
+        # Erstelle Player-Infos mit Tournament-Namen
+        player_infos = []
+        for e in manager.players:
+            player = e["player"]
+            info = {"tournament_name": player.name}
+            
+            # Füge das vollständige User-Profil hinzu, falls vorhanden
+            if hasattr(player, 'user_profile') and player.user_profile:
+                info["user_profile"] = player.user_profile
+                # Für einfacheren Zugriff auch den Username direkt hinzufügen
+                if "username" in player.user_profile:
+                    info["username"] = player.user_profile["username"]
+            
+            player_infos.append(info)
+
+        return {
+            "action": "tournament_ready",
+            "tournament_id": manager.tournament_id,
+            "format": manager.format,
+            "players": player_infos,
+            "round": manager.current_round,
+            "total_rounds": manager.total_rounds
+        }
             
 
-    async def start_tournament_matches(self):
-        if not self.tournament_manager:
+    async def start_tournament_matches(self, tournament_id):
+        manager = self.tournaments.get(tournament_id)
+        if not manager:
             #print("❌ Kein TournamentManager vorhanden.")
             return
 
-        #print("⏯️ Starte Matches aus dem gespeicherten TournamentManager")
-        matchups = self.tournament_manager.create_matchups()
-        # how many matchups are created? please print the number
-        #print(f"Anzahl der Matchups: {len(matchups)}")
-        #print(f"WARNING THIS SHOULD SHOW")
-
-        for p1_entry, p2_entry in matchups:
+        # Startet alle bereiten Matches; ein Match ist bereit, sobald seine beiden Zubringer entschieden sind
+        for match in manager.start_ready_matches():
+            p1_entry, p2_entry = match.players
             game_id = str(uuid.uuid4())
             settings = self.game_settings.get_settings()
             
@@ -361,19 +411,23 @@ class Menu:
             settings.update({
                 "mode": "online",
                 "is_tournament": True,
+                "tournament_id": manager.tournament_id,
                 "game_id": game_id,
                 "player1_name": p1_entry["player"].name,
                 "player2_name": p2_entry["player"].name,
-                "tournament_round": self.tournament_manager.current_round,
-                "tournament_totalRounds": self.tournament_manager.total_rounds,
+                "tournament_match_id": match.match_id,
+                "tournament_round": match.round,
+                "tournament_totalRounds": manager.total_rounds,
                 "tournament_players": [
                     {"tournament_name": entry["player"].name, 
                      "username": entry["player"].user_profile.get("username", entry["player"].name) if entry["player"].user_profile else entry["player"].name}
-                    for entry in self.tournament_manager.players
+                    for entry in manager.players
                 ],
                 "player1_profile": p1_profile,
                 "player2_profile": p2_profile
             })
+            await self.register_game(game_id, settings)
+            seats = self.game_server.assign_seats(game_id)
             #print(f"Settings in startmatches tournament: {settings}")
 
             # Übergib die Profile an den GameServer
@@ -393,25 +447,28 @@ class Menu:
             #print(f"Player 1: user_profile: {p1_profile}")
             #print(f"Player 2: user_profile: {p2_profile}")
 
-            # Verbinde TournamentManager mit dem GameServer
-            self.game_server.tournament_manager = self.tournament_manager
-
             try:
                 await p1_entry["websocket"].send_json({
                     "action": "game_found",
                     "game_id": game_id,
+                    "game_url": self.game_url(),
                     "settings": settings,
                     "player1": p1_entry["player"].name,
                     "player2": p2_entry["player"].name,
-                    "playerRole": "player1"
+                    "playerRole": "player1",
+                    "seatToken": seats["player1"],
+                    "tournamentToken": p1_entry["token"]
                 })
                 await p2_entry["websocket"].send_json({
                     "action": "game_found",
                     "game_id": game_id,
+                    "game_url": self.game_url(),
                     "settings": settings,
                     "player1": p1_entry["player"].name,
                     "player2": p2_entry["player"].name,
-                    "playerRole": "player2"
+                    "playerRole": "player2",
+                    "seatToken": seats["player2"],
+                    "tournamentToken": p2_entry["token"]
                 })
                 #print(f"🎮 Match gestartet: {p1_entry['player'].name} vs {p2_entry['player'].name}")
             except Exception as e:
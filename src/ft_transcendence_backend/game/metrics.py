@@ -0,0 +1,73 @@
+import asyncio
+import time
+from prometheus_client import Counter, Gauge, Histogram
+
+# Prometheus-Metriken des Game-Service, erreichbar unter /metrics (Job "game" in prometheus.yml)
+
+GAME_MODES = ("local", "ai", "online", "tournament")
+
+# Feine Buckets rund um das 60-Hz-Budget (16,7 ms)
+TICK_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.002, 0.004, 0.008, 0.0167, 0.033, 0.066, 0.1, 0.25)
+
+TICK_DURATION = Histogram(
+    "game_tick_duration_seconds", "Dauer eines Scheduler-Durchlaufs (Physik + Senden)", buckets=TICK_BUCKETS)
+TICK_OVERRUNS = Counter(
+    "game_tick_overruns_total", "Durchläufe, die länger als ein Tick gedauert haben")
+TICKS_DROPPED = Counter(
+    "game_ticks_dropped_total", "Verworfene Physik-Schritte, weil der Scheduler zu weit zurück lag")
+PHYSICS_STEP = Histogram(
+    "game_physics_step_seconds", "Physik-Schritt aller aktiven Spiele", buckets=TICK_BUCKETS)
+SERIALIZATION = Histogram(
+    "game_serialization_seconds", "Kodierung eines Spielzustands", ["protocol"], buckets=TICK_BUCKETS)
+SEND_LATENCY = Histogram(
+    "game_socket_send_seconds", "Senden eines Frames an einen Websocket", ["mode"], buckets=TICK_BUCKETS)
+FRAMES_DROPPED = Counter(
+    "game_frames_dropped_total", "Wegen voller Send-Queue verworfene Frames", ["mode"])
+EVENT_LOOP_LAG = Histogram(
+    "game_event_loop_lag_seconds", "Verspätung des Event-Loops gegenüber einem geplanten Wecker", buckets=TICK_BUCKETS)
+AI_DECISION = Histogram(
+    "game_ai_decision_seconds", "Dauer von AI.decide", ["difficulty"], buckets=TICK_BUCKETS)
+STATS_SUBMISSIONS = Counter(
+    "game_stats_submissions_total", "Spielergebnisse an die API (sent/retried/journaled/rejected)", ["result"])
+
+ACTIVE_GAMES = Gauge("game_active_games", "Laufende Spiele", ["mode"])
+CONNECTED_SOCKETS = Gauge("game_connected_sockets", "Verbundene /ws/game-Websockets", ["mode"])
+MATCHMAKING_QUEUE = Gauge("game_matchmaking_queue_length", "Spieler in der Online-Matchmaking-Queue")
+TOURNAMENT_QUEUE = Gauge("game_tournament_queue_length", "Spieler in den Turnier-Warteschlangen")
+ACTIVE_TOURNAMENTS = Gauge("game_active_tournaments", "Turniere im Registry (inkl. kürzlich beendeter)")
+STATS_QUEUE = Gauge("game_stats_queue_length", "Spielergebnisse, die auf das Senden an die API warten")
+SEND_QUEUE_DEPTH = Gauge("game_send_queue_depth", "Frames in den Send-Queues aller Websockets", ["mode"])
+SEND_QUEUE_MAX_DEPTH = Gauge("game_send_queue_max_depth", "Höchster Füllstand einer Send-Queue (verbundene Websockets)")
+
+
+def game_mode(settings: dict) -> str:
+    """Label für den Spielmodus: local, ai, online oder tournament"""
+    if settings.get("is_tournament"):
+        return "tournament"
+    mode = settings.get("mode", "local")
+    return mode if mode in GAME_MODES else "local"
+
+
+def register_state_gauges(game_server, menu):
+    """Gauges werden erst beim Scrape aus dem aktuellen Zustand berechnet"""
+    for mode in GAME_MODES:
+        ACTIVE_GAMES.labels(mode).set_function(
+            lambda mode=mode: sum(1 for m in game_server.game_modes.values() if m == mode))
+        CONNECTED_SOCKETS.labels(mode).set_function(
+            lambda mode=mode: sum(1 for c in game_server.connections.values() if c.mode == mode))
+        SEND_QUEUE_DEPTH.labels(mode).set_function(
+            lambda mode=mode: sum(c.depth for c in game_server.connections.values() if c.mode == mode))
+    SEND_QUEUE_MAX_DEPTH.set_function(
+        lambda: max((c.max_depth for c in game_server.connections.values()), default=0))
+    MATCHMAKING_QUEUE.set_function(lambda: len(menu.matchmaker))
+    TOURNAMENT_QUEUE.set_function(lambda: len(menu.tournaments.lobby_of))
+    ACTIVE_TOURNAMENTS.set_function(lambda: len(menu.tournaments))
+    STATS_QUEUE.set_function(lambda: game_server.stats_submitter.depth)
+
+
+async def monitor_event_loop_lag(interval: float = 0.25):
+    """Misst, wie viel später als geplant der Event-Loop einen Sleep beendet"""
+    while True:
+        start = time.monotonic()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(0.0, time.monotonic() - start - interval))
@@ -1,11 +1,16 @@
-from .player import Player, PlayerType, Controls
 import random
 import time
 import math
 
 class AI:
-    def __init__(self, difficulty: str = "medium"):
+    def __init__(self, difficulty: str = "medium", side: str = "player2", clock=time.time, rng=None):
         self.difficulty = difficulty
+        # Gesteuertes Paddle: im Spiel immer player2, in Simulationen auch player1
+        self.side = side
+        self.direction_sign = 1 if side == "player2" else -1
+        # Uhr und Zufall sind injizierbar, damit Simulationen nicht an die Wanduhr gebunden sind
+        self.clock = clock
+        self.rng = rng or random
         # Reaktionsgeschwindigkeit und Genauigkeit je nach Schwierigkeitsgrad
         self.reaction_speeds = {
             "easy": 0.3,      # Langsame Reaktion
@@ -20,9 +25,7 @@ class AI:
         
         self.speed = self.reaction_speeds[difficulty]
         self.error_margin = self.error_margins[difficulty]
-        self.last_update_time = time.time()
-        self.last_game_state = None
-        self.predicted_ball_pos = None
+        self.last_update_time = self.clock()
         self.decision_cooldown = 1.0  # 1 Sekunde Cooldown für Entscheidungen
         
         # Strategische Parameter
@@ -35,111 +38,78 @@ class AI:
         self.interpolation_factor = 0.0
         self.ball_moving_towards_ai = False
 
-    def predict_ball_position(self, game_state: dict) -> float:
-        """Berechnet die voraussichtliche Y-Position des Balls"""
-        if not self.last_game_state:
-            self.last_game_state = game_state
-            return game_state["ball"][1]
+        # Vorhersage-Cache: gültig solange sich die Ballrichtung (bis auf Wandabpraller) nicht ändert
+        self.cached_dx = None
+        self.cached_abs_dy = None
+        self.cached_intercept = 0.0
 
-        current_ball = game_state["ball"]
-        last_ball = self.last_game_state["ball"]
-        
-        # Berechne Bewegungsvektor des Balls
-        ball_velocity = [
-            current_ball[0] - last_ball[0],
-            current_ball[1] - last_ball[1]
-        ]
-
-        # Prädiktiere Position basierend auf Geschwindigkeit und Schwierigkeit
-        prediction_time = (1.0 - self.speed) * 2.0
-        predicted_y = current_ball[1] + (ball_velocity[1] * prediction_time)
-        
-        # Berücksichtige Wandkollisionen
-        if abs(predicted_y) > 1.0:
-            predicted_y = math.copysign(1.0, predicted_y)
-            
-        return predicted_y
+    def predict_intercept(self, game) -> float:
+        """
+        Berechnet geschlossen, auf welcher Höhe der Ball die Ebene des AI-Paddles
+        erreicht: Gerade bis zur Paddle-Ebene, Wandreflexionen per Modulo gefaltet.
+        Das Ergebnis bleibt gültig, bis ein Paddle-Treffer oder Ball-Reset die
+        Richtung ändert (Wandabpraller liegen bereits auf der gefalteten Bahn).
+        """
+        dx = game.ball_direction[0]
+        abs_dy = abs(game.ball_direction[1])
+        if dx == self.cached_dx and abs_dy == self.cached_abs_dy:
+            return self.cached_intercept
+
+        # Strecke entlang der Richtung bis zur Paddle-Ebene
+        distance = (self.direction_sign * game.PADDLE_X - game.ball_pos[0]) / dx
+        raw_y = game.ball_pos[1] + game.ball_direction[1] * distance
+
+        # Spiegelung an den Wänden bei ±1: Periode 4
+        folded = (raw_y + 1.0) % 4.0
+        intercept = folded - 1.0 if folded <= 2.0 else 3.0 - folded
 
-    def update_strategy(self, game_state: dict):
+        self.cached_dx = dx
+        self.cached_abs_dy = abs_dy
+        self.cached_intercept = intercept
+        return intercept
+
+    def update_strategy(self, game):
         """Aktualisiert die Spielstrategie basierend auf der Spielsituation"""
-        player2_score = game_state["player2"]["score"]
-        player1_score = game_state["player1"]["score"]
-        
+        own_score, opponent_score = self.scores(game)
+
         # Wechsel zu aggressivem Modus wenn hinten
-        self.aggressive_mode = player2_score < player1_score
-        
+        self.aggressive_mode = own_score < opponent_score
+
         # Passe Vorhersagegenauigkeit basierend auf Punktestand an
-        score_diff = abs(player2_score - player1_score)
+        score_diff = abs(own_score - opponent_score)
         if score_diff > 2:
             self.prediction_confidence = min(0.9, self.prediction_confidence + 0.1)
         else:
             self.prediction_confidence = max(0.6, self.prediction_confidence - 0.05)
 
-    def is_ball_moving_towards_ai(self, game_state: dict) -> bool:
-        """Überprüft, ob sich der Ball auf die AI zu bewegt"""
-        if not self.last_game_state:
-            return False
-            
-        current_ball_x = game_state["ball"][0]
-        last_ball_x = self.last_game_state["ball"][0]
-        
-        # Ball bewegt sich nach rechts (zur AI)
-        return current_ball_x > last_ball_x
-
-    def calculate_ball_intersection(self, game_state: dict) -> float:
-        """Berechnet den Punkt, wo der Ball das AI-Paddle treffen wird"""
-        if not self.last_game_state:
-            return game_state["ball"][1]
-            
-        current_ball = game_state["ball"]
-        last_ball = self.last_game_state["ball"]
-        
-        # Berechne Bewegungsvektor
-        dx = current_ball[0] - last_ball[0]
-        dy = current_ball[1] - last_ball[1]
-        
-        if dx == 0:
-            return current_ball[1]
-            
-        # Berechne die Steigung
-        slope = dy / dx
-        
-        # X-Position des AI-Paddles ist 0.95 (aus der PongGame-Klasse)
-        paddle_x = 0.95
-        
-        # Berechne Y-Position am Paddle
-        steps_to_paddle = (paddle_x - current_ball[0]) / dx
-        intersection_y = current_ball[1] + (dy * steps_to_paddle)
-        
-        # Berücksichtige Wandreflektionen
-        while abs(intersection_y) > 1.0:
-            if intersection_y > 1.0:
-                intersection_y = 2.0 - intersection_y
-            elif intersection_y < -1.0:
-                intersection_y = -2.0 - intersection_y
-                
-        return intersection_y
-
-    def calculate_move(self, game_state: dict) -> dict:
-        """Berechnet den nächsten Zug basierend auf Spielsituation und Strategie"""
-        current_time = time.time()
-        current_paddle_pos = game_state["player2"]["paddle"]["center"]
-        
+    def scores(self, game):
+        """(eigener Punktestand, Punktestand des Gegners)"""
+        if self.direction_sign > 0:
+            return game.player2.score, game.player1.score
+        return game.player1.score, game.player2.score
+
+    def decide(self, game) -> int:
+        """
+        Berechnet den nächsten Zug direkt aus den PongGame-Feldern.
+        Gibt die Paddle-Richtung zurück: 1, -1 oder 0 (für player2: ArrowLeft/ArrowRight/keine Taste).
+        """
+        current_time = self.clock()
+
         # Aktualisiere die Zielposition nur einmal pro Sekunde
         if current_time - self.last_update_time >= self.decision_cooldown:
             self.last_update_time = current_time
-            self.update_strategy(game_state)
-            
+            self.update_strategy(game)
+
             # Speichere die aktuelle Zielposition als Ausgangspunkt
             self.current_target = self.next_target
-            
-            # Überprüfe Ballrichtung
-            self.ball_moving_towards_ai = self.is_ball_moving_towards_ai(game_state)
-            
+
+            # Ball bewegt sich zur Seite der AI
+            self.ball_moving_towards_ai = game.ball_direction[0] * self.direction_sign > 0
+
             if self.ball_moving_towards_ai:
                 # Ball kommt auf AI zu: Berechne Schnittpunkt
-                predicted_y = self.calculate_ball_intersection(game_state)
-                
+                predicted_y = self.predict_intercept(game)
+
                 if self.aggressive_mode:
                     # Aggressiv: Leicht vor dem Ball positionieren
                     self.next_target = predicted_y * 1.1
@@ -149,46 +119,29 @@ class AI:
             else:
                 # Ball bewegt sich weg: Zurück zur Mitte
                 self.next_target = 0.0
-                
+
                 if self.aggressive_mode:
                     # Im aggressiven Modus: Bleibe etwas höher/tiefer als die Mitte
                     # basierend auf der Ballposition für schnellere Reaktion
-                    self.next_target += game_state["ball"][1] * 0.3
-            
+                    self.next_target += game.ball_pos[1] * 0.3
+
             # Füge menschliche Ungenauigkeit hinzu
             error_scale = 1.5 if self.aggressive_mode else 1.0
-            self.next_target += random.uniform(-self.error_margin, self.error_margin) * error_scale
-            self.last_game_state = game_state
+            self.next_target += self.rng.uniform(-self.error_margin, self.error_margin) * error_scale
             self.interpolation_factor = 0.0
 
         # Interpoliere zwischen aktueller und nächster Zielposition
         self.interpolation_factor = min(1.0, self.interpolation_factor + 0.05)
         current_target = (1.0 - self.interpolation_factor) * self.current_target + \
                         self.interpolation_factor * self.next_target
-        
-        # Erstelle simulierte Tasteneingaben
-        keys = self.get_empty_keys()
-        
+
         # Kontinuierliche Bewegung zum interpolierten Zielpunkt
         movement_threshold = 0.02
-        distance_to_target = current_target - current_paddle_pos
-        
-        if abs(distance_to_target) > movement_threshold:
-            if distance_to_target > 0:
-                keys['ArrowLeft'] = True
-            else:
-                keys['ArrowRight'] = True
-        
-        return {
-            "action": "key_update",
-            "keys": keys
-        }
+        paddle = game.player2 if self.direction_sign > 0 else game.player1
+        distance_to_target = current_target - paddle.paddle_pos
 
-    def get_empty_keys(self) -> dict:
-        """Gibt ein leeres Tastenstate zurück"""
-        return {
-            'a': False,
-            'd': False,
-            'ArrowLeft': False,
-            'ArrowRight': False
-        }
+        if distance_to_target > movement_threshold:
+            return 1    # ArrowLeft
+        if distance_to_target < -movement_threshold:
+            return -1   # ArrowRight
+        return 0
@@ -4,19 +4,12 @@ from typing import Dict, List
 from .player import Player, PlayerType, Controls
 import logging
 
-# Logger konfigurieren: Ausgabe in "game.log" (diesen Block kannst du bei Bedarf auskommentieren)
+# Spielzustände pro Tick werden nicht mehr geloggt, sondern (optional) vom ReplayRecorder aufgezeichnet
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
-if not logger.handlers:
-    handler = logging.FileHandler("game.log")
-    handler.setLevel(logging.DEBUG)  # Stelle sicher, dass auch DEBUG-Nachrichten geloggt werden
-    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
 
 
 class PongGame:
-    def __init__(self, settings: dict, player1: Player, player2: Player):
+    def __init__(self, settings: dict, player1: Player, player2: Player, rng=None):
         self.initial_ball_speed = settings.get("ball_speed", 5)  # Speichere initiale Geschwindigkeit
         self.ball_speed = self.initial_ball_speed  # Aktuelle Geschwindigkeit
         self.paddle_speed = settings.get("paddle_speed", 5)
@@ -35,6 +28,7 @@ class PongGame:
         }
 
         self.BALL_SPEED_SCALE = 0.003
+        self.REFERENCE_TICK = 1/60  # BALL_SPEED_SCALE ist pro 60-Hz-Tick definiert
         self.PADDLE_SPEED_SCALE = 0.0008  # Hier anpassen für feinere Kontrolle
 
         self.player1 = player1
@@ -49,6 +43,15 @@ class PongGame:
         self.PADDLE_HEIGHT = self.PADDLE_SIZES[settings.get("paddle_size", "middle")]
         self.PADDLE_X = 0.95
 
+        # Zufallsquelle für Ball-Resets; headless Simulationen übergeben ein geseedetes random.Random
+        self.rng = rng or random
+
+        # Optionaler ReplayRecorder (pro Spiel zuschaltbar), zeichnet jeden Tick binär auf
+        self.recorder = None
+
+        # BatchPhysicsEngine, wenn das Spiel dort registriert ist (ball_pos/ball_direction sind dann Views)
+        self.physics = None
+
     def start_game(self):
         self.game_active = True
         # Logger-Eintrag: Spielstart
@@ -56,21 +59,23 @@ class PongGame:
         logger.info("Spiel gestartet. Starte Ball-Reset.")
         # -------------------------------
         self.reset_ball()
+        if self.physics:
+            self.physics.sync(self)
 
     def reset_ball(self):
         self.ball_pos = [0.0, 0.0]
         self.ball_speed = self.initial_ball_speed  # Reset auf Anfangsgeschwindigkeit
 
         # Zufällige Startrichtung (±45 Grad, ggf. um 180° gedreht)
-        angle = random.uniform(-math.pi/4, math.pi/4)
-        if random.choice([True, False]):
+        angle = self.rng.uniform(-math.pi/4, math.pi/4)
+        if self.rng.choice([True, False]):
             angle += math.pi
 
         self.ball_direction = [math.cos(angle), math.sin(angle)]
 
         # Logger-Eintrag: Ball zurückgesetzt
         # -------------------------------
-        logger.debug(f"Ball zurückgesetzt: Position={self.ball_pos}, direction={self.ball_direction}, ball_speed={self.ball_speed}")
+        logger.debug("Ball zurückgesetzt: Position=%s, direction=%s, ball_speed=%s", self.ball_pos, self.ball_direction, self.ball_speed)
         # -------------------------------
 
     def move_paddle(self, player: Player, direction: float):
@@ -83,28 +88,17 @@ class PongGame:
         # Begrenze die Paddle-Position unter Berücksichtigung der Paddle-Höhe
         paddle_limit = 1.0 - self.PADDLE_HEIGHT/2
         player.paddle_pos = max(-paddle_limit, min(paddle_limit, new_pos))
-
-        # Logger-Eintrag: Paddle-Bewegung
-        # -------------------------------
-        logger.debug(f"Paddle von '{player.name}' bewegt: Richtung={direction}, Neue Position={player.paddle_pos}")
-        # -------------------------------
+        if self.physics:
+            self.physics.paddle_moved(self, player)
 
     def check_paddle_collision(self, paddle_pos: float, ball_x: float, ball_y: float) -> bool:
         # Berechne die tatsächlichen Paddle-Grenzen
         paddle_y_min = paddle_pos - self.PADDLE_HEIGHT/2
         paddle_y_max = paddle_pos + self.PADDLE_HEIGHT/2
 
-        collision = (ball_y >= paddle_y_min and
-                     ball_y <= paddle_y_max and
-                     abs(abs(ball_x) - self.PADDLE_X) <= self.PADDLE_WIDTH)
-
-        # Logger-Eintrag: Paddle-Kollision (nur wenn Kollision auftritt)
-        if collision:
-            # -------------------------------
-            logger.debug(f"Collision at: Ball({ball_x}, {ball_y}), Paddle Y range({paddle_y_min}, {paddle_y_max})")
-            # -------------------------------
-
-        return collision
+        return (ball_y >= paddle_y_min and
+                ball_y <= paddle_y_max and
+                abs(abs(ball_x) - self.PADDLE_X) <= self.PADDLE_WIDTH)
 
     def check_winner(self):
         if self.player1.score >= self.winning_score:
@@ -128,18 +122,19 @@ class PongGame:
             logger.info(f"Spiel gewonnen: Spieler '{self.player2.name}' mit Score {self.player2.score}")
             # -------------------------------
 
-    def update_game_state(self):
+    def update_game_state(self, dt: float = None):
+        """
+        Ein Physik-Schritt. `dt` in Sekunden (Default: ein 60-Hz-Tick); dank
+        Swept-Kollision bleibt das Spiel auch bei größeren Schritten korrekt.
+        """
         if not self.game_active:
-            state = self.get_game_state()
-            # Logger for maptplotlib
-            # -------------------------------
-            logger.info(f"Game State: {state}")
-            # -------------------------------
-            return state
+            return self.get_game_state()
 
-        scaled_speed = self.ball_speed * self.BALL_SPEED_SCALE
+        steps = 1.0 if dt is None else dt / self.REFERENCE_TICK
+        scaled_speed = self.ball_speed * self.BALL_SPEED_SCALE * steps
         next_x = self.ball_pos[0] + self.ball_direction[0] * scaled_speed
         next_y = self.ball_pos[1] + self.ball_direction[1] * scaled_speed
+        unclamped_y = next_y
 
         # Wand-Kollisionen
         if abs(next_y) >= 1.0:
@@ -147,75 +142,81 @@ class PongGame:
             next_y = max(-1.0, min(1.0, next_y))
             # Logger for maptplotlib
             # -------------------------------
-            logger.debug(f"Wandkollision: Neue vertikale Richtung {self.ball_direction[1]}")
+            logger.debug("Wandkollision: Neue vertikale Richtung %s", self.ball_direction[1])
             # -------------------------------
 
         hit_paddle = False
 
-        # Linkes Paddle (verbesserte Kollisionserkennung)
-        if next_x <= -self.PADDLE_X:
-            if self.check_paddle_collision(self.player1.paddle_pos, -self.PADDLE_X, next_y):
+        # Linkes Paddle: Swept-Test, ob die Bahn in diesem Tick die Paddle-Ebene kreuzt
+        if next_x <= -self.PADDLE_X < self.ball_pos[0]:
+            hit_y = self.sweep_y(-self.PADDLE_X, next_x, unclamped_y)
+            if self.check_paddle_collision(self.player1.paddle_pos, -self.PADDLE_X, hit_y):
                 hit_paddle = True
-                relative_intersect_y = (self.player1.paddle_pos - next_y) / (self.PADDLE_HEIGHT/2)
-                bounce_angle = relative_intersect_y * math.pi/3
-
-                self.ball_direction = [abs(math.cos(bounce_angle)), -math.sin(bounce_angle)]
-                next_x = -self.PADDLE_X + self.PADDLE_WIDTH
-                # Logger for maptplotlib
-                # -------------------------------
-                logger.debug(f"Linke Paddle-Kollision: Bounce-Winkel={bounce_angle}, Neue Richtung={self.ball_direction}")
-                # -------------------------------
-                
-                # Erhöhe Geschwindigkeit nach Paddle-Treffer
-                self.increase_ball_speed()
-
-        # Rechtes Paddle (verbesserte Kollisionserkennung)
-        elif next_x >= self.PADDLE_X:
-            if self.check_paddle_collision(self.player2.paddle_pos, self.PADDLE_X, next_y):
+                next_x = self.paddle_bounce(self.player1, hit_y)
+                next_y = hit_y
+
+        # Rechtes Paddle
+        elif next_x >= self.PADDLE_X > self.ball_pos[0]:
+            hit_y = self.sweep_y(self.PADDLE_X, next_x, unclamped_y)
+            if self.check_paddle_collision(self.player2.paddle_pos, self.PADDLE_X, hit_y):
                 hit_paddle = True
-                relative_intersect_y = (self.player2.paddle_pos - next_y) / (self.PADDLE_HEIGHT/2)
-                bounce_angle = relative_intersect_y * math.pi/3
-
-                self.ball_direction = [-abs(math.cos(bounce_angle)), -math.sin(bounce_angle)]
-                next_x = self.PADDLE_X - self.PADDLE_WIDTH
-                # Logger for maptplotlib
-                # -------------------------------
-                logger.debug(f"Rechte Paddle-Kollision: Bounce-Winkel={bounce_angle}, Neue Richtung={self.ball_direction}")
-                # -------------------------------
-                # Erhöhe Geschwindigkeit nach Paddle-Treffer
-                self.increase_ball_speed()
+                next_x = self.paddle_bounce(self.player2, hit_y)
+                next_y = hit_y
 
         if not hit_paddle:
             if next_x < -1.0:
-                self.player2.score += 1
-                self.check_winner()
-                self.reset_ball()
-                state = self.get_game_state()
-                # Logger for maptplotlib
-                # -------------------------------
-                logger.info(f"Score: Spieler '{self.player2.name}' erzielt einen Punkt. Neuer Score: {self.player2.score}")
-                logger.info(f"Game State: {state}")
-                # -------------------------------
-                return state
+                self.score_point(self.player2)
+                return self.get_game_state()
             elif next_x > 1.0:
-                self.player1.score += 1
-                self.check_winner()
-                self.reset_ball()
-                state = self.get_game_state()
-                # Logger for maptplotlib
-                # -------------------------------
-                logger.info(f"Score: Spieler '{self.player1.name}' erzielt einen Punkt. Neuer Score: {self.player1.score}")
-                logger.info(f"Game State: {state}")
-                # -------------------------------
-                return state
+                self.score_point(self.player1)
+                return self.get_game_state()
 
         self.ball_pos = [next_x, next_y]
-        state = self.get_game_state()
+        if self.recorder:
+            self.recorder.record(self)
+        return self.get_game_state()
+
+    def sweep_y(self, plane_x: float, next_x: float, next_y: float) -> float:
+        """
+        Y-Position, an der die Ballbahn dieses Ticks die Ebene x = plane_x schneidet
+        (exakter Zeitpunkt des Aufpralls, Wandreflexion eingerechnet)
+        """
+        t = (plane_x - self.ball_pos[0]) / (next_x - self.ball_pos[0])
+        hit_y = self.ball_pos[1] + (next_y - self.ball_pos[1]) * t
+        if hit_y > 1.0:
+            hit_y = 2.0 - hit_y
+        elif hit_y < -1.0:
+            hit_y = -2.0 - hit_y
+        return hit_y
+
+    def paddle_bounce(self, player: Player, next_y: float) -> float:
+        """Lenkt den Ball am Paddle ab und gibt die neue X-Position zurück"""
+        relative_intersect_y = (player.paddle_pos - next_y) / (self.PADDLE_HEIGHT/2)
+        bounce_angle = relative_intersect_y * math.pi/3
+
+        if player is self.player1:
+            self.ball_direction = [abs(math.cos(bounce_angle)), -math.sin(bounce_angle)]
+            next_x = -self.PADDLE_X + self.PADDLE_WIDTH
+        else:
+            self.ball_direction = [-abs(math.cos(bounce_angle)), -math.sin(bounce_angle)]
+            next_x = self.PADDLE_X - self.PADDLE_WIDTH
         # Logger for maptplotlib
         # -------------------------------
-        logger.info(f"Game State: {state}")
+        logger.debug("Paddle-Kollision (%s): Bounce-Winkel=%s, Neue Richtung=%s", player.name, bounce_angle, self.ball_direction)
         # -------------------------------
-        return state
+
+        # Erhöhe Geschwindigkeit nach Paddle-Treffer
+        self.increase_ball_speed()
+        return next_x
+
+    def score_point(self, player: Player):
+        """Punkt für `player`, prüft auf Sieg und setzt den Ball zurück"""
+        player.score += 1
+        self.check_winner()
+        self.reset_ball()
+        logger.info(f"Score: Spieler '{player.name}' erzielt einen Punkt. Neuer Score: {player.score}")
+        if self.recorder:
+            self.recorder.record(self)
 
     def get_paddle_positions(self, player: Player) -> dict:
         """Berechnet die genauen Y-Koordinaten für ein Paddle"""
@@ -229,8 +230,8 @@ class PongGame:
 
     def get_game_state(self):
         state = {
-            "ball": self.ball_pos,
-            "ball_direction": self.ball_direction,
+            "ball": list(self.ball_pos),
+            "ball_direction": list(self.ball_direction),
             "ball_speed": self.ball_speed * self.BALL_SPEED_SCALE,  # Füge Ballgeschwindigkeit hinzu
             "player1": {
                 "paddle": self.get_paddle_positions(self.player1),
@@ -248,16 +249,24 @@ class PongGame:
         if self.winner:
             state["winner"] = {
                 "name": self.winner.name,
+                "role": "player1" if self.winner is self.player1 else "player2",
                 "score": self.winner.score,
                 "user_profile": self.winner.user_profile
             }
 
         return state
 
+    def to_snapshot(self) -> dict:
+        """
+        Kompakter Zustand für die Wiederherstellung nach einem Neustart. Gespeichert wird an
+        Punktgrenzen: Ball und Geschwindigkeit werden beim Fortsetzen ohnehin neu aufgesetzt.
+        """
+        return {"players": [self.player1.to_snapshot(), self.player2.to_snapshot()]}
+
     def increase_ball_speed(self):
         """Erhöht die Ballgeschwindigkeit nach einem Paddle-Treffer"""
         self.ball_speed = min(
             self.MAX_BALL_SPEED,
             self.ball_speed * (1 + self.SPEED_INCREASE)
         )
-        logger.debug(f"Ball speed increased to: {self.ball_speed}")
+        logger.debug("Ball speed increased to: %s", self.ball_speed)
@@ -25,3 +25,26 @@ class Player:
     def __post_init__(self):
         if self.player_type == PlayerType.HUMAN and self.controls is None:
             raise ValueError("Human players must have controls assigned")
+
+    def to_snapshot(self) -> dict:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "type": self.player_type.value,
+            "controls": self.controls.name if self.controls else None,
+            "score": self.score,
+            "paddle_pos": self.paddle_pos,
+            "user_profile": self.user_profile,
+        }
+
+    @classmethod
+    def from_snapshot(cls, data: dict) -> "Player":
+        return cls(
+            id=data["id"],
+            name=data["name"],
+            player_type=PlayerType(data["type"]),
+            controls=Controls[data["controls"]] if data.get("controls") else None,
+            score=data.get("score", 0),
+            paddle_pos=data.get("paddle_pos", 0.0),
+            user_profile=data.get("user_profile"),
+        )
@@ -1,9 +1,14 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Response
+from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
+import asyncio
 from menu import Menu
 from game_server import GameServer
 import uuid
 import logging
 from settings import LOGGING
+from metrics import register_state_gauges, monitor_event_loop_lag
+from game_directory import CLUSTER_ENABLED, GameDirectory, create_redis
+from snapshots import SNAPSHOTS_ENABLED, SnapshotStore
 
 # Configure logging
 logging.config.dictConfig(LOGGING)
@@ -15,8 +20,40 @@ logger.info("GAME! test Game application starting up...")
 logger.warning("GAME! test This is a warning message")
 
 app = FastAPI()
-menu = Menu()
 game_server = GameServer()
+if CLUSTER_ENABLED:
+    # Mehrere Worker: Spielverzeichnis und Matchmaking-Queue liegen in Redis
+    game_server.directory = GameDirectory(create_redis())
+menu = Menu(game_server)  # Menü-Sessions pro Verbindung/Nutzer, Settings pro game_id im GameServer
+# Spiel- und Turnierstände in Redis sichern, damit ein Neustart sie nicht verliert
+snapshots = SnapshotStore(create_redis()) if SNAPSHOTS_ENABLED else None
+
+# Prometheus-Metriken (Tick-Dauer, Physik, Serialisierung, Senden, Event-Loop-Lag, ...)
+register_state_gauges(game_server, menu)
+
+@app.on_event("startup")
+async def start_event_loop_monitor():
+    asyncio.create_task(monitor_event_loop_lag())
+    if game_server.directory:
+        game_server.directory.start()
+    if snapshots:
+        try:
+            recovery_time = await snapshots.restore(game_server, menu.tournaments)
+            logger.info(f"Restored {len(game_server.active_games)} games and {len(menu.tournaments)} "
+                        f"tournaments from snapshots in {recovery_time * 1000:.1f} ms")
+            if game_server.directory:
+                # Die Worker-id ändert sich beim Neustart: wiederhergestellte Spiele neu eintragen
+                for game_id in game_server.active_games:
+                    await game_server.directory.register_game(game_id, game_server.get_game_settings(game_id, {}))
+        except Exception as e:
+            logger.error(f"Restoring snapshots failed: {e}")
+        snapshots.start(game_server, menu.tournaments)
+    # Spielergebnisse: Queue + Journal-Replay (falls beim letzten Lauf das Backend nicht erreichbar war)
+    game_server.stats_submitter.start()
+
+@app.on_event("shutdown")
+async def flush_game_stats():
+    await game_server.stats_submitter.stop()
 
 # Füge eine Basic-Route hinzu
 @app.get("/")
@@ -24,11 +61,29 @@ async def root():
     #print("health check received")
     return {"status": "Game Server running"}
 
+@app.get("/metrics")
+async def metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+@app.get("/stats")
+async def stats():
+    return {
+        "scheduler": game_server.scheduler.get_stats(),
+        "connections": game_server.get_connection_stats(),
+        "snapshot_recovery_seconds": snapshots.last_recovery if snapshots else None,
+    }
+
 @app.websocket("/ws/menu")
 async def websocket_menu(websocket: WebSocket):
     await websocket.accept()
     
     try:
+        # Menü-Session über Reconnects: Token vom Server, der Client schickt es als ?session= zurück
+        session_token = menu.open_session(websocket)
+        if session_token:
+            await websocket.send_json({"action": "menu_session", "session_token": session_token})
+        # Nach einem Neustart: Turnierplatz per Platz-Token an die neue Verbindung binden
+        await menu.reclaim_tournaments(websocket)
         while True:
             data = await websocket.receive_json()
             #print(f"WebSocket received data: {data}")  # Debug
@@ -39,32 +94,43 @@ async def websocket_menu(websocket: WebSocket):
             
             elif data["action"] == "update_settings":
                 #print(f"Updating settings with: {data}")
-                response = await menu.update_settings(data["settings"])
+                response = await menu.update_settings(websocket, data["settings"])
                 await websocket.send_json(response)
 
             elif data["action"] == "menu_selection":
                 user_profile = data.get("userProfile")
-                response = await menu.handle_menu_selection(websocket, data["selection"], userProfile=user_profile)
+                response = await menu.handle_menu_selection(websocket, data["selection"], userProfile=user_profile,
+                                                            tournament_size=data.get("tournament_size"),
+                                                            tournament_format=data.get("tournament_format"))
                 if response:
                     await websocket.send_json(response)
 
             elif data["action"] == "start_tournament_now":
                 #print("🎯 Received start_tournament_now")
-                await menu.start_tournament_matches()
+                await menu.start_tournament_matches(data.get("tournament_id"))
 
             elif data["action"] == "tournament_result":
+                # Jedes Turnier hat eine eigene id; unbekannte/abgelaufene ids werden ignoriert
+                tournament = menu.tournaments.get(data.get("tournament_id"))
+                if not tournament:
+                    continue
                 winner_name = data.get("winner") # Nennen wir es winner_name zur Klarheit
                 #print(f"✅ Received tournament result for match winner: {winner_name}")
                 
-                # Ergebnis im Manager speichern (kann intern prüfen, ob es doppelt ist)
-                menu.tournament_manager.record_result(winner_name) 
+                # Zählt nur für das offene Match und nur vom Token eines seiner Spieler
+                # (beide Clients melden; die spätere Meldung des Verlierers wird ignoriert)
+                next_match = tournament.report_result(winner_name, data.get("tournament_match_id"),
+                                                      data.get("tournament_token"), data.get("winner_role"))
+                if next_match:
+                    # Beide Zubringer entschieden: Folgematch sofort starten, ohne auf die restliche Runde zu warten
+                    await menu.start_tournament_matches(tournament.tournament_id)
 
                 # --- NEU: Direkt nach dem Speichern prüfen, ob das Turnier jetzt beendet ist ---
-                is_finished_now = menu.tournament_manager.is_finished()
+                is_finished_now = tournament.is_finished()
                 final_tournament_winner = None
                 if is_finished_now:
-                    winner_return_value = menu.tournament_manager.get_winner() 
-                    #print(f"DEBUG: menu.tournament_manager.get_winner() was called.")
+                    winner_return_value = tournament.get_winner() 
+                    #print(f"DEBUG: tournament.get_winner() was called.")
                     #print(f"DEBUG: Return value of get_winner() = '{winner_return_value}' (Type: {type(winner_return_value)})")
 
                     # Weise das Ergebnis der Variable zu
@@ -73,9 +139,9 @@ async def websocket_menu(websocket: WebSocket):
                 # --- Ende Prüfung ---
 
                 # Aktuelle Daten für das Update holen
-                current_results = menu.tournament_manager.results
-                current_round = menu.tournament_manager.current_round
-                total_rounds = menu.tournament_manager.total_rounds
+                current_results = tournament.results
+                current_round = tournament.current_round
+                total_rounds = tournament.total_rounds
                 
                 # Aktuelle/Nächste Matchups bestimmen (oder leer, wenn fertig)
                 # (Diese Logik ggf. anpassen, je nachdem wie active_matches/nächste Runde bestimmt wird)
@@ -85,18 +151,21 @@ async def websocket_menu(websocket: WebSocket):
                      current_matchups = [{ 
                          "player1": p1["player"].name, 
                          "player2": p2["player"].name 
-                     } for p1, p2 in menu.tournament_manager.active_matches] # Oder eine andere Logik hier
+                     } for p1, p2 in tournament.active_matches] # Oder eine andere Logik hier
                 
                 players_data = [
                     {
                         "username": e["player"].user_profile.get("username", e["player"].name),
                         "tournament_name": e["player"].name
-                    } for e in menu.tournament_manager.players
+                    } for e in tournament.players
                 ]
 
                 # --- Nachricht VOR der Schleife zusammenbauen ---
                 message_payload = {
                     "action": "update_tournament_results",
+                    "tournament_id": tournament.tournament_id,
+                    "format": tournament.format,
+                    "standings": tournament.get_standings(),
                     "results": current_results,
                     "round": current_round,
                     "total_rounds": total_rounds,
@@ -108,13 +177,14 @@ async def websocket_menu(websocket: WebSocket):
                 # --- NEU: Turniersieger zum Payload hinzufügen, wenn fertig ---
                 if is_finished_now:
                     message_payload["tournament_winner"] = final_tournament_winner
+                    menu.tournaments.mark_finished(tournament.tournament_id)
                 # --- Ende Hinzufügen ---
                 
                 # Debug Log vor dem Senden
                 #print(f"DEBUG: Broadcasting update_tournament_results Payload: {message_payload}")
 
                 # Broadcast an alle Spieler im Turnier
-                for entry in menu.tournament_manager.players:
+                for entry in tournament.players:
                     try:
                         # Sende den vorbereiteten Payload
                         await entry["websocket"].send_json(message_payload) 
@@ -128,28 +198,29 @@ async def websocket_menu(websocket: WebSocket):
 
             elif data["action"] == "start_next_round":
                 #print("🎯 Nächste Turnierrunde wird gestartet")
+                tournament = menu.tournaments.get(data.get("tournament_id"))
+                if not tournament:
+                    continue
                 
-                # Prüfen, ob alle Spiele der aktuellen Runde abgeschlossen sind
-                if len(menu.tournament_manager.results) == len(menu.tournament_manager.active_matches):
-                    # Nächste Runde starten
-                    matchups = menu.tournament_manager.next_round()
-                    
-                    # Wenn das Turnier noch nicht beendet ist
-                    if not menu.tournament_manager.is_finished():
-                        await menu.start_tournament_matches()
-                    else:
-                        # Turnier ist beendet, Gewinner verkünden
-                        winner = menu.tournament_manager.get_winner()
-                        for entry in menu.tournament_manager.players:
-                            try:
-                                await entry["websocket"].send_json({
-                                    "action": "tournament_finished",
-                                    "winner": winner,
-                                    "tournament_winner": winner,
-                                    "match_history": menu.tournament_manager.get_match_history()
-                                })
-                            except Exception as e:
-                                print(f"❌ Fehler beim Senden an {entry['player'].name}: {e}")
+                # Matches starten automatisch, sobald ihre Zubringer entschieden sind;
+                # hier nur noch bereite Matches nachstarten (idempotent) oder das Ende verkünden
+                if not tournament.is_finished():
+                    await menu.start_tournament_matches(tournament.tournament_id)
+                else:
+                    # Turnier ist beendet, Gewinner verkünden
+                    winner = tournament.get_winner()
+                    for entry in tournament.players:
+                        try:
+                            await entry["websocket"].send_json({
+                                "action": "tournament_finished",
+                                "tournament_id": tournament.tournament_id,
+                                "winner": winner,
+                                "tournament_winner": winner,
+                                "match_history": tournament.get_match_history()
+                            })
+                        except Exception as e:
+                            print(f"❌ Fehler beim Senden an {entry['player'].name}: {e}")
+                    menu.tournaments.mark_finished(tournament.tournament_id)
 
     except WebSocketDisconnect:
         pass
@@ -159,11 +230,24 @@ async def websocket_menu(websocket: WebSocket):
             await websocket.close()
         except RuntimeError:
             pass
+    finally:
+        # Getrennte Clients nicht weiter im Online-Matchmaking oder in Turnier-Warteschlangen halten
+        menu.matchmaker.cancel(websocket)
+        menu.tournaments.leave(websocket)
+        menu.close_session(websocket)
 
 @app.websocket("/ws/game/{game_id}")
 async def websocket_game(websocket: WebSocket, game_id: str):
-    # Die Settings vom Menü direkt verwenden, nicht neu holen
-    settings = menu.get_current_settings()
+    # Settings wurden beim Erstellen des Spiels im Menü unter der game_id hinterlegt
+    redirect_url, settings = await game_server.route_game(game_id)
+    if redirect_url is not None:
+        # Spiel läuft auf einem anderen Worker: Client dorthin schicken
+        await websocket.accept()
+        await websocket.send_json({"action": "redirect", "game_id": game_id, "game_url": redirect_url})
+        await websocket.close()
+        return
+    if settings is None:
+        settings = menu.game_settings.get_settings()
     
     # Debug print
     #print("\n=== Websocket Game Settings ===")
@@ -0,0 +1,146 @@
+import json
+import struct
+
+# Aushandlung über /ws/game/{game_id}?protocol=binary – ohne Parameter bleibt es bei JSON
+PROTOCOL_JSON = "json"
+PROTOCOL_BINARY = "binary"
+PROTOCOLS = (PROTOCOL_JSON, PROTOCOL_BINARY)
+
+# Binärer Tick-Frame (little endian):
+#   Header: u8 frame_type | u32 seq | u16 field_mask
+#   danach nur die Felder, deren Bit in field_mask gesetzt ist (in dieser Reihenfolge)
+FRAME_DELTA = 1
+FRAME_FULL = 2
+
+HEADER = struct.Struct("<BIH")
+
+FIELD_BALL = 1 << 0             # 2 x f32: x, y
+FIELD_BALL_DIRECTION = 1 << 1   # 2 x f32: dx, dy
+FIELD_BALL_SPEED = 1 << 2       # f32
+FIELD_PADDLE1 = 1 << 3          # f32: center
+FIELD_PADDLE2 = 1 << 4          # f32: center
+FIELD_SCORES = 1 << 5           # 2 x u16
+FIELD_FLAGS = 1 << 6            # u8: bit0 game_active, bit1 winner vorhanden
+FIELD_INPUT_SEQ = 1 << 7        # 2 x u32: zuletzt angewendete Eingabe von player1, player2
+ALL_FIELDS = (1 << 8) - 1
+
+FIELD_LAYOUT = (
+    (FIELD_BALL, struct.Struct("<ff")),
+    (FIELD_BALL_DIRECTION, struct.Struct("<ff")),
+    (FIELD_BALL_SPEED, struct.Struct("<f")),
+    (FIELD_PADDLE1, struct.Struct("<f")),
+    (FIELD_PADDLE2, struct.Struct("<f")),
+    (FIELD_SCORES, struct.Struct("<HH")),
+    (FIELD_FLAGS, struct.Struct("<B")),
+    (FIELD_INPUT_SEQ, struct.Struct("<II")),
+)
+
+FLAG_GAME_ACTIVE = 1 << 0
+FLAG_WINNER = 1 << 1
+
+
+def negotiate_protocol(requested) -> str:
+    """Gibt das unterstützte Protokoll zurück, Fallback ist JSON für alte Clients"""
+    if requested in PROTOCOLS:
+        return requested
+    return PROTOCOL_JSON
+
+
+def state_fields(state: dict) -> dict:
+    """Extrahiert die pro Tick veränderlichen Werte aus einem get_game_state()-Dict"""
+    flags = 0
+    if state.get("game_active"):
+        flags |= FLAG_GAME_ACTIVE
+    if state.get("winner"):
+        flags |= FLAG_WINNER
+    # Im lokalen Modus steuert die Rolle "both" beide Paddles
+    input_seq = state.get("input_seq", {})
+    both = input_seq.get("both", 0)
+    return {
+        FIELD_BALL: (state["ball"][0], state["ball"][1]),
+        FIELD_BALL_DIRECTION: (state["ball_direction"][0], state["ball_direction"][1]),
+        FIELD_BALL_SPEED: (state["ball_speed"],),
+        FIELD_PADDLE1: (state["player1"]["paddle"]["center"],),
+        FIELD_PADDLE2: (state["player2"]["paddle"]["center"],),
+        FIELD_SCORES: (state["player1"]["score"], state["player2"]["score"]),
+        FIELD_FLAGS: (flags,),
+        FIELD_INPUT_SEQ: (input_seq.get("player1", both), input_seq.get("player2", both)),
+    }
+
+
+def static_fields(state: dict) -> dict:
+    """Felder, die sich selten ändern und nur im Keyframe (JSON) übertragen werden"""
+    p1_paddle = state["player1"]["paddle"]
+    static = {
+        "player1": {"name": state["player1"]["name"]},
+        "player2": {"name": state["player2"]["name"]},
+        "paddle_height": p1_paddle["bottom"] - p1_paddle["top"],
+    }
+    if state.get("winner"):
+        static["winner"] = state["winner"]
+    return static
+
+
+class StateEncoder:
+    """
+    Kodiert Spielzustände eines Spiels in kompakte Binär-Frames.
+
+    Delta-Frames enthalten nur Felder, die sich seit dem letzten Frame geändert
+    haben. Keyframes mit den statischen Feldern (Namen, Paddle-Höhe, Gewinner)
+    werden nur bei Änderung erzeugt.
+    """
+
+    def __init__(self):
+        self.seq = 0
+        self.last_fields = None
+        self.last_static = None
+
+    def encode(self, state: dict):
+        """Gibt (keyframe oder None, delta_frame, full_frame) für einen Tick zurück"""
+        self.seq = (self.seq + 1) & 0xFFFFFFFF
+        fields = state_fields(state)
+
+        keyframe = None
+        static = static_fields(state)
+        if static != self.last_static:
+            self.last_static = static
+            keyframe = self.encode_keyframe(static)
+
+        if self.last_fields is None:
+            mask = ALL_FIELDS
+        else:
+            mask = 0
+            for bit, values in fields.items():
+                if self.last_fields[bit] != values:
+                    mask |= bit
+        self.last_fields = fields
+
+        return keyframe, self._pack(FRAME_DELTA, mask, fields), self._pack(FRAME_FULL, ALL_FIELDS, fields)
+
+    def current_keyframe(self):
+        """Keyframe für neu verbundene Clients"""
+        if self.last_static is None:
+            return None
+        return self.encode_keyframe(self.last_static)
+
+    def encode_keyframe(self, static: dict) -> str:
+        return json.dumps({"type": "keyframe", "seq": self.seq, **static})
+
+    def _pack(self, frame_type: int, mask: int, fields: dict) -> bytes:
+        parts = [HEADER.pack(frame_type, self.seq, mask)]
+        for bit, layout in FIELD_LAYOUT:
+            if mask & bit:
+                parts.append(layout.pack(*fields[bit]))
+        return b"".join(parts)
+
+
+def decode_frame(data: bytes) -> dict:
+    """Dekodiert einen Binär-Frame (für Tests, Benchmarks und Tools)"""
+    frame_type, seq, mask = HEADER.unpack_from(data, 0)
+    offset = HEADER.size
+    values = {}
+    for bit, layout in FIELD_LAYOUT:
+        if mask & bit:
+            values[bit] = layout.unpack_from(data, offset)
+            offset += layout.size
+    return {"type": frame_type, "seq": seq, "mask": mask, "fields": values}
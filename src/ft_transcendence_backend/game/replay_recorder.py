@@ -0,0 +1,184 @@
+import os
+import queue
+import struct
+import threading
+import logging
+
+logger = logging.getLogger('game')
+
+REPLAY_DIR = os.environ.get("GAME_REPLAY_DIR", "/app/logs/replays")
+REPLAY_ENABLED = os.environ.get("GAME_REPLAY_ENABLED", "0") == "1"
+
+# Dateiformat (little endian):
+#   Header: 8s magic | u16 version | f32 paddle_height | u16 len + name1 | u16 len + name2
+#   danach Tick-Records fester Länge
+MAGIC = b"PONGRPL1"
+VERSION = 1
+HEADER = struct.Struct("<8sHf")
+NAME_LEN = struct.Struct("<H")
+# u32 tick | f32 ball_x | f32 ball_y | f32 paddle1 | f32 paddle2 | f32 ball_speed | u16 score1 | u16 score2 | u8 flags
+RECORD = struct.Struct("<IfffffHHB")
+
+FLAG_GAME_ACTIVE = 1 << 0
+FLAG_WINNER_PLAYER1 = 1 << 1
+FLAG_WINNER_PLAYER2 = 1 << 2
+
+
+class ReplayWriter:
+    """
+    Hintergrund-Thread, der Replay-Chunks aus einer Queue auf die Platte schreibt
+    (wie logging.handlers.QueueHandler/QueueListener). Der Game-Loop legt nur
+    fertige Bytes in die Queue und blockiert nie; ist sie voll, wird verworfen.
+    """
+
+    def __init__(self, directory: str = REPLAY_DIR, max_chunks: int = 1024):
+        self.directory = directory
+        self.queue = queue.Queue(maxsize=max_chunks)
+        self.thread = None
+        self.dropped_chunks = 0
+
+    def start(self):
+        if self.thread is None or not self.thread.is_alive():
+            os.makedirs(self.directory, exist_ok=True)
+            self.thread = threading.Thread(target=self._run, name="replay-writer", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        if self.thread is not None:
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
+
+    def enqueue(self, game_id: str, chunk: bytes, header: bytes = b""):
+        """header wird nur in eine leere Datei geschrieben (ein wiederhergestelltes Spiel hängt nur Records an)"""
+        try:
+            self.queue.put_nowait((game_id, header, chunk))
+        except queue.Full:
+            self.dropped_chunks += 1
+
+    def path_for(self, game_id: str) -> str:
+        return os.path.join(self.directory, f"{game_id}.replay")
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            game_id, header, chunk = item
+            try:
+                with open(self.path_for(game_id), "ab") as f:
+                    if header and f.tell() == 0:
+                        f.write(header)
+                    f.write(chunk)
+            except OSError as e:
+                logger.error(f"Error writing replay for game {game_id}: {e}")
+
+
+_writer = None
+
+
+def get_replay_writer() -> ReplayWriter:
+    """Gemeinsamer Writer-Thread für alle Spiele des Prozesses"""
+    global _writer
+    if _writer is None:
+        _writer = ReplayWriter()
+        _writer.start()
+    return _writer
+
+
+class ReplayRecorder:
+    """
+    Hält die Tick-Records eines Spiels in einem festen Ringpuffer. Alle
+    `flush_every` Ticks (und bei Spielende) wird der noch nicht geschriebene
+    Teil als ein Chunk an den ReplayWriter übergeben.
+    """
+
+    def __init__(self, game_id: str, game, writer: ReplayWriter = None, capacity: int = 600, flush_every: int = 120):
+        self.game_id = game_id
+        self.writer = writer or get_replay_writer()
+        self.capacity = capacity
+        self.flush_every = min(flush_every, capacity)
+        self.buffer = bytearray(RECORD.size * capacity)
+        self.tick = 0
+        self.flushed_tick = 0
+        # Header erst beim ersten Flush: bis dahin benennt player_info die Spieler noch um
+        self.game = game
+        self.header = None
+
+    def build_header(self) -> bytes:
+        name1 = self.game.player1.name.encode("utf-8")
+        name2 = self.game.player2.name.encode("utf-8")
+        return b"".join([
+            HEADER.pack(MAGIC, VERSION, self.game.PADDLE_HEIGHT),
+            NAME_LEN.pack(len(name1)), name1,
+            NAME_LEN.pack(len(name2)), name2,
+        ])
+
+    def record(self, game):
+        flags = FLAG_GAME_ACTIVE if game.game_active else 0
+        if game.winner is game.player1:
+            flags |= FLAG_WINNER_PLAYER1
+        elif game.winner is game.player2:
+            flags |= FLAG_WINNER_PLAYER2
+
+        RECORD.pack_into(
+            self.buffer, (self.tick % self.capacity) * RECORD.size,
+            self.tick, game.ball_pos[0], game.ball_pos[1],
+            game.player1.paddle_pos, game.player2.paddle_pos,
+            game.ball_speed, game.player1.score, game.player2.score, flags,
+        )
+        self.tick += 1
+
+        if self.tick - self.flushed_tick >= self.flush_every or not game.game_active:
+            self.flush()
+
+    def flush(self):
+        """Übergibt alle seit dem letzten Flush aufgezeichneten Records an den Writer"""
+        if self.tick == self.flushed_tick:
+            return
+        start = self.flushed_tick % self.capacity
+        end = self.tick % self.capacity
+        if start < end:
+            chunk = bytes(self.buffer[start * RECORD.size:end * RECORD.size])
+        else:
+            chunk = bytes(self.buffer[start * RECORD.size:]) + bytes(self.buffer[:end * RECORD.size])
+        self.flushed_tick = self.tick
+        if self.header is None:
+            self.header = self.build_header()
+        # Header bei jedem Chunk mitgeben: der Writer schreibt ihn nur, solange die Datei leer ist,
+        # auch wenn der erste Chunk verworfen wurde
+        self.writer.enqueue(self.game_id, chunk, self.header)
+
+
+def read_replay(path: str) -> dict:
+    """Liest eine Replay-Datei: {"paddle_height", "player1", "player2", "records": [...]}"""
+    with open(path, "rb") as f:
+        data = f.read()
+
+    magic, version, paddle_height = HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a replay file")
+    offset = HEADER.size
+    names = []
+    for _ in range(2):
+        (length,) = NAME_LEN.unpack_from(data, offset)
+        offset += NAME_LEN.size
+        names.append(data[offset:offset + length].decode("utf-8"))
+        offset += length
+
+    records = []
+    for values in RECORD.iter_unpack(data[offset:offset + (len(data) - offset) // RECORD.size * RECORD.size]):
+        tick, ball_x, ball_y, paddle1, paddle2, ball_speed, score1, score2, flags = values
+        records.append({
+            "tick": tick,
+            "ball": (ball_x, ball_y),
+            "paddle1": paddle1,
+            "paddle2": paddle2,
+            "ball_speed": ball_speed,
+            "score1": score1,
+            "score2": score2,
+            "game_active": bool(flags & FLAG_GAME_ACTIVE),
+            "winner": 1 if flags & FLAG_WINNER_PLAYER1 else 2 if flags & FLAG_WINNER_PLAYER2 else None,
+        })
+
+    return {"paddle_height": paddle_height, "player1": names[0], "player2": names[1], "records": records}
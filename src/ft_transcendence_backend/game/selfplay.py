@@ -0,0 +1,223 @@
+"""
+Headless Self-Play: PongGame gegen AI (oder gescriptete Paddles) ohne Websocket-Server.
+
+Die Zeit ist simuliert (SimClock) und alle Zufallsquellen sind geseedet, daher läuft
+eine Partie so schnell wie die CPU erlaubt und ist reproduzierbar. Mehrere Partien
+werden über einen multiprocessing-Pool auf alle Kerne verteilt.
+
+Aufruf: python selfplay.py easy impossible --games 1000 --workers 4 --seed 1 [--tick-rate 30]
+Spieler: easy, medium, impossible (AI), tracker (folgt dem Ball perfekt), idle (steht still)
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import time
+from collections import Counter
+from multiprocessing import Pool
+
+from models.game import PongGame
+from models.player import Player, PlayerType
+from models.ai_player import AI
+
+TICK_RATE = 1 / 60
+AI_DIFFICULTIES = ("easy", "medium", "impossible")
+SCRIPTED = ("tracker", "idle")
+MAX_TICKS_PER_GAME = 60 * 60 * 30  # 30 simulierte Minuten, danach Abbruch ohne Sieger
+
+
+class SimClock:
+    """Simulierte Uhr, wird pro Tick um dt vorgestellt (Ersatz für time.time in der AI)"""
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, dt: float):
+        self.now += dt
+
+
+class TrackerPaddle:
+    """Gescriptetes Paddle, das der Ballhöhe ohne Verzögerung folgt"""
+
+    def __init__(self, side: str):
+        self.side = side
+
+    def decide(self, game) -> int:
+        paddle = game.player2 if self.side == "player2" else game.player1
+        distance = game.ball_pos[1] - paddle.paddle_pos
+        if distance > 0.02:
+            return 1
+        if distance < -0.02:
+            return -1
+        return 0
+
+
+class IdlePaddle:
+    """Gescriptetes Paddle, das nie bewegt wird"""
+
+    def decide(self, game) -> int:
+        return 0
+
+
+def make_controller(kind: str, side: str, clock: SimClock, rng: random.Random):
+    if kind in AI_DIFFICULTIES:
+        return AI(kind, side=side, clock=clock, rng=rng)
+    if kind == "tracker":
+        return TrackerPaddle(side)
+    if kind == "idle":
+        return IdlePaddle()
+    raise ValueError(f"Unknown player kind: {kind}")
+
+
+def play_game(left: str, right: str, seed: int, settings: dict = None, tick_rate: float = TICK_RATE) -> dict:
+    """Spielt eine Partie und gibt Sieger und Rallye-Längen (Paddle-Treffer pro Punkt) zurück"""
+    steps = tick_rate * 60  # Paddle-Schritte sind pro 60-Hz-Tick definiert (wie im GameServer)
+    rng = random.Random(seed)
+    clock = SimClock()
+    player1 = Player(id="left", name=left, player_type=PlayerType.AI)
+    player2 = Player(id="right", name=right, player_type=PlayerType.AI)
+    game = PongGame(settings or {}, player1, player2, rng=rng)
+    controllers = (
+        (player1, make_controller(left, "player1", clock, rng)),
+        (player2, make_controller(right, "player2", clock, rng)),
+    )
+    game.start_game()
+
+    rallies = []
+    hits = 0
+    points = 0
+    ticks = 0
+    max_ticks = MAX_TICKS_PER_GAME / steps
+    while game.game_active and ticks < max_ticks:
+        clock.advance(tick_rate)
+        for player, controller in controllers:
+            direction = controller.decide(game)
+            if direction:
+                game.move_paddle(player, direction * game.paddle_speed * steps)
+
+        dx = game.ball_direction[0]
+        game.update_game_state(tick_rate)
+        ticks += 1
+
+        score = player1.score + player2.score
+        if score != points:
+            points = score
+            rallies.append(hits)
+            hits = 0
+        elif (dx > 0) != (game.ball_direction[0] > 0):
+            hits += 1
+
+    winner = None
+    if game.winner is player1:
+        winner = "left"
+    elif game.winner is player2:
+        winner = "right"
+    return {"winner": winner, "rallies": rallies, "seconds": ticks * tick_rate}
+
+
+def _play_batch(args) -> dict:
+    left, right, seeds, settings, tick_rate = args
+    wins = Counter()
+    rallies = []
+    seconds = 0.0
+    for seed in seeds:
+        result = play_game(left, right, seed, settings, tick_rate)
+        wins[result["winner"]] += 1
+        rallies.extend(result["rallies"])
+        seconds += result["seconds"]
+    return {"wins": wins, "rallies": rallies, "seconds": seconds}
+
+
+def run_matchup(left: str, right: str, games: int, seed: int = 0, workers: int = None,
+                settings: dict = None, tick_rate: float = TICK_RATE) -> dict:
+    """Verteilt `games` Partien (Seeds seed..seed+games-1) auf einen Prozess-Pool"""
+    workers = workers or os.cpu_count() or 1
+    seeds = list(range(seed, seed + games))
+    chunks = max(1, min(games, workers * 4))
+    batches = [(left, right, seeds[i::chunks], settings, tick_rate) for i in range(chunks)]
+
+    start = time.perf_counter()
+    if workers == 1:
+        results = [_play_batch(batch) for batch in batches]
+    else:
+        with Pool(workers) as pool:
+            results = pool.map(_play_batch, batches)
+    elapsed = time.perf_counter() - start
+
+    wins = Counter()
+    rallies = []
+    seconds = 0.0
+    for result in results:
+        wins.update(result["wins"])
+        rallies.extend(result["rallies"])
+        seconds += result["seconds"]
+    return summarize(left, right, games, wins, rallies, seconds, elapsed)
+
+
+def summarize(left, right, games, wins, rallies, seconds, elapsed) -> dict:
+    rallies.sort()
+    distribution = Counter(rallies)
+    return {
+        "left": left,
+        "right": right,
+        "games": games,
+        "win_rate": {
+            "left": wins["left"] / games,
+            "right": wins["right"] / games,
+            "unfinished": wins[None] / games,
+        },
+        "rally_length": {
+            "mean": statistics.fmean(rallies) if rallies else 0.0,
+            "median": statistics.median(rallies) if rallies else 0,
+            "p90": rallies[int(len(rallies) * 0.9)] if rallies else 0,
+            "max": rallies[-1] if rallies else 0,
+            "histogram": dict(sorted(distribution.items())),
+        },
+        "simulated_seconds": seconds,
+        "elapsed_seconds": elapsed,
+        "games_per_second": games / elapsed if elapsed else 0.0,
+    }
+
+
+def print_summary(summary: dict):
+    win_rate = summary["win_rate"]
+    rally = summary["rally_length"]
+    print(f"{summary['left']} vs {summary['right']}: {summary['games']} Partien "
+          f"in {summary['elapsed_seconds']:.2f}s ({summary['games_per_second']:.0f}/s, "
+          f"{summary['simulated_seconds'] / 3600:.1f}h simuliert)")
+    print(f"  Siege: links {win_rate['left']:.1%}  rechts {win_rate['right']:.1%}  "
+          f"offen {win_rate['unfinished']:.1%}")
+    print(f"  Rallye-Länge: Mittel {rally['mean']:.2f}  Median {rally['median']}  "
+          f"p90 {rally['p90']}  max {rally['max']}")
+    for length, count in rally["histogram"].items():
+        print(f"    {length:>3}: {count}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless Self-Play für das AI-Tuning")
+    kinds = AI_DIFFICULTIES + SCRIPTED
+    parser.add_argument("left", choices=kinds)
+    parser.add_argument("right", choices=kinds)
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=None, help="Prozesse (Standard: alle Kerne)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--winning-score", type=int, default=5)
+    parser.add_argument("--tick-rate", type=int, default=60,
+                        help="Physik-Hz; gröbere Ticks sind dank Swept-Kollision zulässig und schneller")
+    parser.add_argument("--json", action="store_true", help="Ergebnis als JSON ausgeben")
+    args = parser.parse_args()
+
+    summary = run_matchup(args.left, args.right, args.games, seed=args.seed, workers=args.workers,
+                          settings={"winning_score": args.winning_score}, tick_rate=1 / args.tick_rate)
+    if args.json:
+        print(json.dumps(summary))
+    else:
+        print_summary(summary)
+
+
+if __name__ == "__main__":
+    main()
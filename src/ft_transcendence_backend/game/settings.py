@@ -151,34 +151,34 @@ class GameSettings:
             
         return settings
 
-async def update_settings(self, settings_data):
-    #print(f"Updating settings with data: {settings_data}")
-    try:
-        if "ball_speed" in settings_data:
-            self.ball_speed = int(settings_data["ball_speed"])
-        if "paddle_speed" in settings_data:
-            self.paddle_speed = int(settings_data["paddle_speed"])
-        if "winning_score" in settings_data:
-            self.winning_score = int(settings_data["winning_score"])
-        if "paddle_size" in settings_data:
-            self.paddle_size = settings_data["paddle_size"]
-            self.update_ubahn_size()  # ✅ U-Bahn-Größe wird neu berechnet
-        if "mode" in settings_data:
-            self.mode = settings_data["mode"]
-        if "difficulty" in settings_data:
-            self.difficulty = settings_data["difficulty"]
-        if "player1_profile" in settings_data:
-            self.player1_profile = settings_data["player1_profile"]
-        if "player2_profile" in settings_data:
-            self.player2_profile = settings_data["player2_profile"]
-
-        updated_settings = self.get_settings()
-        #print(f"Settings successfully updated to: {updated_settings}")
-        return {"action": "settings_updated", "settings": updated_settings}
-
-    except (ValueError, TypeError) as e:
-        print(f"Error updating settings: {str(e)}")
-        return {"action": "error", "message": str(e)}
+    async def update_settings(self, settings_data):
+        #print(f"Updating settings with data: {settings_data}")
+        try:
+            if "ball_speed" in settings_data:
+                self.ball_speed = int(settings_data["ball_speed"])
+            if "paddle_speed" in settings_data:
+                self.paddle_speed = int(settings_data["paddle_speed"])
+            if "winning_score" in settings_data:
+                self.winning_score = int(settings_data["winning_score"])
+            if "paddle_size" in settings_data:
+                self.paddle_size = settings_data["paddle_size"]
+                self.update_ubahn_size()  # ✅ U-Bahn-Größe wird neu berechnet
+            if "mode" in settings_data:
+                self.mode = settings_data["mode"]
+            if "difficulty" in settings_data:
+                self.difficulty = settings_data["difficulty"]
+            if "player1_profile" in settings_data:
+                self.player1_profile = settings_data["player1_profile"]
+            if "player2_profile" in settings_data:
+                self.player2_profile = settings_data["player2_profile"]
+
+            updated_settings = self.get_settings()
+            #print(f"Settings successfully updated to: {updated_settings}")
+            return {"action": "settings_updated", "settings": updated_settings}
+
+        except (ValueError, TypeError) as e:
+            print(f"Error updating settings: {str(e)}")
+            return {"action": "error", "message": str(e)}
 
 
 
@@ -0,0 +1,140 @@
+import asyncio
+import json
+import os
+import socket
+import time
+import logging
+from tournament_manager import TournamentManager
+
+logger = logging.getLogger('game')
+
+# Spiel- und Turnierstände regelmäßig nach Redis schreiben, damit ein Neustart des Workers
+# laufende Spiele und Turniere nicht verliert. Ohne GAME_SNAPSHOTS_ENABLED=1 bleibt alles im Speicher.
+SNAPSHOTS_ENABLED = os.environ.get("GAME_SNAPSHOTS_ENABLED") == "1"
+# Muss über Neustarts gleich bleiben (daher ohne pid), z.B. der Container-Hostname
+SNAPSHOT_SCOPE = os.environ.get("GAME_WORKER_ID") or socket.gethostname()
+
+KEY_PREFIX = "game:snapshot:"
+SNAPSHOT_INTERVAL = 1      # Sekunden zwischen zwei Flushes
+SNAPSHOT_TTL = 3600        # Snapshots verfallen, falls der Worker nie wieder startet
+RECLAIM_TIMEOUT = 120      # wiederhergestellte Spiele ohne Verbindung werden danach verworfen
+
+
+class SnapshotStore:
+    """
+    Zwei Redis-Hashes pro Worker: game_id -> Spiel-Snapshot, tournament_id -> Turnier-Snapshot.
+
+    flush() schreibt nur, was sich seit dem letzten Flush geändert hat (Spielstand bzw.
+    TournamentManager.version), in einer Pipeline. Spiele werden an Punktgrenzen gesichert;
+    nach restore() sind sie pausiert und laufen weiter, sobald beide Spieler wieder bereit sind.
+    """
+
+    def __init__(self, redis, scope: str = SNAPSHOT_SCOPE, interval: float = SNAPSHOT_INTERVAL,
+                 clock=time.monotonic):
+        self.redis = redis
+        self.games_key = f"{KEY_PREFIX}{scope}:games"
+        self.tournaments_key = f"{KEY_PREFIX}{scope}:tournaments"
+        self.interval = interval
+        self.clock = clock
+        self.game_versions = {}        # game_id -> zuletzt geschriebener Stand
+        self.tournament_versions = {}  # tournament_id -> zuletzt geschriebene version
+        self.restored_at = {}          # game_id -> Zeitpunkt der Wiederherstellung, bis sich jemand verbindet
+        self.task = None
+        self.last_recovery = None      # Dauer des letzten restore() in Sekunden
+
+    @staticmethod
+    def game_version(game_server, game_id: str):
+        game = game_server.active_games[game_id]
+        return (game.player1.score, game.player2.score, game.player1.name, game.player2.name,
+                len(game_server.game_user_profiles.get(game_id, {})))
+
+    async def flush(self, game_server, registry):
+        pipe = self.redis.pipeline()
+        writes = {}
+
+        for game_id, game in game_server.active_games.items():
+            if game.winner:
+                continue  # beendet, wird beim Trennen aufgeräumt
+            version = self.game_version(game_server, game_id)
+            if self.game_versions.get(game_id) != version:
+                writes[game_id] = json.dumps(game_server.snapshot_game(game_id))
+                self.game_versions[game_id] = version
+        for game_id in [g for g in self.game_versions
+                        if g not in game_server.active_games or game_server.active_games[g].winner]:
+            del self.game_versions[game_id]
+            pipe.hdel(self.games_key, game_id)
+        if writes:
+            pipe.hset(self.games_key, mapping=writes)
+
+        writes = {}
+        for tournament_id, manager in registry.tournaments.items():
+            if manager.is_finished():
+                continue
+            if self.tournament_versions.get(tournament_id) != manager.version:
+                writes[tournament_id] = json.dumps(manager.to_snapshot())
+                self.tournament_versions[tournament_id] = manager.version
+        for tournament_id in [t for t in self.tournament_versions
+                              if t not in registry.tournaments or registry.tournaments[t].is_finished()]:
+            del self.tournament_versions[tournament_id]
+            pipe.hdel(self.tournaments_key, tournament_id)
+        if writes:
+            pipe.hset(self.tournaments_key, mapping=writes)
+
+        pipe.expire(self.games_key, SNAPSHOT_TTL)
+        pipe.expire(self.tournaments_key, SNAPSHOT_TTL)
+        await pipe.execute()
+
+    async def restore(self, game_server, registry) -> float:
+        """Lädt alle Snapshots dieses Workers; gibt die Dauer der Wiederherstellung zurück"""
+        started = time.perf_counter()
+        games = await self.redis.hgetall(self.games_key)
+        tournaments = await self.redis.hgetall(self.tournaments_key)
+
+        now = self.clock()
+        for game_id, raw in games.items():
+            try:
+                game_server.restore_game(game_id, json.loads(raw))
+            except (KeyError, ValueError) as e:
+                logger.error(f"Snapshot of game {game_id} could not be restored: {e}")
+                continue
+            self.game_versions[game_id] = self.game_version(game_server, game_id)
+            self.restored_at[game_id] = now
+        for tournament_id, raw in tournaments.items():
+            try:
+                manager = registry.add(TournamentManager.from_snapshot(json.loads(raw)))
+            except (KeyError, ValueError) as e:
+                logger.error(f"Snapshot of tournament {tournament_id} could not be restored: {e}")
+                continue
+            self.tournament_versions[tournament_id] = manager.version
+
+        self.last_recovery = time.perf_counter() - started
+        return self.last_recovery
+
+    async def drop_unclaimed(self, game_server):
+        """Wiederhergestellte Spiele, zu denen sich niemand mehr verbindet, verwerfen"""
+        now = self.clock()
+        for game_id, restored_at in list(self.restored_at.items()):
+            if game_server.game_websockets.get(game_id) or game_id not in game_server.active_games:
+                del self.restored_at[game_id]
+            elif now - restored_at >= RECLAIM_TIMEOUT:
+                del self.restored_at[game_id]
+                await game_server.cleanup_game(game_id)
+
+    def start(self, game_server, registry):
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run(game_server, registry))
+        return self.task
+
+    def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    async def run(self, game_server, registry):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.drop_unclaimed(game_server)
+                await self.flush(game_server, registry)
+            except Exception as e:
+                logger.error(f"Snapshot flush failed: {e}")
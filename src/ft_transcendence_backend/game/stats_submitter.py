@@ -0,0 +1,301 @@
+import asyncio
+import http.client
+import json
+import os
+import random
+import shutil
+import uuid
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from metrics import STATS_SUBMISSIONS
+
+logger = logging.getLogger('game')
+
+STATS_BULK_URL = os.environ.get("GAME_STATS_URL", "http://backend:8000/api/gamestats/bulk/")
+STATS_JOURNAL = os.environ.get("GAME_STATS_JOURNAL", "stats_journal.jsonl")
+MAX_QUEUE = 1000           # darüber hinaus gehen Ergebnisse direkt ins Journal
+BATCH_SIZE = 50            # Ergebnisse pro Bulk-Request
+BATCH_WAIT = 0.2           # so lange wird nach dem ersten Ergebnis auf weitere gewartet
+REQUEST_TIMEOUT = 5
+MAX_RETRIES = 4
+BACKOFF_BASE = 0.5         # 0.5, 1, 2, 4 s (+ Jitter), max. BACKOFF_MAX
+BACKOFF_MAX = 10
+REPLAY_INTERVAL = 30       # so oft wird ein vorhandenes Journal erneut versucht
+STOP_TIMEOUT = 10          # so lange darf stop() noch senden, der Rest geht ins Journal
+STOP = object()            # Sentinel in der Queue: run() sendet den Rest und endet
+
+
+class PermanentError(Exception):
+    """Backend lehnt den Batch ab (4xx): erneutes Senden hilft nicht"""
+
+
+class StatsClient:
+    """
+    Keep-Alive-HTTP-Client für den Bulk-Endpunkt. Läuft in genau einem eigenen Thread,
+    damit die Verbindung wiederverwendet wird und der Default-Executor frei bleibt.
+    """
+
+    def __init__(self, url: str = STATS_BULK_URL, timeout: float = REQUEST_TIMEOUT):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port
+        self.path = parts.path or "/"
+        self.https = parts.scheme == "https"
+        self.timeout = timeout
+        self.connection = None
+
+    def connect(self):
+        cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+        self.connection = cls(self.host, self.port, timeout=self.timeout)
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def post(self, records: list) -> dict:
+        """Sendet einen Batch; gibt die Antwort zurück ({"created", "duplicates", "rejected"})"""
+        body = json.dumps(records).encode('utf-8')
+        headers = {'Content-Type': 'application/json', 'Connection': 'keep-alive'}
+        for attempt in (1, 2):
+            if self.connection is None:
+                self.connect()
+            try:
+                self.connection.request("POST", self.path, body=body, headers=headers)
+                response = self.connection.getresponse()
+                data = response.read()
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                # Server hat die Keep-Alive-Verbindung geschlossen: einmal mit neuer Verbindung versuchen
+                self.close()
+                if attempt == 2:
+                    raise
+                continue
+            except Exception:
+                self.close()
+                raise
+            if response.will_close:
+                self.close()
+            if 400 <= response.status < 500:
+                raise PermanentError(f"{response.status} {data[:200]!r}")
+            if response.status >= 300:
+                raise ConnectionError(f"HTTP {response.status}")
+            try:
+                return json.loads(data or b"{}")
+            except ValueError:
+                return {}
+
+
+class StatsSubmitter:
+    """
+    Asynchrone Pipeline für Spielergebnisse an die Django-API.
+
+    submit() blockiert nie: Ergebnisse landen in einer begrenzten Queue, ein Hintergrund-Task
+    fasst sie zu Batches zusammen und sendet sie an /api/gamestats/bulk/. Fehlgeschlagene
+    Batches werden mit exponentiellem Backoff wiederholt; ist das Backend länger weg (oder
+    die Queue voll), werden sie an ein lokales Journal (JSON Lines) angehängt und später
+    erneut gesendet. Jedes Ergebnis trägt eine submission_id, das Backend ignoriert Duplikate.
+    """
+
+    def __init__(self, client: StatsClient = None, journal_path: str = STATS_JOURNAL,
+                 max_queue: int = MAX_QUEUE, batch_size: int = BATCH_SIZE, batch_wait: float = BATCH_WAIT,
+                 max_retries: int = MAX_RETRIES, backoff_base: float = BACKOFF_BASE,
+                 replay_interval: float = REPLAY_INTERVAL):
+        self.client = client or StatsClient()
+        self.journal_path = journal_path
+        self.queue = None  # asyncio.Queue, wird im laufenden Event-Loop angelegt
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.replay_interval = replay_interval
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="stats")
+        self.task = None
+        self.replay_task = None
+
+    @property
+    def depth(self) -> int:
+        return self.queue.qsize() if self.queue else 0
+
+    def start(self):
+        if self.queue is None:
+            self.queue = asyncio.Queue(maxsize=self.max_queue)
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+        if self.replay_task is None or self.replay_task.done():
+            self.replay_task = asyncio.create_task(self.run_replay())
+
+    async def stop(self, timeout: float = STOP_TIMEOUT):
+        """
+        Sendet, was noch in der Queue liegt, und beendet die Tasks. Was bis zum Timeout nicht
+        gesendet ist (auch ein laufender Batch), geht ins Journal; aus dem Journal genommene
+        Ergebnisse bleiben in dessen .replay-Datei, bis sie gesendet sind.
+        """
+        if self.replay_task is not None:
+            self.replay_task.cancel()
+            await asyncio.gather(self.replay_task, return_exceptions=True)
+        if self.task is not None and not self.task.done():
+            try:
+                await asyncio.wait_for(self.finish(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning("Game stats not sent before shutdown, journaling the rest")
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+        self.task = self.replay_task = None
+        if self.queue is not None:
+            pending = self.drain()
+            if pending:
+                await self.in_thread(self.append_journal, pending)
+        await self.in_thread(self.client.close)
+
+    async def finish(self):
+        await self.queue.put(STOP)
+        await self.task
+
+    def drain(self) -> list:
+        """Nimmt alle Ergebnisse aus der Queue (ohne Sentinel)"""
+        records = []
+        while not self.queue.empty():
+            record = self.queue.get_nowait()
+            if record is not STOP:
+                records.append(record)
+        return records
+
+    def submit(self, record: dict):
+        """Nimmt ein Ergebnis an, ohne zu blockieren"""
+        self.start()
+        record = dict(record)
+        record.setdefault("submission_id", uuid.uuid4().hex)
+        try:
+            self.queue.put_nowait(record)
+        except asyncio.QueueFull:
+            # Backend kommt nicht hinterher: nichts verwerfen, später aus dem Journal senden
+            STATS_SUBMISSIONS.labels("journaled").inc()
+            asyncio.get_running_loop().run_in_executor(self.executor, self.append_journal, [record])
+
+    async def in_thread(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def run(self):
+        batch = []
+        stopping = False
+        try:
+            while not stopping:
+                record = await self.queue.get()
+                if record is STOP:
+                    return
+                batch = [record]
+                deadline = asyncio.get_running_loop().time() + self.batch_wait
+                while len(batch) < self.batch_size:
+                    timeout = deadline - asyncio.get_running_loop().time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        record = await asyncio.wait_for(self.queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                    if record is STOP:
+                        stopping = True
+                        break
+                    batch.append(record)
+                await self.send(batch)
+                batch = []
+        except asyncio.CancelledError:
+            # Abbruch beim Herunterfahren: laufenden Batch und Rest der Queue nicht verlieren
+            # (schon gesendete Ergebnisse ignoriert das Backend per submission_id)
+            pending = batch + self.drain()
+            if pending:
+                self.append_journal(pending)
+            raise
+
+    async def send(self, batch: list) -> bool:
+        """Sendet einen Batch mit Backoff; nach MAX_RETRIES Fehlversuchen geht er ins Journal"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                result = await self.in_thread(self.client.post, batch)
+            except PermanentError as e:
+                logger.error(f"Game stats batch rejected by backend, dropping {len(batch)} results: {e}")
+                STATS_SUBMISSIONS.labels("rejected").inc(len(batch))
+                return True
+            except Exception as e:
+                if attempt == self.max_retries:
+                    logger.warning(f"Game stats backend unreachable ({e}), journaling {len(batch)} results")
+                    break
+                STATS_SUBMISSIONS.labels("retried").inc(len(batch))
+                delay = min(BACKOFF_MAX, self.backoff_base * 2 ** attempt)
+                await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+                continue
+            # Das Backend speichert die gültigen Ergebnisse; verworfen werden nur die abgelehnten
+            rejected = result.get("rejected", []) if isinstance(result, dict) else []
+            for item in rejected:
+                index = item.get("index")
+                record = batch[index] if isinstance(index, int) and 0 <= index < len(batch) else None
+                logger.error(f"Game stats result rejected by backend, dropping it: {item.get('errors')} {record}")
+            STATS_SUBMISSIONS.labels("rejected").inc(len(rejected))
+            STATS_SUBMISSIONS.labels("sent").inc(len(batch) - len(rejected))
+            return True
+        STATS_SUBMISSIONS.labels("journaled").inc(len(batch))
+        await self.in_thread(self.append_journal, batch)
+        return False
+
+    def append_journal(self, records: list):
+        with open(self.journal_path, "a", encoding="utf-8") as journal:
+            for record in records:
+                journal.write(json.dumps(record) + "\n")
+
+    def take_journal(self) -> list:
+        """
+        Verschiebt das Journal nach .replay und liest es; was erneut scheitert, wird wieder angehängt.
+        Die .replay-Datei wird erst nach dem Senden gelöscht (done_journal): ein abgebrochener
+        Durchlauf wird so beim nächsten Mal wiederholt, statt Ergebnisse zu verlieren.
+        """
+        replay_path = self.journal_path + ".replay"
+        if os.path.exists(replay_path):
+            # Rest eines abgebrochenen Durchlaufs: neue Einträge anhängen und alles zusammen senden
+            try:
+                with open(self.journal_path, "rb") as journal, open(replay_path, "ab") as replay:
+                    shutil.copyfileobj(journal, replay)
+                os.remove(self.journal_path)
+            except FileNotFoundError:
+                pass
+        else:
+            try:
+                os.replace(self.journal_path, replay_path)
+            except FileNotFoundError:
+                return []
+        records = []
+        with open(replay_path, encoding="utf-8") as journal:
+            for line in journal:
+                line = line.strip()
+                if line:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        logger.error("Skipping corrupt line in game stats journal")
+        return records
+
+    def done_journal(self):
+        try:
+            os.remove(self.journal_path + ".replay")
+        except FileNotFoundError:
+            pass
+
+    async def replay_journal(self) -> int:
+        """Sendet alle Ergebnisse aus dem Journal erneut; gibt die Anzahl zurück"""
+        records = await self.in_thread(self.take_journal)
+        for start in range(0, len(records), self.batch_size):
+            if not await self.send(records[start:start + self.batch_size]):
+                # Backend wieder weg: Rest unverändert zurück ins Journal
+                await self.in_thread(self.append_journal, records[start + self.batch_size:])
+                break
+        await self.in_thread(self.done_journal)
+        return len(records)
+
+    async def run_replay(self):
+        while True:
+            try:
+                await self.replay_journal()
+            except Exception as e:
+                logger.error(f"Replaying game stats journal failed: {e}")
+            await asyncio.sleep(self.replay_interval)
@@ -0,0 +1,56 @@
+import os
+import sys
+import pytest
+
+GAME_DIR = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.abspath(GAME_DIR))
+
+from models.game import PongGame
+from models.player import Player, PlayerType, Controls
+from models.ai_player import AI
+
+
+def make_game():
+    player1 = Player(id="p1", name="a", player_type=PlayerType.HUMAN, controls=Controls.WASD)
+    player2 = Player(id="p2", name="AI Bot", player_type=PlayerType.AI, controls=Controls.ARROWS)
+    game = PongGame({"winning_score": 5}, player1, player2)
+    game.game_active = True
+    return game
+
+
+@pytest.mark.parametrize("direction", [(0.6, 0.8), (0.3, -0.954), (0.99, 0.141)])
+def test_intercept_matches_simulated_crossing(direction):
+    game = make_game()
+    game.ball_pos = [0.0, 0.2]
+    game.ball_direction = list(direction)
+    # Paddle aus dem Weg, damit der Ball die Ebene ungehindert kreuzt
+    game.player2.paddle_pos = 5.0
+
+    predicted = AI("impossible").predict_intercept(game)
+
+    previous = list(game.ball_pos)
+    while game.ball_pos[0] < game.PADDLE_X:
+        previous = list(game.ball_pos)
+        game.update_game_state()
+    # Linear zwischen den beiden Ticks um die Paddle-Ebene interpolieren
+    t = (game.PADDLE_X - previous[0]) / (game.ball_pos[0] - previous[0])
+    crossing_y = previous[1] + t * (game.ball_pos[1] - previous[1])
+
+    assert predicted == pytest.approx(crossing_y, abs=0.02)
+
+
+def test_prediction_is_cached_across_wall_bounce():
+    game = make_game()
+    game.ball_pos = [0.0, 0.9]
+    game.ball_direction = [0.6, 0.8]
+    ai = AI("impossible")
+    first = ai.predict_intercept(game)
+
+    # Wandabprall: nur dy kippt, der Schnittpunkt bleibt gleich
+    game.ball_direction[1] = -game.ball_direction[1]
+    game.ball_pos = [0.1, 0.95]
+    assert ai.predict_intercept(game) == first
+
+    # Paddle-Treffer/Reset ändert dx: neue Vorhersage
+    game.ball_direction = [0.8, 0.6]
+    assert ai.predict_intercept(game) != first
@@ -0,0 +1,113 @@
+import os
+import random
+import sys
+import pytest
+
+np = pytest.importorskip("numpy")
+
+# Der Game-Service ist ein eigenes Projekt mit flachen Imports (models.game, ...)
+GAME_DIR = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.abspath(GAME_DIR))
+
+from models.game import PongGame
+from models.player import Player, PlayerType, Controls
+from batch_physics import BatchPhysicsEngine
+
+PADDLE_SIZES = ["small", "middle", "big"]
+
+
+def make_games(count, seed):
+    rng = random.Random(seed)
+    games = []
+    for i in range(count):
+        settings = {
+            "ball_speed": rng.randint(1, 10),
+            "paddle_size": PADDLE_SIZES[i % 3],
+            "winning_score": rng.randint(1, 5),
+        }
+        player1 = Player(id="p1", name=f"a{i}", player_type=PlayerType.HUMAN, controls=Controls.WASD)
+        player2 = Player(id="p2", name=f"b{i}", player_type=PlayerType.HUMAN, controls=Controls.ARROWS)
+        games.append(PongGame(settings, player1, player2))
+    return games
+
+
+def snapshot(game):
+    return (
+        tuple(game.ball_pos), tuple(game.ball_direction), game.ball_speed,
+        game.player1.paddle_pos, game.player2.paddle_pos,
+        game.player1.score, game.player2.score, game.game_active,
+        game.winner.name if game.winner else None,
+    )
+
+
+def run(games, step, ticks, seed, dt=None):
+    """Startet alle Spiele und bewegt die Paddles pseudozufällig, identisch für beide Engines"""
+    random.seed(seed)
+    for game in games:
+        game.start_game()
+    moves = random.Random(seed + 1)
+    history = []
+    for _ in range(ticks):
+        for game in games:
+            game.move_paddle(game.player1, moves.choice((-5, 0, 5)))
+            game.move_paddle(game.player2, moves.choice((-5, 0, 5)))
+        step(games, dt)
+        history.append([snapshot(game) for game in games])
+    return history
+
+
+@pytest.mark.parametrize("seed,dt", [(1, None), (2, None), (3, 1/30)])
+def test_batch_engine_matches_scalar_bit_for_bit(seed, dt):
+    ticks = 3000
+    scalar = run(make_games(24, seed), lambda games, dt: [g.update_game_state(dt) for g in games], ticks, seed, dt)
+    engine = BatchPhysicsEngine(capacity=4)  # wächst beim Registrieren mehrfach
+    games = make_games(24, seed)
+    for game in games:
+        engine.add(game)
+    batch = run(games, lambda games, dt: engine.step(dt), ticks, seed, dt)
+
+    for tick, (expected, actual) in enumerate(zip(scalar, batch)):
+        assert actual == expected, f"divergence at tick {tick}"
+
+
+def test_batch_engine_reports_events():
+    games = make_games(4, 7)
+    engine = BatchPhysicsEngine()
+    random.seed(7)
+    for game in games:
+        engine.add(game)
+        game.start_game()
+
+    seen = {"hit": 0, "score": 0, "win": 0}
+    for _ in range(20000):
+        events = engine.step()
+        for name in seen:
+            seen[name] += len(events[name])
+        if not any(game.game_active for game in games):
+            break
+
+    assert seen["score"] > 0
+    assert seen["win"] == len(games)
+    assert not any(game.game_active for game in games)
+
+
+def test_removing_a_game_keeps_the_others_in_place():
+    games = make_games(5, 11)
+    engine = BatchPhysicsEngine(capacity=2)
+    random.seed(11)
+    for game in games:
+        engine.add(game)
+        game.start_game()
+    for _ in range(50):
+        engine.step()
+
+    before = {id(game): snapshot(game) for game in games}
+    removed = games[1]
+    engine.remove(removed)  # der letzte Slot rückt nach
+    assert len(engine.games) == 4 and removed.physics is None
+    assert type(removed.ball_pos) is list and snapshot(removed) == before[id(removed)]
+    assert all(snapshot(game) == before[id(game)] for game in games)
+
+    engine.step()
+    assert snapshot(removed) == before[id(removed)]
+    assert all(snapshot(game) != before[id(game)] for game in games if game is not removed and game.game_active)
@@ -0,0 +1,70 @@
+import os
+import random
+import sys
+
+GAME_DIR = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.abspath(GAME_DIR))
+
+from bracket import Bracket, seed_order
+from models.player import Player, PlayerType, Controls
+from tournament_manager import TournamentManager
+
+
+def make_entries(ratings):
+    entries = []
+    for i, rating in enumerate(ratings):
+        player = Player(id=str(i), name=f"p{rating}", player_type=PlayerType.HUMAN, controls=Controls.ARROWS)
+        player.user_profile = {"username": f"user{i}", "rating": rating}
+        entries.append({"websocket": None, "player": player})
+    return entries
+
+
+def win(manager, name):
+    """Meldet den Sieg des Spielers mit diesem Turnier- bzw. Usernamen in seinem laufenden Match"""
+    for match in manager.running.values():
+        for entry in match.players:
+            if name in (entry["player"].name, entry["player"].user_profile["username"]):
+                return manager.report_result(name, match.match_id, entry["token"])
+    return None
+
+
+def names(match):
+    return {entry["player"].name for entry in match.players}
+
+
+def test_seeding_places_byes_on_top_seeds_and_splits_the_best_two():
+    assert seed_order(8) == [0, 7, 3, 4, 1, 6, 2, 5]
+
+    bracket = Bracket(make_entries([1000, 1600, 1200, 1500, 1100, 1400]), rng=random.Random(1))
+    assert [entry["player"].name for entry in bracket.byes] == ["p1600", "p1500"]
+    assert {frozenset(names(match)) for match in bracket.start_ready()} == {
+        frozenset({"p1200", "p1100"}), frozenset({"p1400", "p1000"})}
+    # Setzplatz 1 und 2 stehen in verschiedenen Hälften
+    assert bracket.matches[(2, 0)].players[0]["player"].name == "p1600"
+    assert bracket.matches[(2, 1)].players[0]["player"].name == "p1500"
+
+
+def test_match_starts_as_soon_as_its_feeders_finish():
+    manager = TournamentManager(make_entries([1800, 1700, 1600, 1500, 1400, 1300, 1200, 1100]),
+                                rng=random.Random(1))
+    first_round = manager.start_ready_matches()
+    assert len(first_round) == 4
+
+    # Obere Hälfte fertig, untere läuft noch: das Halbfinale der oberen Hälfte ist sofort bereit
+    assert win(manager, "p1800") == []
+    [semi] = win(manager, "user4")  # Username von p1400 (Setzplatz 5 schlägt 4)
+    assert names(semi) == {"p1800", "p1400"}
+    started = manager.start_ready_matches()
+    assert started == [semi] and manager.current_round == 2
+    assert len(manager.active_matches) == 3
+
+    assert win(manager, "p1500") is None  # Match schon entschieden
+    for winner in ("p1700", "p1600", "p1800", "p1700"):
+        win(manager, winner)
+        manager.start_ready_matches()
+    assert not manager.is_finished() and manager.get_current_matchups() == [
+        {"player1": "p1800", "player2": "p1700"}]
+    win(manager, "p1700")
+    assert manager.is_finished()
+    assert manager.get_placements() == {"1st": "p1700", "2nd": "p1800"}
+    assert len(manager.get_match_history()) == 7
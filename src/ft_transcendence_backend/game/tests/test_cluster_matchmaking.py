@@ -0,0 +1,183 @@
+import asyncio
+import json
+import os
+import sys
+
+import fakeredis
+
+GAME_DIR = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.abspath(GAME_DIR))
+
+from game_directory import GameDirectory
+from game_server import GameServer
+from menu import Menu
+
+
+class FakeWebSocket:
+    def __init__(self, **query_params):
+        self.query_params = query_params
+        self.inbox = asyncio.Queue()
+        self.sent = []
+        self.frames = []
+
+    async def accept(self):
+        pass
+
+    async def receive_json(self):
+        message = await self.inbox.get()
+        if message is None:
+            raise ConnectionError("disconnected")
+        return message
+
+    async def send_json(self, message):
+        self.sent.append(message)
+
+    async def send_text(self, data):
+        self.frames.append(json.loads(data))
+
+    async def close(self, code=1000):
+        pass
+
+
+def make_worker(server, worker_id):
+    redis = fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)
+    game_server = GameServer()
+    game_server.directory = GameDirectory(redis, worker_id=worker_id, worker_url=f"ws://{worker_id}:8001")
+    return game_server, Menu(game_server)
+
+
+async def wait_for(predicate, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("timeout")
+        await asyncio.sleep(0.01)
+
+
+def test_players_on_different_workers_are_routed_to_the_host():
+    async def scenario():
+        server = fakeredis.FakeServer()
+        server_a, menu_a = make_worker(server, "worker-a")
+        server_b, menu_b = make_worker(server, "worker-b")
+        await server_a.directory.heartbeat()
+        await server_b.directory.heartbeat()
+
+        alice, bob = FakeWebSocket(), FakeWebSocket()
+        await menu_a.handle_menu_selection(alice, "online")
+        await wait_for(lambda: len(menu_a.matchmaker) == 1 and not menu_a.matchmaker.queue.qsize())
+        await asyncio.sleep(0.05)
+        await menu_b.handle_menu_selection(bob, "online")
+
+        await wait_for(lambda: alice.sent and bob.sent)
+        menu_a.matchmaker.stop()
+        menu_b.matchmaker.stop()
+
+        found_a, found_b = alice.sent[0], bob.sent[0]
+        assert found_a["action"] == found_b["action"] == "game_found"
+        assert found_a["game_id"] == found_b["game_id"]
+        assert {found_a["playerRole"], found_b["playerRole"]} == {"player1", "player2"}
+        # Der Worker, der gepaart hat (B), hostet das Spiel; beide Clients bekommen seine URL
+        assert found_a["game_url"] == found_b["game_url"] == "ws://worker-b:8001"
+
+        game_id = found_a["game_id"]
+        redirect_url, settings = await server_a.route_game(game_id)
+        assert redirect_url == "ws://worker-b:8001"
+        assert settings["mode"] == "online"
+
+        redirect_url, settings = await server_b.route_game(game_id)
+        assert redirect_url is None
+        assert settings["game_id"] == game_id
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_ticket_is_not_matched_across_workers():
+    async def scenario():
+        server = fakeredis.FakeServer()
+        server_a, menu_a = make_worker(server, "worker-a")
+        server_b, menu_b = make_worker(server, "worker-b")
+        await server_a.directory.heartbeat()
+        await server_b.directory.heartbeat()
+
+        alice, bob = FakeWebSocket(), FakeWebSocket()
+        await menu_a.handle_menu_selection(alice, "online")
+        await asyncio.sleep(0.05)
+        await menu_a.handle_menu_selection(alice, "cancel_search")
+        await asyncio.sleep(0.05)
+        await menu_b.handle_menu_selection(bob, "online")
+        await asyncio.sleep(0.1)
+        menu_a.matchmaker.stop()
+        menu_b.matchmaker.stop()
+
+        # Bob wartet weiter, statt mit Alices abgebrochenem Ticket gepaart zu werden
+        assert bob.sent == []
+        assert bob in menu_b.matchmaker
+
+    asyncio.run(scenario())
+
+
+def test_cross_worker_match_is_played_to_the_end_on_the_host():
+    async def scenario():
+        server = fakeredis.FakeServer()
+        server_a, menu_a = make_worker(server, "worker-a")
+        server_b, menu_b = make_worker(server, "worker-b")
+        await server_a.directory.heartbeat()
+        await server_b.directory.heartbeat()
+        submitted = []
+        server_b.stats_submitter.submit = submitted.append
+
+        alice, bob = FakeWebSocket(), FakeWebSocket()
+        await menu_a.handle_menu_selection(alice, "online")
+        await wait_for(lambda: len(menu_a.matchmaker) == 1 and not menu_a.matchmaker.queue.qsize())
+        await asyncio.sleep(0.05)
+        await menu_b.handle_menu_selection(bob, "online")
+        await wait_for(lambda: alice.sent and bob.sent)
+        menu_a.matchmaker.stop()
+        menu_b.matchmaker.stop()
+
+        game_id = alice.sent[0]["game_id"]
+        hosts = {"ws://worker-a:8001": server_a, "ws://worker-b:8001": server_b}
+        players, tasks = {}, []
+        for found in (alice.sent[0], bob.sent[0]):
+            # Erst beim Worker des Menüs anfragen, bei "redirect" zum Host wechseln (wie game_screen.js)
+            host = server_a
+            redirect_url, settings = await host.route_game(game_id)
+            if redirect_url is not None:
+                host = hosts[redirect_url]
+                redirect_url, settings = await host.route_game(game_id)
+            assert host is server_b and redirect_url is None
+            ws = FakeWebSocket(seat=found["seatToken"])
+            players[found["playerRole"]] = ws
+            tasks.append(asyncio.create_task(host.handle_game(ws, game_id, settings)))
+        await asyncio.sleep(0.01)
+
+        for role, ws in players.items():
+            ws.inbox.put_nowait({"action": "player_info", "user_profile": {"id": role[-1], "username": role}})
+            ws.inbox.put_nowait({"action": "player_ready"})
+        game = server_b.active_games[game_id]
+        await wait_for(lambda: game.game_active)
+        assert game_id not in server_a.active_games
+
+        # Nächster Punkt entscheidet: Ball kurz vor dem linken Tor, an Paddle 1 vorbei
+        game.player1.score = game.player2.score = game.winning_score - 1
+        game.ball_pos[0], game.ball_pos[1] = -0.98, 0.9
+        game.ball_direction[0], game.ball_direction[1] = -1.0, 0.0
+        await wait_for(lambda: game.winner is not None)
+        await wait_for(lambda: all(ws.frames and "winner" in ws.frames[-1] for ws in players.values()))
+
+        for ws in players.values():
+            ws.inbox.put_nowait(None)
+        await asyncio.gather(*tasks)
+        await asyncio.sleep(0.01)
+        return game, players, submitted, await server_b.directory.lookup(game_id), server_b
+
+    game, players, submitted, entry, host = asyncio.run(scenario())
+    assert game.winner is game.player2
+    for ws in players.values():
+        assert ws.frames[-1]["winner"]["name"] == "player2"
+    assert len(submitted) == 1
+    assert submitted[0]["winner"] == "2"
+    assert (submitted[0]["player1_score"], submitted[0]["player2_score"]) == (game.winning_score - 1, game.winning_score)
+    # Nach dem Spiel ist es aus dem Verzeichnis und vom Host verschwunden
+    assert entry is None
+    assert not host.active_games
@@ -0,0 +1,76 @@
+import asyncio
+import os
+import sys
+
+GAME_DIR = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.abspath(GAME_DIR))
+
+from game_server import GameServer
+
+
+class FakeWebSocket:
+    """Minimaler Ersatz für fastapi.WebSocket: Nachrichten kommen aus einer Queue"""
+
+    def __init__(self, **query_params):
+        self.query_params = query_params
+        self.inbox = asyncio.Queue()
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def receive_json(self):
+        message = await self.inbox.get()
+        if message is None:
+            raise ConnectionError("disconnected")
+        return message
+
+    async def send_text(self, data):
+        self.sent.append(data)
+
+    async def send_bytes(self, data):
+        self.sent.append(data)
+
+    async def close(self, code=1000):
+        pass
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_role_comes_from_the_seat_and_invalid_input_is_dropped():
+    async def scenario():
+        server = GameServer()
+        settings = {"mode": "online", "record_replay": False}
+        server.register_game_settings("g", settings)
+        seats = server.assign_seats("g")
+
+        player1 = FakeWebSocket(seat=seats["player1"])
+        intruder = FakeWebSocket(seat="guessed")
+        tasks = [asyncio.create_task(server.handle_game(ws, "g", settings)) for ws in (player1, intruder)]
+        await settle()
+
+        for seq in ("7", 2 ** 40, -1, 1.5, True):
+            player1.inbox.put_nowait({"action": "key_update", "seq": seq, "keys": {"a": True}})
+        # Rolle und fremde Tasten aus der Nachricht zählen nicht
+        player1.inbox.put_nowait({"action": "key_update", "seq": 3, "player_role": "player2",
+                                  "keys": {"d": True, "ArrowLeft": True}})
+        intruder.inbox.put_nowait({"action": "key_update", "seq": 9, "keys": {"ArrowRight": True}})
+        intruder.inbox.put_nowait({"action": "player_ready", "player_role": "player2"})
+        await settle()
+
+        inputs = server.game_inputs["g"]
+        ready = dict(server.game_ready["g"])
+        server.step_games(1 / 60)
+        await server.broadcast_states()
+
+        for ws in (player1, intruder):
+            ws.inbox.put_nowait(None)
+        await asyncio.gather(*tasks)
+        return inputs, ready
+
+    inputs, ready = asyncio.run(scenario())
+    assert inputs == {"player1": {"keys": {"a": False, "d": True}, "seq": 3}}
+    assert ready == {}
@@ -0,0 +1,76 @@
+import itertools
+import os
+import random
+import sys
+from collections import Counter
+
+GAME_DIR = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.abspath(GAME_DIR))
+
+from league import circle_rounds
+from models.player import Player, PlayerType, Controls
+from tournament_manager import TournamentManager
+
+
+def make_entries(count):
+    entries = []
+    for i in range(count):
+        player = Player(id=str(i), name=f"p{i}", player_type=PlayerType.HUMAN, controls=Controls.ARROWS)
+        player.user_profile = {"username": f"user{i}", "rating": 2000 - i}
+        entries.append({"websocket": None, "player": player})
+    return entries
+
+
+def play_out(manager, rng):
+    """Meldet laufende Matches in zufälliger Reihenfolge, bis das Turnier beendet ist"""
+    manager.start_ready_matches()
+    while not manager.is_finished():
+        p1, p2 = rng.choice(manager.active_matches)
+        manager.record_result(manager.match_of(p1), rng.choice((p1, p2)))
+        manager.start_ready_matches()
+
+
+def test_circle_method_pairs_everyone_once():
+    rounds = circle_rounds(list(range(5)))
+    assert len(rounds) == 5
+    games = [frozenset(pair) for matches in rounds for pair in matches if None not in pair]
+    assert Counter(games) == Counter(frozenset(pair) for pair in itertools.combinations(range(5), 2))
+    for matches in rounds:
+        seated = [p for pair in matches for p in pair]
+        assert len(seated) == len(set(seated))
+
+
+def test_round_robin_starts_matches_per_player_and_ranks_by_wins():
+    rng = random.Random(3)
+    manager = TournamentManager(make_entries(6), rng=rng, format="round_robin")
+    play_out(manager, rng)
+
+    history = manager.get_match_history()
+    assert len(history) == 15 and manager.total_rounds == 5
+    wins = Counter(match["winner"] for match in history)
+    table = manager.get_standings()
+    assert [row["wins"] for row in table] == sorted(wins.values(), reverse=True) + [0] * (6 - len(wins))
+    assert manager.get_winner() == table[0]["name"]
+
+
+def test_swiss_avoids_rematches_and_keeps_buchholz_incrementally():
+    rng = random.Random(7)
+    manager = TournamentManager(make_entries(301), rng=rng, format="swiss")
+    play_out(manager, rng)
+
+    history = manager.get_match_history()
+    assert manager.total_rounds == 9
+    pairings = [frozenset((match["player1"], match["player2"])) for match in history]
+    assert len(pairings) == len(set(pairings)) == 9 * 150
+
+    # Buchholz aus der History nachrechnen (Freilose zählen als Sieg ohne Gegner)
+    wins = Counter(match["winner"] for match in history)
+    wins.update(entry["player"].name for entry in manager.schedule.byes)
+    opponents = {entry["player"].name: [] for entry in manager.players}
+    for match in history:
+        opponents[match["player1"]].append(match["player2"])
+        opponents[match["player2"]].append(match["player1"])
+    for row in manager.get_standings():
+        assert row["wins"] == wins[row["name"]]
+        assert row["buchholz"] == sum(wins[opponent] for opponent in opponents[row["name"]])
+    assert len(set(entry["player"].name for entry in manager.schedule.byes)) == 9
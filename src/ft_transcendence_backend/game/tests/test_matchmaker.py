@@ -0,0 +1,104 @@
+import asyncio
+import os
+import sys
+
+GAME_DIR = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.abspath(GAME_DIR))
+
+from matchmaker import Matchmaker, DEFAULT_RATING, parse_rating
+
+
+def test_equal_ratings_pair_in_join_order_and_skip_cancelled():
+    async def scenario():
+        matches = []
+
+        async def on_match(ticket1, ticket2):
+            matches.append((ticket1.player_name, ticket2.player_name))
+
+        matchmaker = Matchmaker(on_match)
+        for name in ("a", "b", "c", "d", "e"):
+            matchmaker.enqueue(name, name)
+        matchmaker.cancel("b")
+        await asyncio.sleep(0.01)
+        matchmaker.stop()
+        return matches, len(matchmaker)
+
+    matches, waiting = asyncio.run(scenario())
+    assert matches == [("a", "c"), ("d", "e")]
+    assert waiting == 0
+
+
+def test_waiting_player_is_matched_when_second_joins():
+    async def scenario():
+        matched = asyncio.Event()
+
+        async def on_match(ticket1, ticket2):
+            matched.set()
+
+        matchmaker = Matchmaker(on_match)
+        matchmaker.enqueue("a", "a")
+        await asyncio.sleep(0.01)
+        assert not matched.is_set()
+        matchmaker.enqueue("b", "b")
+        await asyncio.wait_for(matched.wait(), timeout=0.1)
+        matchmaker.stop()
+
+    asyncio.run(scenario())
+
+
+def test_pairs_closest_rating_and_widens_window_over_time():
+    class Clock:
+        now = 0.0
+
+        def __call__(self):
+            return self.now
+
+    async def scenario():
+        clock = Clock()
+        matches = []
+
+        async def on_match(ticket1, ticket2):
+            matches.append({ticket1.player_name, ticket2.player_name})
+
+        matchmaker = Matchmaker(on_match, clock=clock, sweep_interval=0.01)
+        matchmaker.enqueue("low", "low", rating=1000)
+        matchmaker.enqueue("high", "high", rating=1600)
+        matchmaker.enqueue("mid", "mid", rating=1040)
+        await asyncio.sleep(0.05)
+        assert matches == [{"low", "mid"}]
+        assert "high" in matchmaker
+
+        # 600 Punkte Abstand: passt erst, wenn das Fenster lange genug gewachsen ist
+        matchmaker.enqueue("top", "top", rating=2200)
+        await asyncio.sleep(0.05)
+        assert len(matches) == 1
+        clock.now = 11.0
+        await asyncio.sleep(0.05)
+        matchmaker.stop()
+        return matches, len(matchmaker)
+
+    matches, waiting = asyncio.run(scenario())
+    assert matches[1] == {"high", "top"}
+    assert waiting == 0
+
+
+def test_invalid_client_ratings_fall_back_to_default():
+    for value in (None, "abc", "nan", float("inf"), -5, 1e9, True, {"elo": 1500}):
+        assert parse_rating(value) == DEFAULT_RATING
+    assert parse_rating("1500") == 1500.0 and parse_rating(1234) == 1234.0
+
+    async def scenario():
+        from game_server import GameServer
+        from menu import Menu
+
+        class FakeWebSocket:
+            query_params = {}
+
+        menu = Menu(GameServer())
+        reply = await menu.handle_menu_selection(FakeWebSocket(), "online", {"rating": "abc"})
+        ratings = [ticket.rating for ticket in menu.matchmaker.tickets.values()]
+        menu.matchmaker.stop()
+        return reply, ratings
+
+    reply, ratings = asyncio.run(scenario())
+    assert reply["action"] == "searching_opponent" and ratings == [DEFAULT_RATING]
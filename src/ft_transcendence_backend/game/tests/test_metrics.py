@@ -0,0 +1,34 @@
+import os
+import sys
+from types import SimpleNamespace
+
+GAME_DIR = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.abspath(GAME_DIR))
+
+from prometheus_client import REGISTRY
+from connection import GameConnection
+from metrics import register_state_gauges
+from protocol import PROTOCOL_JSON
+
+
+class FakeTournaments:
+    lobby_of = {}
+
+    def __len__(self):
+        return 0
+
+
+def test_send_queue_depth_is_exported_per_mode():
+    connections = {}
+    for i, (mode, frames) in enumerate([("online", 2), ("online", 1), ("ai", 1)]):
+        connection = GameConnection(object(), PROTOCOL_JSON, mode)
+        connection.queue.extend(range(frames))
+        connection.max_depth = frames
+        connections[i] = connection
+    game_server = SimpleNamespace(game_modes={}, connections=connections, stats_submitter=SimpleNamespace(depth=0))
+    register_state_gauges(game_server, SimpleNamespace(matchmaker=[], tournaments=FakeTournaments()))
+
+    assert REGISTRY.get_sample_value("game_send_queue_depth", {"mode": "online"}) == 3
+    assert REGISTRY.get_sample_value("game_send_queue_depth", {"mode": "ai"}) == 1
+    assert REGISTRY.get_sample_value("game_send_queue_depth", {"mode": "local"}) == 0
+    assert REGISTRY.get_sample_value("game_send_queue_max_depth") == 2
@@ -0,0 +1,54 @@
+import os
+import sys
+
+GAME_DIR = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.abspath(GAME_DIR))
+
+from models.game import PongGame
+from models.player import Player, PlayerType, Controls
+from replay_recorder import ReplayRecorder, ReplayWriter, read_replay
+
+
+def make_game():
+    player1 = Player(id="p1", name="Player 1", player_type=PlayerType.HUMAN, controls=Controls.WASD)
+    player2 = Player(id="p2", name="Player 2", player_type=PlayerType.HUMAN, controls=Controls.ARROWS)
+    return PongGame({"mode": "online"}, player1, player2)
+
+
+def test_header_uses_names_from_player_info(tmp_path):
+    writer = ReplayWriter(directory=str(tmp_path))
+    writer.start()
+    game = make_game()
+    recorder = ReplayRecorder("g1", game, writer=writer, flush_every=10)
+
+    # player_info kommt nach dem Anlegen des Spiels
+    game.player1.name, game.player2.name = "alice", "bob"
+    game.start_game()
+    for _ in range(25):
+        game.update_game_state(1 / 60)
+        recorder.record(game)
+    recorder.flush()
+    writer.stop()
+
+    replay = read_replay(writer.path_for("g1"))
+    assert (replay["player1"], replay["player2"]) == ("alice", "bob")
+    assert [record["tick"] for record in replay["records"]] == list(range(25))
+
+
+def test_restored_game_appends_records_without_a_second_header(tmp_path):
+    writer = ReplayWriter(directory=str(tmp_path))
+    writer.start()
+    for _ in range(2):
+        # Zweiter Durchlauf: Neustart, das Spiel wird aus dem Snapshot mit neuem Recorder angelegt
+        game = make_game()
+        recorder = ReplayRecorder("g1", game, writer=writer, flush_every=10)
+        game.start_game()
+        for _ in range(15):
+            game.update_game_state(1 / 60)
+            recorder.record(game)
+        recorder.flush()
+    writer.stop()
+
+    replay = read_replay(writer.path_for("g1"))
+    assert (replay["player1"], replay["player2"]) == ("Player 1", "Player 2")
+    assert [record["tick"] for record in replay["records"]] == list(range(15)) * 2
@@ -0,0 +1,20 @@
+import os
+import sys
+
+GAME_DIR = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.abspath(GAME_DIR))
+
+from selfplay import play_game, run_matchup
+
+
+def test_same_seed_replays_identical_game():
+    first = play_game("medium", "impossible", seed=7)
+    second = play_game("medium", "impossible", seed=7)
+    assert first == second
+    assert first["winner"] in ("left", "right")
+
+
+def test_tracker_beats_idle_paddle():
+    summary = run_matchup("tracker", "idle", games=8, seed=1, workers=1)
+    assert summary["win_rate"]["left"] == 1.0
+    assert sum(summary["rally_length"]["histogram"].values()) >= 8 * 5
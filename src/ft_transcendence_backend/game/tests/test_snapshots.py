@@ -0,0 +1,116 @@
+import asyncio
+import os
+import random
+import sys
+
+import fakeredis
+
+GAME_DIR = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.abspath(GAME_DIR))
+
+from game_server import GameServer
+from models.player import Player, PlayerType, Controls
+from snapshots import SnapshotStore
+from tournament_registry import TournamentRegistry
+
+
+def make_entries(count, offset=0):
+    entries = []
+    for i in range(offset, offset + count):
+        player = Player(id=str(i), name=f"p{i}", player_type=PlayerType.HUMAN, controls=Controls.ARROWS)
+        player.user_profile = {"id": i, "username": f"user{i}", "rating": 1500 + (i * 37) % 400}
+        entries.append({"websocket": object(), "player": player})
+    return entries
+
+
+def populate(game_server, registry, rng, games=500, tournaments=30):
+    for i in range(games):
+        game_id = f"game-{i}"
+        settings = {"mode": "online", "winning_score": 11, "record_replay": False}
+        player1 = Player(id="p1", name=f"a{i}", player_type=PlayerType.HUMAN, controls=Controls.WASD)
+        player2 = Player(id="p2", name=f"b{i}", player_type=PlayerType.HUMAN, controls=Controls.ARROWS)
+        game_server.active_games[game_id] = game_server.create_game(game_id, settings, player1, player2)
+        game_server.register_game_settings(game_id, settings)
+        game_server.game_user_profiles[game_id] = {"player1": {"id": 2 * i}, "player2": {"id": 2 * i + 1}}
+        player1.score, player2.score = rng.randrange(11), rng.randrange(11)
+
+    formats = ("knockout", "swiss", "round_robin")
+    for i in range(tournaments):
+        manager = registry.create(make_entries(8, offset=8 * i), formats[i % 3])
+        manager.start_ready_matches()
+        for _ in range(rng.randrange(12)):
+            if manager.is_finished() or not manager.active_matches:
+                break
+            p1, p2 = rng.choice(manager.active_matches)
+            manager.record_result(manager.match_of(p1), rng.choice((p1, p2)))
+            if rng.random() < 0.5:
+                manager.start_ready_matches()
+
+
+def test_restore_recovers_games_and_tournaments_quickly():
+    async def scenario():
+        server = fakeredis.FakeServer()
+        rng = random.Random(5)
+        game_server, registry = GameServer(), TournamentRegistry()
+        populate(game_server, registry, rng)
+        await SnapshotStore(fakeredis.aioredis.FakeRedis(server=server, decode_responses=True), "w1").flush(
+            game_server, registry)
+
+        # "Neustart": frischer Prozesszustand, gleicher Scope
+        restored_server, restored_registry = GameServer(), TournamentRegistry()
+        store = SnapshotStore(fakeredis.aioredis.FakeRedis(server=server, decode_responses=True), "w1")
+        recovery_time = await store.restore(restored_server, restored_registry)
+        return game_server, registry, restored_server, restored_registry, recovery_time
+
+    game_server, registry, restored_server, restored_registry, recovery_time = asyncio.run(scenario())
+    assert recovery_time < 1.0
+
+    assert restored_server.active_games.keys() == game_server.active_games.keys()
+    for game_id, game in game_server.active_games.items():
+        restored = restored_server.active_games[game_id]
+        assert (restored.player1.score, restored.player2.score) == (game.player1.score, game.player2.score)
+        assert restored.player1.name == game.player1.name and not restored.game_active
+        assert restored_server.game_user_profiles[game_id] == game_server.game_user_profiles[game_id]
+        assert restored_server.get_game_settings(game_id)["winning_score"] == 11
+
+    unfinished = {t for t, manager in registry.tournaments.items() if not manager.is_finished()}
+    assert restored_registry.tournaments.keys() == unfinished
+    for tournament_id in unfinished:
+        manager, restored = registry.tournaments[tournament_id], restored_registry.tournaments[tournament_id]
+        assert restored.match_history == manager.match_history
+        assert restored.results == manager.results
+        assert restored.running.keys() == manager.running.keys()
+        assert restored.get_next_round_preview() == manager.get_next_round_preview()
+        assert restored.get_standings() == manager.get_standings()
+
+
+def test_restored_tournament_is_reclaimed_and_continues():
+    rng = random.Random(11)
+    registry = TournamentRegistry()
+    manager = registry.create(make_entries(6), "knockout")
+    manager.start_ready_matches()
+    p1, p2 = manager.active_matches[0]
+    manager.record_result(manager.match_of(p1), p1)
+
+    restored_registry = TournamentRegistry()
+    restored = restored_registry.add(type(manager).from_snapshot(manager.to_snapshot()))
+    websocket = object()
+    # Nur das geheime Platz-Token berechtigt, nicht die (bekannte) user_id
+    assert restored_registry.reclaim(p1["player"].user_profile["id"], websocket) is None
+    assert restored_registry.reclaim(p1["token"], websocket) is restored
+    assert restored.player_index[p1["token"]]["websocket"] is websocket
+    assert restored_registry.reclaim(p1["token"], object()) is None  # schon übernommen
+    assert restored_registry.reclaim(None, websocket) is None
+
+    # Beide Turniere mit denselben Ergebnissen zu Ende spielen
+    for tournament in (manager, restored):
+        tournament.start_ready_matches()
+    while not manager.is_finished():
+        winner = rng.choice(rng.choice(manager.active_matches))
+        manager.record_result(manager.match_of(winner), winner)
+        restored_winner = restored.player_index[winner["token"]]
+        restored.record_result(restored.match_of(restored_winner), restored_winner)
+        manager.start_ready_matches()
+        restored.start_ready_matches()
+    assert restored.is_finished() and restored.get_winner() == manager.get_winner()
+    assert restored.match_history == manager.match_history
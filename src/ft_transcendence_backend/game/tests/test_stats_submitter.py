@@ -0,0 +1,189 @@
+import asyncio
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+GAME_DIR = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.abspath(GAME_DIR))
+
+from metrics import STATS_SUBMISSIONS
+from stats_submitter import StatsClient, StatsSubmitter
+
+
+class FakeBackend:
+    """Bulk-Endpunkt mit Keep-Alive; die ersten `failures` Requests antworten mit 503"""
+
+    def __init__(self, failures=0):
+        self.batches = []
+        self.connections = 0
+        self.failures = failures
+        backend = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                backend.connections += 1
+                super().setup()
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                if backend.failures:
+                    backend.failures -= 1
+                    status = 503
+                    response = b"{}"
+                else:
+                    batch = json.loads(body)
+                    backend.batches.append(batch)
+                    status = 201
+                    # Wie /api/gamestats/bulk/: Ergebnisse mit "invalid" werden einzeln abgelehnt
+                    response = json.dumps({"rejected": [{"index": i, "errors": {"invalid": ["x"]}}
+                                                        for i, r in enumerate(batch) if "invalid" in r]}).encode()
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(response)))
+                self.end_headers()
+                self.wfile.write(response)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/api/gamestats/bulk/"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def received(self):
+        return [record for batch in self.batches for record in batch]
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def make_submitter(url, journal, **kwargs):
+    kwargs.setdefault("batch_wait", 0.05)
+    kwargs.setdefault("backoff_base", 0.01)
+    return StatsSubmitter(client=StatsClient(url, timeout=1), journal_path=str(journal), **kwargs)
+
+
+async def wait_for(predicate, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("timeout")
+        await asyncio.sleep(0.01)
+
+
+def test_results_are_batched_over_one_connection_and_retried(tmp_path):
+    backend = FakeBackend(failures=2)
+
+    async def scenario():
+        submitter = make_submitter(backend.url, tmp_path / "journal.jsonl", batch_size=50)
+        for i in range(120):
+            submitter.submit({"player1_score": i})
+        await wait_for(lambda: len(backend.received()) == 120)
+        await submitter.stop()
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        backend.close()
+
+    records = backend.received()
+    assert sorted(r["player1_score"] for r in records) == list(range(120))
+    assert len({r["submission_id"] for r in records}) == 120
+    assert max(len(batch) for batch in backend.batches) == 50 and len(backend.batches) <= 4
+    assert backend.connections == 1  # Keep-Alive, auch über die 503-Antworten hinweg
+    assert not (tmp_path / "journal.jsonl").exists()
+
+
+def test_results_are_journaled_while_backend_is_down_and_replayed(tmp_path):
+    journal = tmp_path / "journal.jsonl"
+    down = FakeBackend()
+    url = down.url
+    down.close()  # Port ist jetzt zu: Verbindungsfehler
+
+    async def while_down():
+        submitter = make_submitter(url, journal, max_retries=2)
+        for i in range(30):
+            submitter.submit({"player1_score": i})
+        await wait_for(lambda: journal.exists() and len(journal.read_text().splitlines()) == 30)
+        await submitter.stop()
+
+    asyncio.run(while_down())
+
+    backend = FakeBackend()
+
+    async def after_recovery():
+        # Nach einem Neustart: das Journal wird beim Start erneut gesendet
+        submitter = make_submitter(backend.url, journal)
+        submitter.start()
+        await wait_for(lambda: len(backend.received()) == 30)
+        await submitter.stop()
+
+    try:
+        asyncio.run(after_recovery())
+    finally:
+        backend.close()
+    assert sorted(r["player1_score"] for r in backend.received()) == list(range(30))
+    assert not journal.exists()
+
+
+def test_only_rejected_results_are_dropped(tmp_path):
+    backend = FakeBackend()
+    rejected = STATS_SUBMISSIONS.labels("rejected")
+    sent = STATS_SUBMISSIONS.labels("sent")
+    rejected_before, sent_before = rejected._value.get(), sent._value.get()
+
+    async def scenario():
+        submitter = make_submitter(backend.url, tmp_path / "journal.jsonl", batch_size=10)
+        for i in range(10):
+            submitter.submit({"player1_score": i, **({"invalid": True} if i in (3, 7) else {})})
+        await wait_for(lambda: len(backend.received()) == 10 and sent._value.get() - sent_before == 8)
+        await submitter.stop()
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        backend.close()
+
+    assert len(backend.batches) == 1  # kein erneutes Senden des ganzen Batches
+    assert rejected._value.get() - rejected_before == 2
+    assert not (tmp_path / "journal.jsonl").exists()
+
+
+def test_stop_journals_the_batch_in_flight_and_keeps_taken_journal(tmp_path):
+    journal = tmp_path / "journal.jsonl"
+    journal.write_text("".join(json.dumps({"player1_score": 100 + i, "submission_id": f"j{i}"}) + "\n"
+                               for i in range(3)))
+    down = FakeBackend()
+    url = down.url
+    down.close()
+
+    async def while_down():
+        # Langer Backoff: der Batch hängt beim Herunterfahren noch in send()
+        submitter = make_submitter(url, journal, max_retries=10, backoff_base=5, replay_interval=60)
+        for i in range(5):
+            submitter.submit({"player1_score": i})
+        await wait_for(lambda: submitter.depth == 0 and os.path.exists(str(journal) + ".replay"))
+        await submitter.stop(timeout=0.2)
+
+    asyncio.run(while_down())
+
+    backend = FakeBackend()
+
+    async def after_restart():
+        submitter = make_submitter(backend.url, journal)
+        submitter.start()
+        await wait_for(lambda: len({r["submission_id"] for r in backend.received()}) == 8
+                       and not os.path.exists(str(journal) + ".replay"))
+        await submitter.stop()
+
+    try:
+        asyncio.run(after_restart())
+    finally:
+        backend.close()
+    scores = {r["player1_score"] for r in backend.received()}
+    assert scores == set(range(5)) | {100, 101, 102}
+    assert not journal.exists() and not os.path.exists(str(journal) + ".replay")
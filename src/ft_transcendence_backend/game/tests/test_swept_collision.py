@@ -0,0 +1,59 @@
+import os
+import sys
+import pytest
+
+GAME_DIR = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.abspath(GAME_DIR))
+
+from models.game import PongGame
+from models.player import Player, PlayerType, Controls
+
+
+def make_game(paddle_size="small"):
+    player1 = Player(id="p1", name="a", player_type=PlayerType.HUMAN, controls=Controls.WASD)
+    player2 = Player(id="p2", name="b", player_type=PlayerType.HUMAN, controls=Controls.ARROWS)
+    game = PongGame({"paddle_size": paddle_size, "winning_score": 5}, player1, player2)
+    game.game_active = True
+    return game
+
+
+@pytest.mark.parametrize("dt", [1/60, 1/30, 1/10])
+def test_fast_ball_hits_paddle_at_crossing_point(dt):
+    game = make_game()
+    game.ball_speed = game.MAX_BALL_SPEED
+    # Ball fliegt steil nach rechts oben; am Ende des Ticks läge er weit außerhalb des Paddles
+    game.ball_pos = [0.94, 0.0]
+    game.ball_direction = [0.6, 0.8]
+    game.player2.paddle_pos = 0.0
+
+    game.update_game_state(dt)
+
+    assert game.ball_direction[0] < 0
+    assert game.player1.score == 0
+    # Der Treffpunkt liegt auf der Bahn an der Paddle-Ebene
+    expected_y = (game.PADDLE_X - 0.94) / 0.6 * 0.8
+    assert game.ball_pos[1] == pytest.approx(expected_y)
+
+
+def test_ball_behind_paddle_plane_cannot_be_caught():
+    game = make_game()
+    game.ball_pos = [0.97, 0.0]
+    game.ball_direction = [1.0, 0.0]
+    game.player2.paddle_pos = 0.0
+
+    game.update_game_state()
+
+    assert game.ball_direction[0] > 0
+
+
+def test_crossing_with_wall_reflection_in_same_tick():
+    game = make_game("big")
+    game.ball_speed = game.MAX_BALL_SPEED
+    game.ball_pos = [-0.94, 0.995]
+    game.ball_direction = [-0.6, 0.8]
+    game.player1.paddle_pos = 0.6
+
+    game.update_game_state(1/10)
+
+    assert game.ball_direction[0] > 0
+    assert -1.0 <= game.ball_pos[1] <= 1.0
@@ -0,0 +1,88 @@
+import asyncio
+import os
+import sys
+
+GAME_DIR = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.abspath(GAME_DIR))
+
+from tick_scheduler import TickScheduler
+from game_server import GameServer
+from models.player import Player, PlayerType, Controls
+
+
+async def no_frame():
+    pass
+
+
+def make_scheduler(step, max_substeps=5):
+    # 0.25 s ist binär exakt: keine Rundungsreste im Akkumulator
+    return TickScheduler(step, no_frame, tick_rate=0.25, max_substeps=max_substeps)
+
+
+def test_fixed_steps_catch_up_and_drop():
+    dts = []
+    scheduler = make_scheduler(dts.append)
+
+    assert scheduler.advance(0.2) == 0           # noch kein voller Tick
+    assert scheduler.advance(0.25) == 1
+    assert scheduler.advance(1.0) == 3           # zurückgefallen: nachholen
+    assert scheduler.advance(3.0) == 5           # höchstens max_substeps ...
+    assert scheduler.dropped_ticks == 3          # ... der Rest wird verworfen
+    assert scheduler.advance(3.25) == 1
+    assert set(dts) == {0.25}
+    assert scheduler.ticks == len(dts) == 10
+
+
+def test_failing_step_does_not_stop_the_loop():
+    calls = []
+
+    def step(dt):
+        calls.append(dt)
+        raise RuntimeError("boom")
+
+    async def scenario():
+        scheduler = TickScheduler(step, no_frame, tick_rate=1 / 200)
+        scheduler.start()
+        await asyncio.sleep(0.1)
+        running = scheduler.is_running()
+        scheduler.stop()
+        return running
+
+    assert asyncio.run(scenario())
+    assert len(calls) > 5
+
+
+def add_game(server, game_id):
+    player1 = Player(id="p1", name="a", player_type=PlayerType.HUMAN, controls=Controls.WASD)
+    player2 = Player(id="p2", name="b", player_type=PlayerType.HUMAN, controls=Controls.ARROWS)
+    game = server.create_game(game_id, {"record_replay": False}, player1, player2)
+    server.active_games[game_id] = game
+    server.game_websockets[game_id] = []
+    game.start_game()
+    return game
+
+
+def test_game_that_raises_is_removed_and_others_keep_running():
+    async def scenario():
+        server = GameServer()
+        healthy = add_game(server, "healthy")
+        broken = add_game(server, "broken")
+
+        class BrokenAI:
+            difficulty = "medium"
+
+            def decide(self, game):
+                raise ValueError("AI bug")
+        server.ai_players["broken"] = BrokenAI()
+
+        before = list(healthy.ball_pos)
+        server.step_games(1 / 60)
+        await asyncio.sleep(0)  # abort_game läuft als eigener Task
+        await asyncio.sleep(0)
+        server.step_games(1 / 60)
+        return server, healthy, before
+
+    server, healthy, before = asyncio.run(scenario())
+    assert "broken" not in server.active_games and "broken" not in server.pending_states
+    assert "healthy" in server.active_games and "healthy" in server.pending_states
+    assert list(healthy.ball_pos) != before
@@ -0,0 +1,100 @@
+import os
+import sys
+
+GAME_DIR = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.abspath(GAME_DIR))
+
+from models.player import Player, PlayerType, Controls
+from tournament_manager import TournamentManager
+
+
+def make_entries(count):
+    entries = []
+    for i in range(count):
+        player = Player(id=str(i), name=f"t{i}", player_type=PlayerType.HUMAN, controls=Controls.ARROWS)
+        player.user_profile = {"username": f"user{i}"}
+        entries.append({"websocket": None, "player": player})
+    return entries
+
+
+def play_out(manager):
+    """Spielt alle Runden; Sieger wird per Username gemeldet, der Verlierer meldet danach widersprüchlich"""
+    manager.create_matchups()
+    while True:
+        for p1, p2 in list(manager.active_matches):
+            match_id = manager.match_of(p1).match_id
+            manager.report_result(p1["player"].user_profile["username"], match_id, p1["token"])
+            manager.report_result(p2["player"].name, match_id, p2["token"])
+        assert manager.is_round_complete()
+        if manager.is_finished():
+            return
+        manager.next_round()
+
+
+def test_large_bracket_records_each_match_once():
+    manager = TournamentManager(make_entries(1024))
+    play_out(manager)
+
+    assert manager.total_rounds == 10
+    assert len(manager.match_history) == 1023
+    assert manager.get_winner() == manager.match_history[-1]["winner"]
+    assert manager.current_round == 10
+
+
+def test_bracket_with_byes_completes():
+    manager = TournamentManager(make_entries(6))
+    play_out(manager)
+
+    assert len(manager.match_history) == 5
+    assert manager.get_winner() is not None
+    assert manager.report_result("unknown", "1-0", manager.players[0]["token"]) is None
+
+
+def test_late_or_foreign_reports_do_not_decide_the_next_match():
+    manager = TournamentManager(make_entries(4))
+    manager.create_matchups()
+    (a, b), (c, d) = manager.active_matches
+    first = manager.match_of(a).match_id
+
+    # Beide Clients melden; der Sieger zuerst, das Folgematch startet sofort
+    manager.report_result(a["player"].name, first, a["token"])
+    manager.report_result(c["player"].name, manager.match_of(c).match_id, c["token"])
+    manager.start_ready_matches()
+    final = manager.match_of(a).match_id
+
+    # Späte Meldung des Verlierers mit der id des entschiedenen Matches
+    assert manager.report_result(b["player"].name, first, b["token"]) is None
+    # Falsche Match-id, fremdes bzw. fehlendes Token, Sieger außerhalb des Matches
+    assert manager.report_result(a["player"].name, first, a["token"]) is None
+    assert manager.report_result(a["player"].name, final, b["token"]) is None
+    assert manager.report_result(a["player"].name, final, None) is None
+    assert manager.report_result(b["player"].name, final, a["token"]) is None
+    assert len(manager.match_history) == 2 and not manager.is_finished()
+
+    manager.report_result(c["player"].name, final, c["token"])
+    assert manager.get_winner() == c["player"].name
+
+
+def test_duplicate_tournament_names_are_told_apart_by_seat():
+    entries = make_entries(4)
+    for entry in entries:
+        entry["player"].name = "Unknown"
+        entry["player"].user_profile = None
+    manager = TournamentManager(entries)
+    manager.create_matchups()
+    (a, b), (c, d) = manager.active_matches
+    first, second = manager.match_of(a).match_id, manager.match_of(c).match_id
+
+    # Name allein ist mehrdeutig; die Rolle bestimmt den Sieger
+    assert manager.report_result("Unknown", first, a["token"]) is None
+    manager.report_result("Unknown", first, b["token"], "player2")
+    manager.report_result("Unknown", second, c["token"], "player1")
+    assert manager.match_of(a) is None and manager.match_of(d) is None
+    manager.start_ready_matches()
+    final = manager.match_of(b)
+    assert final is manager.match_of(c) and final.players == [b, c]
+    assert manager.report_result("Unknown", second, c["token"], "player2") is None  # schon entschieden
+
+    manager.report_result("Unknown", final.match_id, b["token"], "player2")
+    assert manager.is_finished() and manager.schedule.champion is c
+    assert [m["winner"] for m in manager.match_history] == ["Unknown"] * 3
@@ -0,0 +1,112 @@
+import asyncio
+import os
+import sys
+
+GAME_DIR = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.abspath(GAME_DIR))
+
+from game_server import GameServer
+from menu import Menu
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.query_params = {}
+        self.sent = []
+
+    async def send_json(self, message):
+        self.sent.append(message)
+
+
+def test_tournaments_of_different_sizes_run_side_by_side():
+    async def scenario():
+        menu = Menu(GameServer())
+        small = [FakeWebSocket() for _ in range(4)]
+        large = [FakeWebSocket() for _ in range(6)]
+        quitter = FakeWebSocket()
+
+        await menu.handle_menu_selection(quitter, "play_tournament", {"tournament_name": "quitter"}, tournament_size=6)
+        await menu.handle_menu_selection(quitter, "cancel_search")
+        for i, ws in enumerate(large[:3]):
+            await menu.handle_menu_selection(ws, "play_tournament", {"tournament_name": f"l{i}"}, tournament_size=6)
+        for i, ws in enumerate(small):
+            await menu.handle_menu_selection(ws, "play_tournament", {"tournament_name": f"s{i}"}, tournament_size=4)
+        for i, ws in enumerate(large[3:], start=3):
+            await menu.handle_menu_selection(ws, "play_tournament", {"tournament_name": f"l{i}"}, tournament_size="6")
+        return menu, small, large, quitter
+
+    menu, small, large, quitter = asyncio.run(scenario())
+
+    small_ready = small[0].sent[-1]
+    large_ready = large[0].sent[-1]
+    assert small_ready["action"] == large_ready["action"] == "tournament_ready"
+    assert small_ready["tournament_id"] != large_ready["tournament_id"]
+    assert len(small_ready["players"]) == 4 and small_ready["total_rounds"] == 2
+    assert len(large_ready["players"]) == 6 and large_ready["total_rounds"] == 3
+    assert all(ws.sent[-1]["tournament_id"] == large_ready["tournament_id"] for ws in large)
+    assert "quitter" not in {p["tournament_name"] for p in large_ready["players"]}
+    assert len(menu.tournaments) == 2 and not menu.tournaments.lobby_of
+
+    # Ergebnisse werden per id dem richtigen Turnier zugeordnet
+    small_tournament = menu.tournaments.get(small_ready["tournament_id"])
+    large_tournament = menu.tournaments.get(large_ready["tournament_id"])
+    asyncio.run(menu.start_tournament_matches(small_ready["tournament_id"]))
+    winner = small_tournament.active_matches[0][0]
+    small_tournament.record_result(small_tournament.match_of(winner), winner)
+    assert small_tournament.results == {winner["player"].name: 1}
+    assert large_tournament.match_history == [] and not large_tournament.active_matches
+    found = [ws.sent[-1] for ws in small]
+    assert all(m["action"] == "game_found" and m["settings"]["tournament_id"] == small_ready["tournament_id"]
+               for m in found)
+
+
+def test_menu_size_and_format_selection_reach_the_registry():
+    async def scenario():
+        menu = Menu(GameServer())
+        ws = FakeWebSocket()
+        profile = {"tournament_name": "alice"}
+        replies = [await menu.handle_menu_selection(ws, "play_tournament", profile)]
+        replies.append(await menu.handle_menu_selection(ws, "8_players"))
+        replies.append(await menu.handle_menu_selection(ws, "back"))
+        replies.append(await menu.handle_menu_selection(ws, "6_players"))
+        # Beitritt wie in displayMenu.js: Größe und Format aus der Menü-Auswahl
+        replies.append(await menu.handle_menu_selection(ws, "play_tournament", profile,
+                                                        tournament_size=6, tournament_format="swiss"))
+        return menu, ws, replies
+
+    menu, ws, replies = asyncio.run(scenario())
+    size_menu, format_menu, back_menu, format_menu_again, joined = replies
+    assert [item["id"] for item in size_menu["menu_items"]][:3] == ["4_players", "6_players", "8_players"]
+    assert [item["id"] for item in format_menu["menu_items"]][:3] == ["knockout", "swiss", "round_robin"]
+    assert back_menu["menu_items"] == size_menu["menu_items"]
+    assert format_menu_again["menu_items"] == format_menu["menu_items"]
+    assert joined is None
+    assert menu.tournaments.lobby_of[ws] == ("swiss", 6)
+    assert [e["player"].name for e in menu.tournaments.waiting(6, "swiss")] == ["alice"]
+
+
+def test_menu_session_is_kept_only_with_the_server_issued_token():
+    menu = Menu(GameServer())
+    first = FakeWebSocket()
+    first.query_params = {"session": ""}
+    token = menu.open_session(first)
+    menu.get_session(first).menu_stack.append("main")
+    menu.close_session(first)
+
+    again = FakeWebSocket()
+    again.query_params = {"session": token}
+    assert menu.open_session(again) == token
+    assert menu.get_session(again).menu_stack == ["main"]
+
+    # Ein geratenes Token (z.B. eine user_id) bekommt eine eigene, neue Session
+    guessed = FakeWebSocket()
+    guessed.query_params = {"session": "user:1"}
+    assert menu.open_session(guessed) not in (token, "user:1")
+    assert menu.get_session(guessed).menu_stack == []
+
+    # Ohne ?session= bleibt die Session an der Verbindung
+    helper = FakeWebSocket()
+    assert menu.open_session(helper) is None
+    menu.get_session(helper)
+    menu.close_session(helper)
+    assert helper not in menu.sessions
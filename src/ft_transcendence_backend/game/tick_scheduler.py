@@ -0,0 +1,112 @@
+import asyncio
+import time
+import logging
+from metrics import TICK_DURATION, TICK_OVERRUNS, TICKS_DROPPED
+
+logger = logging.getLogger('game')
+
+
+class TickScheduler:
+    """
+    Zentraler Fixed-Timestep-Scheduler: ein einziger Loop treibt alle aktiven Spiele.
+
+    Pro Durchlauf wird die vergangene Zeit (monotone Uhr) in einen Akkumulator
+    gebucht und in festen Schritten von `tick_rate` abgearbeitet. Liegt der Loop
+    zurück, werden höchstens `max_substeps` Schritte nachgeholt, der Rest wird
+    verworfen und als Overrun gezählt.
+    """
+
+    def __init__(self, step, frame, tick_rate: float = 1/60, max_substeps: int = 5):
+        self.step = step                  # sync, wird pro Physik-Schritt aufgerufen: step(dt)
+        self.frame = frame                # async, wird einmal pro Durchlauf aufgerufen (z.B. senden)
+        self.tick_rate = tick_rate
+        self.max_substeps = max_substeps
+        self.task = None
+        self.previous = 0.0               # Zeitpunkt des letzten Durchlaufs (monotone Uhr)
+        self.accumulator = 0.0            # noch nicht abgearbeitete Zeit
+
+        # Statistiken für Monitoring
+        self.ticks = 0
+        self.frames = 0
+        self.overruns = 0                 # Durchläufe, die länger als tick_rate gedauert haben
+        self.dropped_ticks = 0            # verworfene Schritte, weil max_substeps erreicht war
+        self.last_tick_duration = 0.0
+        self.last_overrun = 0.0           # Sekunden über dem Budget im letzten Durchlauf
+
+    def start(self):
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+        return self.task
+
+    def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    def is_running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    async def run(self):
+        logger.info(f"Tick scheduler started ({1 / self.tick_rate:.0f} Hz)")
+        self.previous = time.monotonic()
+        self.accumulator = 0.0
+
+        while True:
+            now = time.monotonic()
+            substeps = self.advance(now)
+
+            if substeps:
+                try:
+                    await self.frame()
+                except Exception as e:
+                    logger.error(f"Error in tick frame: {e}")
+                self.frames += 1
+
+            self.last_tick_duration = time.monotonic() - now
+            self.last_overrun = max(0.0, self.last_tick_duration - self.tick_rate)
+            if substeps:
+                TICK_DURATION.observe(self.last_tick_duration)
+            if self.last_overrun > 0:
+                self.overruns += 1
+                TICK_OVERRUNS.inc()
+
+            # Bis zum nächsten Tick-Zeitpunkt schlafen
+            await asyncio.sleep(max(0.0, self.tick_rate - self.accumulator - (time.monotonic() - now)))
+
+    def advance(self, now: float) -> int:
+        """
+        Bucht die Zeit bis `now` und führt die fälligen festen Schritte aus.
+        Gibt die Anzahl der ausgeführten Schritte zurück.
+        """
+        self.accumulator += now - self.previous
+        self.previous = now
+
+        substeps = 0
+        while self.accumulator >= self.tick_rate and substeps < self.max_substeps:
+            try:
+                self.step(self.tick_rate)
+            except Exception:
+                # Ein Fehler darf den einzigen Loop nicht beenden, sonst stehen alle Spiele
+                logger.exception("Error in tick step")
+            self.accumulator -= self.tick_rate
+            substeps += 1
+            self.ticks += 1
+
+        if self.accumulator >= self.tick_rate:
+            # Zu weit zurück: nicht endlos nachholen, sondern verwerfen
+            dropped = int(self.accumulator / self.tick_rate)
+            self.dropped_ticks += dropped
+            TICKS_DROPPED.inc(dropped)
+            self.accumulator -= dropped * self.tick_rate
+            logger.warning(f"Tick scheduler behind, dropped {dropped} ticks")
+        return substeps
+
+    def get_stats(self) -> dict:
+        return {
+            "ticks": self.ticks,
+            "frames": self.frames,
+            "overruns": self.overruns,
+            "dropped_ticks": self.dropped_ticks,
+            "last_tick_duration": self.last_tick_duration,
+            "last_overrun": self.last_overrun,
+        }
@@ -1,222 +1,241 @@
+import secrets
 import uuid
-import math
-from random import shuffle
+from bracket import Bracket
+from league import RoundRobin, Swiss
+from models.player import Player, PlayerType, Controls
+
+# Turnierformat -> Spielplan (gleiche Schnittstelle: ready, start_ready, record, champion, placements)
+FORMATS = {
+    "knockout": Bracket,
+    "swiss": Swiss,
+    "round_robin": RoundRobin,
+}
+DEFAULT_FORMAT = "knockout"
+ROLES = ("player1", "player2")  # Rolle im Spiel = Position in match.players
+
+
+def player_names(entry) -> set:
+    """Turniername und Username eines Teilnehmers"""
+    player = entry["player"]
+    profile = getattr(player, "user_profile", None) or {}
+    return {player.name, profile.get("username")} - {None}
+
 
 class TournamentManager:
-    def __init__(self, players):
-        self.players = players  # list of {"websocket": ..., "player": Player}
+    """
+    Turnier auf Basis eines Spielplans: KO (bracket.Bracket), Schweizer System oder
+    Rundenturnier (league.Swiss / league.RoundRobin).
+
+    Matches werden nicht rundenweise gestartet: sobald die Spieler eines Matches
+    feststehen und frei sind, ist es bereit und wird beim nächsten
+    create_matchups()/next_round() gestartet. current_round ist die höchste Runde
+    mit gestartetem Match.
+    """
+
+    def __init__(self, players, tournament_id=None, rng=None, format=DEFAULT_FORMAT, seeds=None):
+        self.tournament_id = tournament_id or str(uuid.uuid4())
+        self.format = format if format in FORMATS else DEFAULT_FORMAT
+        self.size = len(players)
+        self.players = players  # list of {"websocket": ..., "player": Player, "token": str}, alle Teilnehmer
+        for entry in players:
+            # Geheimes Token pro Platz: nur damit zählen Ergebnismeldungen des Clients
+            entry.setdefault("token", secrets.token_urlsafe(16))
+        # seeds: feste Setzreihenfolge (beim Wiederherstellen), sonst wird nach Rating gesetzt
+        if seeds is not None:
+            self.schedule = FORMATS[self.format](seeds, rng=rng, seeded=True)
+        else:
+            self.schedule = FORMATS[self.format](players, rng=rng)
+        self.version = 0  # steigt bei jeder Änderung, für Snapshots
         self.current_round = 1
-        self.total_rounds = self._calculate_total_rounds(len(players))
-        self.active_matches = []  # list of (p1_entry, p2_entry)
-        self.results = {}  # {winner_name: 1}
+        self.total_rounds = self.schedule.total_rounds
+        self.running = {}  # match_id -> BracketMatch, gestartet und noch offen
+        self.wins = {}  # Token -> Siege der Spieler, die noch im Turnier sind (inkl. Freilos)
         self.match_history = []  # speichert alle abgeschlossenen Matches
+        self.decided = []  # (match_id, Token des Siegers) in Ergebnisreihenfolge, für Snapshots
         self.finished = False
-        self.preview_next_round = []  # Vorschau auf die nächste Runde
-
-        # Neu: für KO-Finale & Spiel um Platz 3
-        self.final_match = None
-        self.third_place_match = None
         self.final_result = None
-        self.third_place_result = None
 
-        #print(f"📋 Turniermanager initialisiert mit {len(players)} Spielern")
-
-    def _calculate_total_rounds(self, num_players):
-        return math.ceil(math.log2(num_players))
+        # Alles intern nach Platz-Token: Turniernamen sind nicht eindeutig (Default "Unknown")
+        self.player_index = {entry["token"]: entry for entry in players}
+        self.match_index = {}  # Token -> laufendes BracketMatch
+
+        for entry in self.schedule.byes:
+            self._add_win(entry)  # bye round
+        if self.schedule.champion:
+            self._finish()
+
+    @property
+    def results(self):
+        """
+        {Turniername: 1} für Spieler, die noch im Turnier sind und schon gewonnen haben,
+        bzw. in Ligaformaten {Turniername: Siege}. Nur zur Anzeige (die Tokens sind geheim).
+        """
+        return {self.player_index[token]["player"].name: wins for token, wins in self.wins.items()}
+
+    @property
+    def active_matches(self):
+        """Laufende Matches als (p1_entry, p2_entry)"""
+        return [(match.players[0], match.players[1]) for match in self.running.values()]
+
+    def start_ready_matches(self):
+        """Startet alle Matches, deren Spieler feststehen, und gibt die BracketMatches zurück"""
+        started = self.schedule.start_ready()
+        for match in started:
+            self.running[match.match_id] = match
+            self.match_index[match.players[0]["token"]] = match
+            self.match_index[match.players[1]["token"]] = match
+            self.current_round = max(self.current_round, match.round)
+        if started:
+            self.version += 1
+        return started
 
     def create_matchups(self):
-        shuffle(self.players)
-        self.active_matches = []
-
-        for i in range(0, len(self.players), 2):
-            if i + 1 < len(self.players):
-                self.active_matches.append((self.players[i], self.players[i + 1]))
-            else:
-                name = self.players[i]["player"].name
-                self.results[name] = 1  # bye round
-                #print(f"🛋️ {name} bekommt ein Freilos")
-
-        return self.active_matches
-
-     # --- Komplette, überarbeitete record_result Methode ---
-    def record_result(self, winner_name):
-        # Schritt 1: Finde das korrekte Player-Objekt und den Turniernamen
-        tournament_player = None
-        original_input_name = winner_name # Merken, falls wir den Spieler nicht finden
-        for player_entry in self.players:
-            player = player_entry["player"]
-            # Prüfe zuerst den Turniernamen (player.name)
-            if player.name == winner_name:
-                tournament_player = player
-                break
-            # Fallback: Prüfe den Benutzernamen aus dem Profil
-            if hasattr(player, "user_profile") and player.user_profile:
-                if player.user_profile.get("username") == winner_name:
-                    tournament_player = player
-                    winner_name = player.name # Stelle sicher, dass wir den Turniernamen verwenden
-                    break
-
-        if not tournament_player:
-            #print(f"⚠️ Kein passender Spieler im aktuellen Turnier gefunden für: {original_input_name}")
-            # Überlege, ob hier die Suche in *allen* ursprünglichen Spielern sinnvoll wäre,
-            # falls ein ausgeschiedener Spieler fälschlicherweise ein Ergebnis sendet.
-            # Aktuell: Ignorieren, wenn Spieler nicht (mehr) aktiv ist.
-            return
-
-        # Stelle sicher, dass wir immer den internen Turniernamen verwenden
-        winner_tournament_name = tournament_player.name
-
-        # Schritt 2: Prüfe, ob es sich um das Finale oder Spiel um Platz 3 handelt
-        # (Diese Logik bleibt unverändert)
-        if self.final_match:
-            p1 = self.final_match[0]["player"].name
-            p2 = self.final_match[1]["player"].name
-            if winner_tournament_name in [p1, p2]:
-                loser = p2 if winner_tournament_name == p1 else p1
-                self.final_result = {"winner": winner_tournament_name, "loser": loser}
-                self.finished = True # Turnier ist definitiv vorbei
-                #print(f"🏁 Finalspiel beendet! Gewinner: {winner_tournament_name}")
-                return # Frühzeitiger Ausstieg, da das Ergebnis speziell behandelt wurde
-
-        if self.third_place_match:
-            p1 = self.third_place_match[0]["player"].name
-            p2 = self.third_place_match[1]["player"].name
-            if winner_tournament_name in [p1, p2]:
-                loser = p2 if winner_tournament_name == p1 else p1
-                self.third_place_result = {"winner": winner_tournament_name, "loser": loser}
-                #print(f"🥉 Spiel um Platz 3 beendet! Gewinner: {winner_tournament_name}")
-                # Hier nicht unbedingt self.finished setzen, Finale könnte noch laufen
-                # und hier nicht return, da das Ergebnis auch für die normale Runde zählen könnte (falls Logik so gedacht)
-                # Besser: Klar trennen oder sicherstellen, dass diese Matches nicht in active_matches sind.
-                # Annahme hier: Diese Matches sind separat und wir können hier returnen.
-                return
-
-        # Schritt 3: Prüfe auf doppelte Einträge für normale Rundenspiele
-        if winner_tournament_name in self.results:
-            #print(f"⚠️ Ergebnis für {winner_tournament_name} in dieser Runde bereits eingetragen – ignoriert.")
-            return
-
-        # Schritt 4: Ergebnis für normale Runde eintragen
-        self.results[winner_tournament_name] = 1
-        #print(f"✅ Ergebnis für Runde {self.current_round} eingetragen: {winner_tournament_name}")
-
-        # Schritt 5: Match History aktualisieren (Verlierer finden)
-        loser_name = None
-        match_found = False
-        for p1_entry, p2_entry in self.active_matches:
-            p1_name = p1_entry["player"].name
-            p2_name = p2_entry["player"].name
-            if winner_tournament_name in [p1_name, p2_name]:
-                loser_name = p2_name if winner_tournament_name == p1_name else p1_name
-                self.match_history.append({
-                    "round": self.current_round,
-                    "player1": p1_name,
-                    "player2": p2_name,
-                    "winner": winner_tournament_name,
-                    "loser": loser_name
-                })
-                match_found = True
-                break
-        if not match_found:
-             print(f"⚠️ Konnte kein aktives Match für den Sieger {winner_tournament_name} finden, um den Verlierer zu bestimmen.")
-
-
-        # Schritt 6: Prüfen, ob die Runde beendet ist und ob das Turnier damit endet
-        # Zähle, wie viele Ergebnisse für die *aktuell aktiven Matches* vorliegen.
-        # Vorsicht bei Freilosen - diese sind schon in results, aber nicht in active_matches.
-        # Sicherer ist oft, die Anzahl der erwarteten Matches pro Runde zu kennen.
-        # Annahme: len(self.active_matches) repräsentiert die Spiele dieser Runde.
-        if len(self.results) >= len(self.active_matches):
-            #print(f"🎯 Alle {len(self.active_matches)} Spiele der Runde {self.current_round} abgeschlossen. Prüfe Turnierstatus...")
-
-            # Gewinner dieser Runde (alle Namen im results-Dictionary)
-            current_round_winners = list(self.results.keys())
-            #print(f"   Sieger dieser Runde: {current_round_winners}")
-
-            # Prüfen, ob nur noch EIN Sieger übrig ist
-            if len(current_round_winners) == 1:
-                # Nur noch ein Gewinner übrig -> Turnier ist beendet!
-                final_winner = current_round_winners[0]
-                self.finished = True
-
-                # --- ★★★ HIER DIE WICHTIGE ÄNDERUNG ★★★ ---
-                # Setze self.final_result, damit get_winner() es findet!
-                # Finde den Verlierer des letzten Matches für das final_result dict
-                final_match_loser = None
-                # Wir brauchen das Match, das gerade beendet wurde und dessen Sieger `final_winner` ist.
-                # Die `match_history` sollte den aktuellsten Eintrag dafür haben.
-                if self.match_history:
-                    last_match = self.match_history[-1]
-                    # Stelle sicher, dass das letzte Match wirklich zu diesem finalen Ergebnis gehört
-                    if last_match["winner"] == final_winner and last_match["round"] == self.current_round :
-                       final_match_loser = last_match["loser"]
-
-                # Fallback, falls Verlierer nicht gefunden wurde (sollte nicht sein)
-                if final_match_loser is None:
-                     final_match_loser = "Unknown"
-                     #print(f"⚠️ Konnte Verlierer des Finalspiels nicht aus Match-History ermitteln.")
-
-
-                self.final_result = {"winner": final_winner, "loser": final_match_loser}
-                #print(f"🏁 Turnier ist jetzt beendet! Final Result wurde gesetzt. Gewinner: {final_winner}")
-                # --- Ende der wichtigen Änderung ---
-
-            else:
-                 # Turnier geht weiter, Vorschau für nächste Runde optional vorbereiten
-                 #print(f"   Turnier geht weiter in Runde {self.current_round + 1} mit {len(current_round_winners)} Spielern.")
-
-                 # Vorschau-Logik (optional, kann hier bleiben oder in eigene Methode)
-                 next_players_entries = [
-                     entry for entry in self.players
-                     if entry["player"].name in current_round_winners # Filter für die Gewinner
-                 ]
-
-                 temp_matches_preview = []
-                 players_copy = next_players_entries[:] # Kopie für Shuffle
-                 shuffle(players_copy)
-
-                 for i in range(0, len(players_copy), 2):
-                     if i + 1 < len(players_copy):
-                         temp_matches_preview.append((players_copy[i], players_copy[i + 1]))
-                     else:
-                         # Vorschau auf Freilos in der nächsten Runde
-                         print(f"🛋️ Vorschau: {players_copy[i]['player'].name} hätte in der nächsten Runde ein Freilos")
-
-                 #print("🔮 Vorschau auf nächste Matchups (vor `next_round`):")
-                 for p1_entry, p2_entry in temp_matches_preview:
-                     print(f"   ➤ {p1_entry['player'].name} vs {p2_entry['player'].name}")
-                 self.preview_next_round = temp_matches_preview # Vorschau speichern
+        return [(match.players[0], match.players[1]) for match in self.start_ready_matches()]
+
+    def has_ready_matches(self):
+        return bool(self.schedule.ready)
+
+    def is_round_complete(self):
+        """Kein Match läuft mehr (alle gestarteten sind entschieden)"""
+        return not self.running
+
+    def report_result(self, winner, match_id, token, winner_role=None):
+        """
+        Ergebnismeldung eines Clients. Zählt nur für das offene Match match_id, nur vom Token
+        eines seiner Spieler und nur mit einem seiner Spieler als Sieger. Späte oder doppelte
+        Meldungen (das Match ist schon entschieden) werden so nicht dem nächsten Match zugerechnet.
+
+        Der Sieger wird über seine Rolle (player1/player2) bestimmt, sonst über Turnier- bzw.
+        Username, aber nur wenn das innerhalb des Matches eindeutig ist.
+        """
+        match = self.running.get(match_id)
+        if match is None or token is None:
+            return None
+        if all(entry["token"] != token for entry in match.players):
+            return None
+        if winner_role in ROLES:
+            winner_entry = match.players[ROLES.index(winner_role)]
+        else:
+            candidates = [entry for entry in match.players if winner is not None and winner in player_names(entry)]
+            if len(candidates) != 1:
+                return None
+            winner_entry = candidates[0]
+        return self.record_result(match, winner_entry)
+
+    def match_of(self, entry):
+        """Laufendes Match eines Spielers oder None"""
+        return self.match_index.get(entry["token"])
+
+    def record_result(self, match, winner_entry):
+        """
+        Trägt den Sieger eines laufenden Matches ein. Entschiedene Matches sind nicht mehr in
+        running, eine zweite (widersprüchliche) Meldung wird so ignoriert.
+        """
+        if self.running.get(match.match_id) is not match:
+            return None
+        if all(entry is not winner_entry for entry in match.players):
+            return None
+        for entry in match.players:
+            self.match_index.pop(entry["token"], None)
+        del self.running[match.match_id]
+
+        byes_before = len(self.schedule.byes)
+        newly_ready = self.schedule.record(match, winner_entry)
+        self._add_win(winner_entry)
+        if self.schedule.eliminates:
+            self.wins.pop(match.loser["token"], None)
+        for entry in self.schedule.byes[byes_before:]:
+            self._add_win(entry)  # Swiss: Freilos der neu gepaarten Runde
+        self.match_history.append({
+            "round": match.round,
+            "player1": match.players[0]["player"].name,
+            "player2": match.players[1]["player"].name,
+            "winner": winner_entry["player"].name,
+            "loser": match.loser["player"].name
+        })
+        self.decided.append((match.match_id, winner_entry["token"]))
+
+        if self.schedule.champion:
+            self._finish()
+        self.version += 1
+        return newly_ready
+
+    def _add_win(self, entry):
+        token = entry["token"]
+        if self.schedule.eliminates:
+            self.wins[token] = 1
+        else:
+            self.wins[token] = self.wins.get(token, 0) + 1
+
+    def _finish(self):
+        placements = self.schedule.placements()
+        self.finished = True
+        self.final_result = {
+            "winner": placements[0],
+            "loser": placements[1] if len(placements) > 1 else None
+        }
+
+    def get_standings(self):
+        """Tabelle (Siege, Buchholz) für Ligaformate, sonst None"""
+        if self.schedule.standings is None:
+            return None
+        return self.schedule.standings.table()
+
+    def to_snapshot(self) -> dict:
+        """
+        Kompakter Zustand: Teilnehmer, Setzreihenfolge und die Sieger in Ergebnisreihenfolge.
+        Der Spielplan ist damit deterministisch, der Rest wird beim Laden nachgespielt.
+        """
+        return {
+            "tournament_id": self.tournament_id,
+            "format": self.format,
+            "players": [
+                {"id": e["player"].id, "name": e["player"].name, "user_profile": e["player"].user_profile,
+                 "token": e["token"]}
+                for e in self.players
+            ],
+            "seeds": [e["token"] for e in self.schedule.seeds],
+            "decided": [list(result) for result in self.decided],
+            "running": list(self.running),
+        }
 
+    @classmethod
+    def from_snapshot(cls, data: dict) -> "TournamentManager":
+        """Baut das Turnier nach; Websockets sind None, bis die Spieler sich neu verbinden"""
+        players = []
+        for info in data["players"]:
+            player = Player(id=info["id"], name=info["name"], player_type=PlayerType.HUMAN, controls=Controls.ARROWS)
+            player.user_profile = info.get("user_profile")
+            players.append({"websocket": None, "player": player, "token": info["token"]})
+        by_token = {entry["token"]: entry for entry in players}
+        manager = cls(players, tournament_id=data["tournament_id"], format=data["format"],
+                      seeds=[by_token[token] for token in data["seeds"]])
+
+        for match_id, token in data["decided"]:
+            manager.start_ready_matches()
+            manager.record_result(manager.running[match_id], by_token[token])
+        manager.start_ready_matches()
+
+        # Beim Nachspielen gestartete, vor dem Neustart aber noch nicht gestartete Matches zurücklegen
+        running = set(data["running"])
+        for match_id, match in list(manager.running.items()):
+            if match_id not in running:
+                match.started = False
+                del manager.running[match_id]
+                manager.match_index.pop(match.players[0]["token"], None)
+                manager.match_index.pop(match.players[1]["token"], None)
+                manager.schedule.ready[(match.round, match.slot)] = match
+        rounds = [match.round for match in manager.running.values()]
+        rounds += [match["round"] for match in manager.match_history]
+        manager.current_round = max(rounds, default=1)
+        manager.version = 0
+        return manager
 
     def next_round(self):
+        """Startet alle bereiten Matches (auch aus unterschiedlichen Runden)"""
         if self.is_finished():
-            #print("🏁 Turnier ist bereits beendet.")
-            self.finished = True
             return []
-
-        self.current_round += 1
-        #print(f"🚀 Starte Runde {self.current_round}")
-
-        advancing = [
-            entry for entry in self.players
-            if entry["player"].name in self.results
-        ]
-        self.players = advancing
-        self.results = {}
-
-        matchups = self.create_matchups()
-
-        # 💡 Hier ist das neue Log:
-        #print("🔮 Vorschau auf neue Matchups:")
-        for p1, p2 in matchups:
-            print(f"   ➤ {p1['player'].name} vs {p2['player'].name}")
-
-        if self.is_finished():
-            self.finished = True
-            #print(f"🏆 Turniergewinner: {self.get_winner()}")
-
-        return matchups
-
+        return self.create_matchups()
 
     def get_match_history(self):
         return self.match_history
@@ -224,50 +243,12 @@ class TournamentManager:
     def is_finished(self):
         return self.finished
 
-    
     def get_winner(self):
-        # --- Überarbeitete get_winner Methode ---
-        # print("--- DEBUG: Entering get_winner() ---")
-        # print(f"  - Current self.finished: {self.finished}")
-        # print(f"  - Current self.final_result: {self.final_result}")
-        # print(f"  - Current len(self.players): {len(self.players)}") # Länge der *aktuell* aktiven Spielerliste
-        # print(f"  - Current self.results: {self.results}") # Ergebnisse der *laufenden* Runde
-
-        winner = None # Standard
-
-        # Check 1: Explizites Finalergebnis vorhanden? (Bevorzugt)
         if self.final_result:
-            #print("  - Condition met: self.final_result exists.")
-            winner = self.final_result["winner"]
-
-        # Check 2: Turnier ist fertig markiert UND die Spielerliste wurde auf 1 reduziert?
-        #          (Dieser Fall tritt ein, wenn next_round() nach dem letzten Ergebnis lief)
-        elif self.finished and len(self.players) == 1:
-             #print("  - Condition met: self.finished is True and len(self.players) == 1.")
-             winner = self.players[0]["player"].name
-
-        # Check 3: Turnier ist fertig, aber final_result nicht gesetzt UND results hat nur einen Eintrag?
-        #          (Dieser Fall fängt das Szenario direkt in record_result ab, *bevor* next_round lief)
-        #          Diese Bedingung wurde in die überarbeitete get_winner eingefügt (siehe frühere Antwort),
-        #          ist aber mit der Änderung in record_result (Setzen von final_result) eventuell nicht mehr nötig.
-        #          Wir lassen sie mal drin als robusten Fallback.
-        elif self.finished and len(self.results) == 1 and self.current_round == self.total_rounds:
-             #print("  - Condition met: self.finished is True and len(self.results) == 1 (Ende in record_result).")
-             winner = list(self.results.keys())[0]
-
-        else:
-             print("  - No condition met to determine winner inside get_winner.")
-
-        #print(f"--- DEBUG: Exiting get_winner(). Returning: '{winner}' ---")
-        return winner
-        # --- Ende überarbeitete get_winner Methode ---
+            return self.final_result["winner"]
+        return None
 
     def get_current_matchups(self):
-        if self.final_match:
-            return [{
-                "player1": self.final_match[0]["player"].name,
-                "player2": self.final_match[1]["player"].name
-            }]
         return [
             {
                 "player1": p1_entry["player"].name,
@@ -280,22 +261,15 @@ class TournamentManager:
         if not self.finished or not self.final_result:
             return {}
 
-        placements = {
-            "1st": self.final_result["winner"],
-            "2nd": self.final_result["loser"]
-        }
-
-        if self.third_place_result:
-            placements["3rd"] = self.third_place_result["winner"]
-            placements["4th"] = self.third_place_result["loser"]
-
-        return placements
+        labels = ("1st", "2nd", "3rd", "4th")
+        return dict(zip(labels, self.schedule.placements()))
 
     def get_next_round_preview(self):
+        """Matches, deren Spieler feststehen, die aber noch nicht gestartet wurden"""
         return [
             {
-                "player1": p1_entry["player"].name,
-                "player2": p2_entry["player"].name
+                "player1": match.players[0]["player"].name,
+                "player2": match.players[1]["player"].name
             }
-            for p1_entry, p2_entry in self.preview_next_round
+            for match in self.schedule.ready.values()
         ]
@@ -0,0 +1,128 @@
+import time
+from collections import OrderedDict
+from tournament_manager import TournamentManager, FORMATS, DEFAULT_FORMAT
+
+TOURNAMENT_SIZES = (4, 6, 8)   # entspricht dem Turnier-Menü
+DEFAULT_SIZE = 4
+FINISHED_TTL = 600             # beendete Turniere bleiben so lange abrufbar, danach werden sie verworfen
+
+
+class TournamentRegistry:
+    """
+    Alle laufenden Turniere eines Workers, nach tournament_id.
+
+    Jede Kombination aus Format und Turniergröße hat eine eigene Warteschlange
+    (websocket -> Eintrag, in Beitrittsreihenfolge); ist sie voll, wird daraus ein
+    neuer TournamentManager mit eigener id. Nachrichten werden per id in O(1) dem
+    richtigen Turnier zugeordnet, sodass beliebig viele Turniere parallel laufen.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.tournaments = {}                                  # tournament_id -> TournamentManager
+        self.lobbies = {}                                      # (format, size) -> {websocket: {"websocket", "player"}}
+        self.lobby_of = {}                                     # websocket -> (format, size) der Warteschlange
+        self.finished = OrderedDict()                          # tournament_id -> beendet_um
+        self.seat_entries = {}                                 # Platz-Token -> (tournament_id, Eintrag), für reclaim
+
+    def __len__(self):
+        return len(self.tournaments)
+
+    @staticmethod
+    def normalize_size(size) -> int:
+        try:
+            size = int(size)
+        except (TypeError, ValueError):
+            return DEFAULT_SIZE
+        return size if size in TOURNAMENT_SIZES else DEFAULT_SIZE
+
+    @staticmethod
+    def normalize_format(format) -> str:
+        return format if format in FORMATS else DEFAULT_FORMAT
+
+    def join(self, websocket, player, size=DEFAULT_SIZE, format=DEFAULT_FORMAT):
+        """
+        Reiht den Spieler in die Warteschlange seines Formats und seiner Größe ein.
+        Gibt den neuen TournamentManager zurück, sobald die Warteschlange voll ist, sonst None.
+        """
+        key = (self.normalize_format(format), self.normalize_size(size))
+        self.leave(websocket)
+        lobby = self.lobbies.setdefault(key, {})
+        lobby[websocket] = {"websocket": websocket, "player": player}
+        self.lobby_of[websocket] = key
+        if len(lobby) < key[1]:
+            return None
+
+        entries = list(lobby.values())
+        del self.lobbies[key]
+        for entry in entries:
+            del self.lobby_of[entry["websocket"]]
+        return self.create(entries, key[0])
+
+    def leave(self, websocket):
+        """Entfernt einen wartenden Spieler aus seiner Warteschlange (O(1))"""
+        key = self.lobby_of.pop(websocket, None)
+        if key is not None:
+            lobby = self.lobbies[key]
+            lobby.pop(websocket, None)
+            if not lobby:
+                del self.lobbies[key]
+
+    def waiting(self, size, format=DEFAULT_FORMAT) -> list:
+        """Wartende Einträge einer Warteschlange in Beitrittsreihenfolge"""
+        key = (self.normalize_format(format), self.normalize_size(size))
+        return list(self.lobbies.get(key, {}).values())
+
+    def create(self, entries, format=DEFAULT_FORMAT) -> TournamentManager:
+        self.purge_finished()
+        manager = TournamentManager(entries, format=format)
+        return self.add(manager)
+
+    def add(self, manager: TournamentManager) -> TournamentManager:
+        """Registriert ein neues oder aus einem Snapshot wiederhergestelltes Turnier"""
+        self.tournaments[manager.tournament_id] = manager
+        for entry in manager.players:
+            self.seat_entries[entry["token"]] = (manager.tournament_id, entry)
+        return manager
+
+    def reclaim(self, token, websocket):
+        """
+        Ein Spieler verbindet sich nach einem Neustart des Workers neu: sein wiederhergestellter
+        Turniereintrag (noch ohne Verbindung) bekommt die neue. Nur das geheime Platz-Token aus
+        tournament_ready berechtigt dazu. Gibt das Turnier zurück, sonst None.
+        """
+        claim = self.seat_entries.get(token) if token else None
+        if claim is None:
+            return None
+        tournament_id, entry = claim
+        manager = self.tournaments.get(tournament_id)
+        if manager is None or manager.is_finished() or entry["websocket"] is not None:
+            return None
+        entry["websocket"] = websocket
+        return manager
+
+    def get(self, tournament_id):
+        if tournament_id is None:
+            return None
+        return self.tournaments.get(tournament_id)
+
+    def mark_finished(self, tournament_id):
+        """Beendete Turniere bleiben FINISHED_TTL Sekunden abrufbar (Ergebnisse, letzte Nachrichten)"""
+        if tournament_id in self.tournaments and tournament_id not in self.finished:
+            self.finished[tournament_id] = self.clock()
+
+    def remove(self, tournament_id):
+        manager = self.tournaments.pop(tournament_id, None)
+        self.finished.pop(tournament_id, None)
+        if manager is None:
+            return
+        for entry in manager.players:
+            self.seat_entries.pop(entry["token"], None)
+
+    def purge_finished(self):
+        now = self.clock()
+        while self.finished:
+            tournament_id, finished_at = next(iter(self.finished.items()))
+            if now - finished_at < FINISHED_TTL:
+                break
+            self.remove(tournament_id)
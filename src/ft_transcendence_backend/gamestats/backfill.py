@@ -0,0 +1,59 @@
+from django.db import transaction
+from django.db.models import Q
+
+BATCH_SIZE = 1000
+FIELDS = ["games", "wins", "losses", "current_streak", "best_streak", "points_for", "points_against"]
+
+
+def backfill_player_stats(user_model, gamestats_model, playerstats_model, batch_size=BATCH_SIZE) -> int:
+    """
+    Berechnet PlayerStats aller User aus der Gamestats-Historie neu (User in Batches).
+    Nimmt die Modelle als Parameter, damit die Daten-Migration ihre historischen Modelle übergeben kann.
+
+    Sicher bei laufendem Betrieb: pro Batch werden die Zeilen erst gesperrt (SELECT ... FOR UPDATE),
+    dann die Historie gelesen und die Zeilen überschrieben statt gelöscht. Ein paralleles
+    record_game wartet auf die Sperre und zählt sein Spiel danach auf den neuen Stand; ein
+    schon geschriebenes, das die Sperre hielt, ist nach seinem Commit in der gelesenen Historie.
+    Gibt die Anzahl der User zurück.
+    """
+    user_ids = list(user_model.objects.order_by("pk").values_list("pk", flat=True))
+    for start in range(0, len(user_ids), batch_size):
+        batch = user_ids[start:start + batch_size]
+        playerstats_model.objects.bulk_create([playerstats_model(user_id=user_id) for user_id in batch],
+                                              ignore_conflicts=True)
+        with transaction.atomic():
+            rows = {row.user_id: row for row in
+                    playerstats_model.objects.select_for_update().filter(user_id__in=batch).order_by("user_id")}
+            for row in rows.values():
+                for field in FIELDS:
+                    setattr(row, field, 0)
+
+            games = gamestats_model.objects.filter(Q(player1_id__in=batch) | Q(player2_id__in=batch)).order_by(
+                "created_at", "game_id").values_list("player1_id", "player2_id", "player1_score",
+                                                     "player2_score", "winner_id")
+            # Chronologisch, damit die Serien stimmen
+            for player1, player2, score1, score2, winner in games.iterator(chunk_size=batch_size):
+                sides = [(player1, score1, score2)]
+                if player2 != player1:
+                    sides.append((player2, score2, score1))
+                for user_id, points_for, points_against in sides:
+                    row = rows.get(user_id)
+                    if row is not None:
+                        record(row, points_for, points_against, winner is not None and winner == user_id)
+
+            playerstats_model.objects.bulk_update(rows.values(), FIELDS, batch_size=batch_size)
+    return len(user_ids)
+
+
+def record(row, points_for, points_against, won):
+    """Ein Spiel auf eine (ungespeicherte) Zeile rechnen, wie PlayerStats.record_game"""
+    row.games += 1
+    row.points_for += points_for
+    row.points_against += points_against
+    if won:
+        row.wins += 1
+        row.current_streak = row.current_streak + 1 if row.current_streak > 0 else 1
+        row.best_streak = max(row.best_streak, row.current_streak)
+    else:
+        row.losses += 1
+        row.current_streak = row.current_streak - 1 if row.current_streak < 0 else -1
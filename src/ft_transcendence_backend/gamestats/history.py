@@ -0,0 +1,78 @@
+import base64
+from datetime import datetime
+from django.db import connection
+from django.db.models import Q
+from .models import Gamestats
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+ORDERING = ("-created_at", "-game_id")
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(game) -> str:
+    """Position nach einem Spiel: (created_at, game_id), URL-sicher kodiert"""
+    raw = f"{game.created_at.isoformat()}|{game.game_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, game_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(game_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursor(str(e))
+
+
+def after_cursor(cursor) -> Q:
+    """Alles, was in der Sortierung (-created_at, -game_id) nach dem Cursor kommt"""
+    created_at, game_id = cursor
+    return Q(created_at__lt=created_at) | Q(created_at=created_at, game_id__lt=game_id)
+
+
+def parse_page_size(value) -> int:
+    try:
+        return min(max(int(value), 1), MAX_PAGE_SIZE)
+    except (TypeError, ValueError):
+        return DEFAULT_PAGE_SIZE
+
+
+def games_page(queryset, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Eine Seite aus einem beliebigen Gamestats-Queryset in der Sortierung ORDERING
+    (Index gamestats_created_idx). Gibt (spiele, next_cursor) zurück.
+    """
+    if cursor is not None:
+        queryset = queryset.filter(after_cursor(cursor))
+    games = list(queryset.order_by(*ORDERING)[:limit + 1])
+    next_cursor = encode_cursor(games[limit - 1]) if len(games) > limit else None
+    return games[:limit], next_cursor
+
+
+def user_history(user_id, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Eine Seite der Match-Historie eines Users, neueste zuerst. Gibt (spiele, next_cursor) zurück.
+
+    Statt WHERE player1 = x OR player2 = x (verhindert in Postgres die Nutzung eines
+    Index für Filter und Sortierung) zwei Zweige, jeder ein Index-Scan über
+    (playerN, -created_at, -game_id) mit LIMIT, zusammengeführt per UNION ALL.
+    Keyset-Pagination: die nächste Seite beginnt nach (created_at, game_id) des letzten Spiels.
+    """
+    branches = [
+        Gamestats.objects.filter(player1_id=user_id),
+        # Spiele gegen sich selbst nur im ersten Zweig
+        Gamestats.objects.filter(player2_id=user_id).exclude(player1_id=user_id),
+    ]
+    if cursor is not None:
+        branches = [branch.filter(after_cursor(cursor)) for branch in branches]
+    if connection.features.supports_slicing_ordering_in_compound:
+        # Jeder Zweig liefert höchstens limit + 1 Zeilen direkt aus seinem Index
+        branches = [branch.order_by(*ORDERING)[:limit + 1] for branch in branches]
+
+    games = list(branches[0].union(branches[1], all=True).order_by(*ORDERING)[:limit + 1])
+    next_cursor = encode_cursor(games[limit - 1]) if len(games) > limit else None
+    return games[:limit], next_cursor
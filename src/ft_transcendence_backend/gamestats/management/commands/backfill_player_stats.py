@@ -0,0 +1,21 @@
+import time
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from gamestats.backfill import BATCH_SIZE, backfill_player_stats
+from gamestats.models import Gamestats, PlayerStats
+
+
+class Command(BaseCommand):
+    help = (
+        "Berechnet PlayerStats für alle User aus der Gamestats-Historie neu "
+        "(zur Reparatur; läuft auch bei laufendem Betrieb, die Migration 0006 macht es einmalig)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        users = backfill_player_stats(get_user_model(), Gamestats, PlayerStats, options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"PlayerStats backfilled: {users} users in {time.perf_counter() - started:.2f}s"))
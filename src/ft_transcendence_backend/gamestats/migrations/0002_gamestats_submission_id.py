@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gamestats', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gamestats',
+            name='submission_id',
+            field=models.CharField(blank=True, max_length=64, null=True, unique=True),
+        ),
+    ]
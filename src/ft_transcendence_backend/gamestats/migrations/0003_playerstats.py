@@ -0,0 +1,31 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gamestats', '0002_gamestats_submission_id'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayerStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='player_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('games', models.IntegerField(default=0)),
+                ('wins', models.IntegerField(default=0)),
+                ('losses', models.IntegerField(default=0)),
+                ('current_streak', models.IntegerField(default=0)),
+                ('best_streak', models.IntegerField(default=0)),
+                ('points_for', models.IntegerField(default=0)),
+                ('points_against', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-wins'], name='playerstats_wins_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY: blockiert bei großen Tabellen keine Schreibzugriffe, geht nur ohne Transaktion
+    atomic = False
+
+    dependencies = [
+        ('gamestats', '0003_playerstats'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='gamestats',
+            index=models.Index(fields=['player1', '-created_at', '-game_id'], name='gamestats_p1_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='gamestats',
+            index=models.Index(fields=['player2', '-created_at', '-game_id'], name='gamestats_p2_created_idx'),
+        ),
+    ]
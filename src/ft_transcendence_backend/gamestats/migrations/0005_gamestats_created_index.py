@@ -0,0 +1,17 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('gamestats', '0004_gamestats_history_indexes'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='gamestats',
+            index=models.Index(fields=['-created_at', '-game_id'], name='gamestats_created_idx'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.db import migrations
+from gamestats.backfill import backfill_player_stats
+
+
+def backfill(apps, schema_editor):
+    backfill_player_stats(apps.get_model(settings.AUTH_USER_MODEL), apps.get_model('gamestats', 'Gamestats'),
+                          apps.get_model('gamestats', 'PlayerStats'))
+
+
+class Migration(migrations.Migration):
+    # Jeder Batch ist eine eigene Transaktion: Sperren auf PlayerStats werden nur kurz gehalten
+    atomic = False
+
+    dependencies = [
+        ('gamestats', '0005_gamestats_created_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
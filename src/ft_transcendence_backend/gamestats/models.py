@@ -1,5 +1,7 @@
 # Create your models here.
 from django.db import models
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Greatest, Now
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -14,6 +16,72 @@ class Gamestats(models.Model):
     player2_score = models.IntegerField()
     winner = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name="gamestats_won")
     created_at = models.DateTimeField(auto_now_add=True)
+    # Vom Game-Server vergeben; doppelt gesendete Ergebnisse (Retries) werden daran erkannt
+    submission_id = models.CharField(max_length=64, unique=True, null=True, blank=True)
+
+    class Meta:
+        # Match-Historie pro Spieler: je ein Index-Scan über player1 und player2 (siehe history.py),
+        # dazu die Sortierung der ganzen Liste für /api/gamestats/ und den Export
+        indexes = [
+            models.Index(fields=["-created_at", "-game_id"], name="gamestats_created_idx"),
+            models.Index(fields=["player1", "-created_at", "-game_id"], name="gamestats_p1_created_idx"),
+            models.Index(fields=["player2", "-created_at", "-game_id"], name="gamestats_p2_created_idx"),
+        ]
 
     def __str__(self):
         return f"Game {self.game_id}: {self.player1_username} vs {self.player2_username}"
+
+
+class PlayerStats(models.Model):
+    """
+    Statistik pro User, bei jedem neuen Ergebnis fortgeschrieben (record_game), damit
+    Profil und Siege-Rangliste nicht jedes Mal über die ganze Gamestats-Tabelle zählen.
+    current_streak > 0: Siegesserie, < 0: Niederlagenserie. Unentschieden zählt als nicht gewonnen.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name="player_stats")
+    games = models.IntegerField(default=0)
+    wins = models.IntegerField(default=0)
+    losses = models.IntegerField(default=0)
+    current_streak = models.IntegerField(default=0)
+    best_streak = models.IntegerField(default=0)
+    points_for = models.IntegerField(default=0)
+    points_against = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["-wins"], name="playerstats_wins_idx")]
+
+    def __str__(self):
+        return f"Stats {self.user_id}: {self.wins}/{self.games}"
+
+    @property
+    def win_rate(self) -> str:
+        return f"{round(self.wins / self.games * 100) if self.games > 0 else 0}%"
+
+    @classmethod
+    def record_game(cls, game):
+        """Ein neues Ergebnis für beide Spieler eintragen (je ein UPDATE mit F(), ohne Lesen)"""
+        sides = [(game.player1_id, game.player1_score, game.player2_score)]
+        if game.player2_id != game.player1_id:
+            sides.append((game.player2_id, game.player2_score, game.player1_score))
+        sides = [side for side in sides if side[0] is not None]
+        cls.objects.bulk_create([cls(user_id=user_id) for user_id, _, _ in sides], ignore_conflicts=True)
+
+        # Feste Reihenfolge (user_id) wie beim Backfill, damit sich die Zeilensperren nicht verklemmen
+        for user_id, points_for, points_against in sorted(sides):
+            won = game.winner_id is not None and game.winner_id == user_id
+            if won:
+                streak = Case(When(current_streak__gt=0, then=F("current_streak") + 1), default=Value(1))
+            else:
+                streak = Case(When(current_streak__lt=0, then=F("current_streak") - 1), default=Value(-1))
+            cls.objects.filter(user_id=user_id).update(
+                games=F("games") + 1,
+                wins=F("wins") + int(won),
+                losses=F("losses") + int(not won),
+                current_streak=streak,
+                # Rechte Seiten sehen im UPDATE die alten Werte: best_streak vergleicht mit der neuen Serie
+                best_streak=Greatest(F("best_streak"), streak) if won else F("best_streak"),
+                points_for=F("points_for") + points_for,
+                points_against=F("points_against") + points_against,
+                updated_at=Now(),
+            )
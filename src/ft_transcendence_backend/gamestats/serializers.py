@@ -5,3 +5,11 @@ class GamestatsSerializer(serializers.ModelSerializer):
     class Meta:
         model = Gamestats
         fields = '__all__'  # gibt alle Felder zurück
+
+    def __init__(self, *args, **kwargs):
+        # fields=[...]: nur diese Felder ausgeben (?fields= in der API), sonst alle
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
@@ -1,3 +1,236 @@
+import json
+from io import StringIO
+
+from django.core.management import call_command
 from django.test import TestCase
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from users.rating import elo_update
+from .backfill import backfill_player_stats
+from .models import Gamestats, PlayerStats
+
+User = get_user_model()
+
+
+class GamestatsRatingTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.alice = User.objects.create_user(username="alice", password="pw")
+        self.bob = User.objects.create_user(username="bob", password="pw")
+        self.client.force_authenticate(self.alice)
+
+    def post_game(self, winner, player1_score=5, player2_score=3):
+        return self.client.post("/api/gamestats/", {
+            "player1": self.alice.id,
+            "player2": self.bob.id,
+            "player1_username": "alice",
+            "player2_username": "bob",
+            "player1_score": player1_score,
+            "player2_score": player2_score,
+            "winner": winner.id,
+        }, format="json")
+
+    def test_winner_gains_what_loser_loses(self):
+        response = self.post_game(self.alice)
+        self.assertEqual(response.status_code, 201)
+
+        self.alice.refresh_from_db()
+        self.bob.refresh_from_db()
+        self.assertAlmostEqual(self.alice.rating, 1016.0)
+        self.assertAlmostEqual(self.bob.rating, 984.0)
+
+    def test_upset_moves_ratings_more(self):
+        User.objects.filter(pk=self.alice.pk).update(rating=1400.0)
+        self.post_game(self.bob, player1_score=2, player2_score=5)
+
+        self.bob.refresh_from_db()
+        expected_bob = elo_update(1000.0, 1400.0, 1.0)[0]
+        self.assertAlmostEqual(self.bob.rating, expected_bob)
+        self.assertGreater(self.bob.rating - 1000.0, 16.0)
+
+
+class GamestatsBulkTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.alice = User.objects.create_user(username="alice", password="pw")
+        self.bob = User.objects.create_user(username="bob", password="pw")
+
+    def result(self, submission_id, winner):
+        return {
+            "player1": self.alice.id,
+            "player2": self.bob.id,
+            "player1_username": "alice",
+            "player2_username": "bob",
+            "player1_score": 5 if winner == self.alice else 2,
+            "player2_score": 5 if winner == self.bob else 2,
+            "winner": winner.id,
+            "submission_id": submission_id,
+        }
+
+    def test_bulk_creates_results_and_skips_resent_ones(self):
+        batch = [self.result("a", self.alice), self.result("b", self.bob), self.result("c", self.alice)]
+        response = self.client.post("/api/gamestats/bulk/", batch, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data, {"created": 3, "duplicates": 0, "rejected": []})
+
+        # Retry desselben Batches (Antwort ging verloren) plus ein neues Ergebnis
+        response = self.client.post("/api/gamestats/bulk/", batch + [self.result("d", self.bob)], format="json")
+        self.assertEqual(response.data, {"created": 1, "duplicates": 3, "rejected": []})
+
+        self.alice.refresh_from_db()
+        self.assertEqual(self.alice.score, 5 + 2 + 5 + 2)
+        self.assertEqual(self.client.get("/api/gamestats/stats/username/alice/").data["total_games"], 4)
+
+    def test_bulk_stores_valid_items_and_reports_rejected_indices(self):
+        batch = [self.result("a", self.alice), {"player1": self.alice.id}, "junk", self.result("b", self.bob)]
+        response = self.client.post("/api/gamestats/bulk/", batch, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual(response.data["duplicates"], 0)
+        self.assertEqual([item["index"] for item in response.data["rejected"]], [1, 2])
+        self.assertIn("player2", response.data["rejected"][0]["errors"])
+        self.assertEqual(self.client.get("/api/gamestats/stats/username/alice/").data["total_games"], 2)
+
+        # Retry: die gespeicherten sind Duplikate, die ungültigen werden wieder abgelehnt
+        response = self.client.post("/api/gamestats/bulk/", batch, format="json")
+        self.assertEqual((response.data["created"], response.data["duplicates"]), (0, 2))
+        self.assertEqual(len(response.data["rejected"]), 2)
+
+    def test_bulk_rejects_a_body_that_is_not_a_list(self):
+        response = self.client.post("/api/gamestats/bulk/", self.result("a", self.alice), format="json")
+        self.assertEqual(response.status_code, 400)
+
+
+class PlayerStatsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.alice = User.objects.create_user(username="alice", password="pw")
+        self.bob = User.objects.create_user(username="bob", password="pw")
+
+    def post_game(self, winner, alice_score, bob_score):
+        self.client.post("/api/gamestats/", {
+            "player1": self.alice.id,
+            "player2": self.bob.id,
+            "player1_username": "alice",
+            "player2_username": "bob",
+            "player1_score": alice_score,
+            "player2_score": bob_score,
+            "winner": winner.id,
+        }, format="json")
+
+    def stats(self, username):
+        return self.client.get(f"/api/gamestats/stats/username/{username}/").data
+
+    def test_stats_are_updated_incrementally_and_match_backfill(self):
+        for winner, a, b in [(self.alice, 5, 1), (self.alice, 5, 4), (self.bob, 2, 5),
+                             (self.alice, 5, 0), (self.alice, 5, 3), (self.alice, 5, 2)]:
+            self.post_game(winner, a, b)
+
+        alice = self.stats("alice")
+        self.assertEqual(alice, {
+            'total_games': 6, 'wins': 5, 'losses': 1, 'win_rate': '83%',
+            'current_streak': 3, 'best_streak': 3, 'points_for': 27, 'points_against': 15,
+        })
+        self.assertEqual(self.stats("bob")["current_streak"], -3)
+        self.assertEqual(self.client.get("/api/gamestats/leaderboard/").data,
+                         [{'winner__username': 'alice', 'wins': 5}, {'winner__username': 'bob', 'wins': 1}])
+
+        # Backfill aus der Historie ergibt dieselben Zahlen, fehlende und veraltete Zeilen werden ersetzt
+        PlayerStats.objects.filter(user=self.bob).delete()
+        PlayerStats.objects.filter(user=self.alice).update(games=1, wins=1, current_streak=9)
+        call_command("backfill_player_stats", stdout=StringIO())
+        self.assertEqual(self.stats("alice"), alice)
+        self.assertEqual(self.stats("bob")["current_streak"], -3)
+
+    def test_backfill_covers_history_from_before_player_stats(self):
+        # Spiele ohne record_game, wie vor Migration 0003; danach ein Spiel über die API
+        for winner in (self.alice, self.alice, self.bob):
+            Gamestats.objects.create(player1=self.alice, player2=self.bob, player1_username="alice",
+                                     player2_username="bob", player1_score=5, player2_score=3, winner=winner)
+        self.post_game(self.bob, 1, 5)
+        self.assertEqual(self.stats("alice")["total_games"], 1)
+
+        self.assertEqual(backfill_player_stats(User, Gamestats, PlayerStats, batch_size=1), 2)
+        self.assertEqual((self.stats("alice")["total_games"], self.stats("alice")["wins"]), (4, 2))
+        self.assertEqual((self.stats("bob")["best_streak"], self.stats("bob")["current_streak"]), (2, 2))
+
+    def test_profile_stats_are_a_single_query(self):
+        self.post_game(self.alice, 5, 1)
+        with self.assertNumQueries(1):
+            self.client.get("/api/gamestats/stats/username/alice/")
+
+
+class MatchHistoryTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.alice = User.objects.create_user(username="alice", password="pw")
+        self.bob = User.objects.create_user(username="bob", password="pw")
+        self.carol = User.objects.create_user(username="carol", password="pw")
+        opponents = [self.bob, self.carol]
+        self.alice_games = []
+        for i in range(25):
+            opponent = opponents[i % 2]
+            p1, p2 = (self.alice, opponent) if i % 3 else (opponent, self.alice)
+            game = Gamestats.objects.create(player1=p1, player2=p2, player1_username=p1.username,
+                                            player2_username=p2.username, player1_score=5,
+                                            player2_score=i % 5, winner=p1)
+            self.alice_games.append(game.game_id)
+        Gamestats.objects.create(player1=self.bob, player2=self.carol, player1_username="bob",
+                                 player2_username="carol", player1_score=5, player2_score=0, winner=self.bob)
+        # Alle im selben Moment: die Reihenfolge hängt dann an game_id (Keyset über beide Spalten)
+        Gamestats.objects.update(created_at=Gamestats.objects.first().created_at)
+
+    def test_keyset_pages_cover_history_exactly_once(self):
+        seen = []
+        url = "/api/gamestats/username/alice/?limit=10"
+        pages = 0
+        while url:
+            data = self.client.get(url).data
+            seen += [game["game_id"] for game in data["results"]]
+            url = data["next"]
+            pages += 1
+        self.assertEqual(pages, 3)
+        self.assertEqual(seen, sorted(self.alice_games, reverse=True))
+
+    def test_by_user_id_and_invalid_input(self):
+        data = self.client.get(f"/api/gamestats/user/{self.bob.id}/?limit=100").data
+        self.assertEqual(len(data["results"]), 14)
+        self.assertIsNone(data["next"])
+        self.assertEqual(self.client.get("/api/gamestats/user/abc/").status_code, 400)
+        self.assertEqual(self.client.get("/api/gamestats/username/alice/?cursor=%%%").status_code, 400)
+
+
+class GamestatsListTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        alice = User.objects.create_user(username="alice", password="pw")
+        bob = User.objects.create_user(username="bob", password="pw")
+        self.game_ids = [
+            Gamestats.objects.create(player1=alice, player2=bob, player1_username="alice", player2_username="bob",
+                                     player1_score=5, player2_score=i % 5, winner=alice).game_id
+            for i in range(30)
+        ]
+        self.game_ids.reverse()  # neueste zuerst
+
+    def test_list_is_paged_by_cursor_with_selected_fields(self):
+        seen = []
+        url = "/api/gamestats/?limit=12&fields=game_id,winner"
+        while url:
+            data = self.client.get(url).data
+            self.assertTrue(all(set(game) == {"game_id", "winner"} for game in data["results"]))
+            seen += [game["game_id"] for game in data["results"]]
+            url = data["next"]
+        self.assertEqual(seen, self.game_ids)
+        self.assertEqual(self.client.get("/api/gamestats/?fields=game_id,password").status_code, 400)
+        self.assertEqual(self.client.get("/api/gamestats/?cursor=%%%").status_code, 400)
 
-# Create your tests here.
+    def test_export_streams_all_games_as_one_array(self):
+        response = self.client.get("/api/gamestats/export/?fields=game_id,player1_username,created_at")
+        self.assertTrue(response.streaming)
+        games = json.loads(b"".join(response.streaming_content))
+        self.assertEqual([game["game_id"] for game in games], self.game_ids)
+        self.assertEqual(set(games[0]), {"game_id", "player1_username", "created_at"})
+        full = self.client.get("/api/gamestats/?limit=1").data["results"][0]
+        self.assertEqual(json.loads(json.dumps(full)),
+                         json.loads(b"".join(self.client.get("/api/gamestats/export/").streaming_content))[0])
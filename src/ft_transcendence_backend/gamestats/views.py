@@ -11,86 +11,231 @@ from django.shortcuts import render
 
 
 from rest_framework import viewsets
+import json
 from rest_framework.decorators import action
+from rest_framework.exceptions import ParseError, ValidationError
 from rest_framework.response import Response
-from django.db import models
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.utils.urls import replace_query_param
+from django.db import transaction
+from django.http import StreamingHttpResponse
 from django.contrib.auth import get_user_model
 from django.shortcuts import get_object_or_404
-from .models import Gamestats
+from .models import Gamestats, PlayerStats
 from .serializers import GamestatsSerializer
+from .history import ORDERING, InvalidCursor, decode_cursor, games_page, parse_page_size, user_history
+from users.rating import elo_update
 
 User = get_user_model()
 
+EXPORT_CHUNK = 2000  # Zeilen pro DB-Fetch (Server-Side-Cursor) und pro geschriebenem Stück JSON
+
 class GamestatsViewSet(viewsets.ModelViewSet):
     queryset = Gamestats.objects.all().order_by('-created_at')
     serializer_class = GamestatsSerializer
 
     def perform_create(self, serializer):
         """Wird automatisch beim POST aufgerufen, wenn ein neues Gamestats-Objekt erstellt wird."""
-        instance = serializer.save()
+        # Ergebnis und Statistik in einer Transaktion (wie bulk), sonst zählt ein paralleler Backfill es doppelt
+        with transaction.atomic():
+            self.apply_result(serializer.save())
+
+    def apply_result(self, instance):
+        """Scores und Ratings der Spieler nach einem neuen Ergebnis fortschreiben"""
+        # Beide Spieler in einer Transaktion, ohne die User-Objekte zu laden
+        User.add_scores([
+            (instance.player1_id, instance.player1_score),
+            (instance.player2_id, instance.player2_score),
+        ])
+        PlayerStats.record_game(instance)
+        self.update_ratings(instance)
+
+    def update_ratings(self, instance):
+        """Aktualisiert die Elo-Ratings beider Spieler (Basis für das Online-Matchmaking)"""
+        if not instance.player1_id or not instance.player2_id or instance.player1_id == instance.player2_id:
+            return
+
+        if instance.winner_id == instance.player1_id:
+            score1 = 1.0
+        elif instance.winner_id == instance.player2_id:
+            score1 = 0.0
+        else:
+            score1 = 0.5
+
+        with transaction.atomic():
+            # Zeilen in fester Reihenfolge sperren, damit parallele Ergebnisse nicht verloren gehen
+            ratings = dict(
+                User.objects.select_for_update()
+                .filter(pk__in=[instance.player1_id, instance.player2_id])
+                .order_by('pk')
+                .values_list('pk', 'rating')
+            )
+            rating1, rating2 = elo_update(ratings[instance.player1_id], ratings[instance.player2_id], score1)
+            User.objects.filter(pk=instance.player1_id).update(rating=rating1)
+            User.objects.filter(pk=instance.player2_id).update(rating=rating2)
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request):
+        """
+        Mehrere Ergebnisse in einem Request (Game-Server sendet gebündelt).
+        Ergebnisse mit bereits bekannter submission_id werden übersprungen, damit
+        wiederholt gesendete Batches nichts doppelt zählen. Jedes Ergebnis wird einzeln
+        geprüft: gültige werden gespeichert, ungültige mit Index und Fehlern in
+        "rejected" zurückgegeben, damit der Sender nur diese verwirft.
+        """
+        if not isinstance(request.data, list):
+            return Response({"detail": "Expected a list of game results."}, status=400)
 
-        player1 = instance.player1
-        player2 = instance.player2
+        submission_ids = [item.get("submission_id") for item in request.data
+                          if isinstance(item, dict) and item.get("submission_id")]
+        seen = set(Gamestats.objects.filter(submission_id__in=submission_ids)
+                   .values_list('submission_id', flat=True))
+        valid, rejected, duplicates = [], [], 0
+        for index, item in enumerate(request.data):
+            if not isinstance(item, dict):
+                rejected.append({"index": index, "errors": {"detail": "Expected a game result object."}})
+                continue
+            submission_id = item.get("submission_id")
+            if submission_id and submission_id in seen:
+                duplicates += 1
+                continue
+            serializer = self.get_serializer(data=item)
+            if not serializer.is_valid():
+                rejected.append({"index": index, "errors": serializer.errors})
+                continue
+            if submission_id:
+                seen.add(submission_id)
+            valid.append(serializer.validated_data)
 
-        if player1:
-            player1.add_score(instance.player1_score)
+        # Scores aller Ergebnisse zusammenfassen: ein UPDATE pro Spieler statt zwei pro Spiel
+        with transaction.atomic(), User.score_batch():
+            for data in valid:
+                self.apply_result(Gamestats.objects.create(**data))
 
-        if player2:
-            player2.add_score(instance.player2_score)
+        return Response({
+            "created": len(valid),
+            "duplicates": duplicates,
+            "rejected": rejected,
+        }, status=201)
 
     @action(detail=False, methods=['get'], url_path='user/(?P<user_id>[^/.]+)')
     def by_user(self, request, user_id=None):
-        games = Gamestats.objects.filter(
-            models.Q(player1__id=user_id) | models.Q(player2__id=user_id)
-        ).order_by('-created_at')
-        serializer = self.get_serializer(games, many=True)
-        return Response(serializer.data)
+        if not str(user_id).isdigit():
+            return Response({"detail": "Invalid user id."}, status=400)
+        return self.history_response(request, int(user_id))
         
     @action(detail=False, methods=['get'], url_path='username/(?P<username>[^/.]+)')
     def by_username(self, request, username=None):
         # Finde den Benutzer anhand des Benutzernamens
         user = get_object_or_404(User, username=username)
-        
-        # Finde alle Spiele, bei denen der Benutzer teilgenommen hat
-        games = Gamestats.objects.filter(
-            models.Q(player1=user) | models.Q(player2=user)
-        ).order_by('-created_at')
-        
-        serializer = self.get_serializer(games, many=True)
-        return Response(serializer.data)
+        return self.history_response(request, user.pk)
+
+    def history_response(self, request, user_id):
+        """
+        Match-Historie seitenweise (neueste zuerst): ?limit=20 (max. 100), weiter mit ?cursor=
+        aus "next", Felder per ?fields=. Antwort: {"next": url oder null, "results": [...]}
+        """
+        fields = self.requested_fields(request)
+        games, next_cursor = user_history(user_id, self.requested_cursor(request),
+                                          parse_page_size(request.query_params.get('limit')))
+        return self.page_response(request, games, next_cursor, fields)
+
+    def list(self, request, *args, **kwargs):
+        """
+        Alle Spiele seitenweise (neueste zuerst), gleiche Parameter und Antwort wie die
+        Match-Historie: ?limit=, ?cursor=, ?fields=player1_username,winner,...
+        """
+        fields = self.requested_fields(request)
+        games, next_cursor = games_page(self.trimmed(self.get_queryset(), fields), self.requested_cursor(request),
+                                        parse_page_size(request.query_params.get('limit')))
+        return self.page_response(request, games, next_cursor, fields)
+
+    @action(detail=False, methods=['get'], url_path='export')
+    def export(self, request):
+        """
+        Alle Spiele als ein JSON-Array (neueste zuerst, ?fields= wie bei der Liste), gestreamt:
+        die Zeilen kommen in Stücken über einen Server-Side-Cursor, nichts wird komplett im Speicher gehalten.
+        """
+        fields = self.requested_fields(request)
+        queryset = self.trimmed(self.get_queryset(), fields).order_by(*ORDERING)
+        return StreamingHttpResponse(self.export_chunks(queryset, fields), content_type='application/json')
+
+    def export_chunks(self, queryset, fields):
+        yield '['
+        first = True
+        batch = []
+        for game in queryset.iterator(chunk_size=EXPORT_CHUNK):
+            batch.append(game)
+            if len(batch) == EXPORT_CHUNK:
+                yield self.render_chunk(batch, fields, first)
+                first = False
+                batch = []
+        if batch:
+            yield self.render_chunk(batch, fields, first)
+        yield ']'
+
+    def render_chunk(self, games, fields, first):
+        data = self.get_serializer(games, many=True, fields=fields).data
+        # Liste ohne die äußeren Klammern, Stücke durch Komma getrennt
+        return ('' if first else ',') + json.dumps(data, cls=JSONEncoder)[1:-1]
+
+    def requested_fields(self, request):
+        """?fields=a,b,c -> ['a', 'b', 'c'] (None: alle Felder); unbekannte Felder -> 400"""
+        value = request.query_params.get('fields')
+        if not value:
+            return None
+        fields = [name.strip() for name in value.split(',') if name.strip()]
+        unknown = set(fields) - set(GamestatsSerializer().fields)
+        if unknown:
+            raise ValidationError({'fields': f"Unknown fields: {', '.join(sorted(unknown))}"})
+        return fields
+
+    def requested_cursor(self, request):
+        cursor = request.query_params.get('cursor')
+        try:
+            return decode_cursor(cursor) if cursor else None
+        except InvalidCursor:
+            raise ParseError("Invalid cursor.")
+
+    def trimmed(self, queryset, fields):
+        """Nur die Spalten laden, die ausgegeben werden (plus die Sortierung für den Cursor)"""
+        if fields is None:
+            return queryset
+        return queryset.only(*set(fields) | {'game_id', 'created_at'})
+
+    def page_response(self, request, games, next_cursor, fields):
+        next_url = None
+        if next_cursor:
+            next_url = replace_query_param(request.build_absolute_uri(), 'cursor', next_cursor)
+        serializer = self.get_serializer(games, many=True, fields=fields)
+        return Response({'next': next_url, 'results': serializer.data})
     
     @action(detail=False, methods=['get'], url_path='stats/username/(?P<username>[^/.]+)')
     def stats_by_username(self, request, username=None):
-        # Finde den Benutzer anhand des Benutzernamens
-        user = get_object_or_404(User, username=username)
-        
-        # Finde alle Spiele, bei denen der Benutzer teilgenommen hat
-        games = Gamestats.objects.filter(
-            models.Q(player1=user) | models.Q(player2=user)
-        )
-        
-        # Berechne die Statistiken
-        total_games = games.count()
-        wins = games.filter(winner=user).count()
-        losses = total_games - wins
-        win_rate = f"{round(wins / total_games * 100) if total_games > 0 else 0}%"
-        
+        # User samt vorberechneter Statistik in einer Abfrage (kein Zählen über alle Spiele)
+        user = get_object_or_404(User.objects.select_related('player_stats'), username=username)
+        try:
+            player_stats = user.player_stats
+        except PlayerStats.DoesNotExist:
+            player_stats = PlayerStats(user=user)  # noch kein Spiel
+
         # Erstelle ein Statistik-Objekt
         stats = {
-            'total_games': total_games,
-            'wins': wins,
-            'losses': losses,
-            'win_rate': win_rate
+            'total_games': player_stats.games,
+            'wins': player_stats.wins,
+            'losses': player_stats.losses,
+            'win_rate': player_stats.win_rate,
+            'current_streak': player_stats.current_streak,
+            'best_streak': player_stats.best_streak,
+            'points_for': player_stats.points_for,
+            'points_against': player_stats.points_against,
         }
         
         return Response(stats)
 
     @action(detail=False, methods=['get'], url_path='leaderboard')
     def leaderboard(self, request):
-        from django.db.models import Count
-
-        winners = Gamestats.objects.values('winner__username').annotate(
-            wins=Count('winner')
-        ).order_by('-wins')
+        # Über den Index auf wins statt COUNT über die ganze Gamestats-Tabelle
+        winners = PlayerStats.objects.filter(wins__gt=0).order_by('-wins').values_list('user__username', 'wins')
 
-        return Response(winners)
\ No newline at end of file
+        return Response([{'winner__username': username, 'wins': wins} for username, wins in winners])
\ No newline at end of file
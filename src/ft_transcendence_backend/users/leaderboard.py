@@ -1,12 +1,310 @@
+import logging
+import threading
+import uuid
+import redis
+from django.conf import settings
+from django.db import connection, models
 from .models import CustomUser
 
+logger = logging.getLogger(__name__)
+
+SCORES_KEY = "leaderboard:score"   # ZSET user_id -> score
+NAMES_KEY = "leaderboard:names"    # HASH user_id -> username
+BUILT_KEY = "leaderboard:built"    # gesetzt, sobald das ZSET vollständig aus der DB aufgebaut wurde
+LOCK_KEY = "leaderboard:rebuilding"  # Token des laufenden Neuaufbaus (SET NX), nur einer gleichzeitig
+DIRTY_KEY = "leaderboard:dirty"    # SET user_id: seit Beginn des Neuaufbaus geändert, wird nachgezogen
+REBUILD_BATCH = 10000
+LOCK_TTL = 600                     # Sekunden; wird pro Batch verlängert, verfällt bei einem abgestürzten Neuaufbau
+SOCKET_TIMEOUT = 0.5               # Sekunden; ein hängendes Redis soll Requests nicht blockieren (DB-Fallback)
+
+
 class Leaderboard:
+    """
+    Rangliste nach Score als Redis Sorted Set: Top-N, Rang und "Spieler um mich herum"
+    in O(log n) statt ORDER BY score über die ganze Tabelle.
+
+    Die DB bleibt die Quelle der Wahrheit. Score-Änderungen werden per set_score()
+    nachgezogen (post_save-Signal bzw. add_points nach add_scores, jeweils erst nach dem Commit). Ist Redis nicht erreichbar oder das
+    ZSET noch nicht aufgebaut, wird direkt aus der DB gelesen und der Neuaufbau im Hintergrund gestartet.
+    Gleicher Score: Redis ordnet nach Member (user_id als String), der DB-Fallback nach pk.
+    """
+
+    client = None
+    rebuild_in_background = True  # Tests bauen synchron neu
+
+    @classmethod
+    def get_client(cls):
+        if cls.client is None:
+            cls.client = redis.StrictRedis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=0,
+                                           decode_responses=True, socket_timeout=SOCKET_TIMEOUT,
+                                           socket_connect_timeout=SOCKET_TIMEOUT)
+        return cls.client
+
+    @classmethod
+    def is_built(cls) -> bool:
+        """Nicht aufgebaut (z.B. nach invalidate()): Neuaufbau anstoßen, bis dahin liest der Aufrufer aus der DB"""
+        try:
+            if cls.get_client().exists(BUILT_KEY):
+                return True
+        except redis.RedisError as e:
+            logger.warning(f"Leaderboard: Redis nicht erreichbar, lese aus der DB ({e})")
+            return False
+        cls.start_rebuild()
+        return False
+
+    @classmethod
+    def start_rebuild(cls):
+        """Startet den Neuaufbau, falls nicht schon einer läuft (die Sperre wird hier genommen)"""
+        try:
+            token = cls.acquire_lock()
+        except redis.RedisError:
+            return
+        if token is None:
+            return
+        if cls.rebuild_in_background:
+            threading.Thread(target=cls._rebuild_thread, args=(token,), name="leaderboard-rebuild",
+                             daemon=True).start()
+        else:
+            cls.rebuild(token=token)
+
+    @classmethod
+    def _rebuild_thread(cls, token):
+        try:
+            count = cls.rebuild(token=token)
+            logger.info(f"Leaderboard: automatisch neu aufgebaut ({count} User)")
+        except Exception as e:
+            logger.error(f"Leaderboard: Neuaufbau fehlgeschlagen ({e})")
+        finally:
+            connection.close()
+
+    @classmethod
+    def acquire_lock(cls):
+        token = uuid.uuid4().hex
+        return token if cls.get_client().set(LOCK_KEY, token, nx=True, ex=LOCK_TTL) else None
+
+    @classmethod
+    def set_score(cls, user):
+        """Trägt den aktuellen Score (und Namen) eines Users ein"""
+        try:
+            pipe = cls.get_client().pipeline()
+            pipe.zadd(SCORES_KEY, {user.pk: user.score})
+            pipe.hset(NAMES_KEY, user.pk, user.username)
+            cls._mark_dirty(pipe, [user.pk])
+            pipe.execute()
+        except redis.RedisError as e:
+            # Rangliste ist danach veraltet: beim nächsten Lesen aus der DB, bis neu aufgebaut wird
+            logger.error(f"Leaderboard: Score von {user.pk} nicht geschrieben ({e})")
+            cls.invalidate()
+
+    @classmethod
+    def add_points(cls, totals):
+        """Score-Änderungen {user_id: punkte} per ZINCRBY, passend zum F()-Update in der DB"""
+        try:
+            pipe = cls.get_client().pipeline()
+            for user_id, points in totals.items():
+                pipe.zincrby(SCORES_KEY, points, user_id)
+            cls._mark_dirty(pipe, list(totals))
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.error(f"Leaderboard: Score-Änderungen nicht geschrieben ({e})")
+            cls.invalidate()
+
+    @classmethod
+    def remove(cls, user_id):
+        try:
+            pipe = cls.get_client().pipeline()
+            pipe.zrem(SCORES_KEY, user_id)
+            pipe.hdel(NAMES_KEY, user_id)
+            cls._mark_dirty(pipe, [user_id])
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.error(f"Leaderboard: User {user_id} nicht entfernt ({e})")
+            cls.invalidate()
+
+    @staticmethod
+    def _mark_dirty(pipe, user_ids):
+        """
+        Geänderte User merken, in derselben Transaktion wie die Änderung: ein laufender Neuaufbau
+        liest sie vor dem Austausch erneut aus der DB, statt sie per RENAME zu überschreiben.
+        Ohne Neuaufbau verfällt das SET nach LOCK_TTL.
+        """
+        pipe.sadd(DIRTY_KEY, *user_ids)
+        pipe.expire(DIRTY_KEY, LOCK_TTL)
+
+    @classmethod
+    def invalidate(cls):
+        try:
+            cls.get_client().delete(BUILT_KEY)
+        except redis.RedisError:
+            pass
+
+    @classmethod
+    def rebuild(cls, batch_size=REBUILD_BATCH, token=None):
+        """
+        Baut die Rangliste komplett aus der DB neu auf; gibt die Anzahl der User zurück,
+        None wenn schon ein anderer Neuaufbau läuft.
+
+        Schreibzugriffe während des Neuaufbaus gehen weiter in die Live-Keys und markieren den
+        User als dirty. Vor dem atomaren Austausch werden diese User erneut aus der DB gelesen
+        (nach ihrem Commit, also aktuell); der Austausch selbst läuft unter WATCH auf das
+        Dirty-SET und wird wiederholt, falls währenddessen noch etwas geschrieben wurde.
+        """
+        client = cls.get_client()
+        if token is None:
+            token = cls.acquire_lock()
+            if token is None:
+                return None
+        # Eigene temporäre Keys pro Neuaufbau (mit TTL): ein abgebrochener räumt keinen fremden ab
+        tmp_scores, tmp_names = f"{SCORES_KEY}:rebuild:{token}", f"{NAMES_KEY}:rebuild:{token}"
+        try:
+            # Was vorher geschrieben wurde, steht schon in der DB
+            client.delete(tmp_scores, tmp_names, DIRTY_KEY)
+            count = 0
+            rows = CustomUser.objects.order_by().values_list('pk', 'username', 'score')
+            batch = []
+            for row in rows.iterator(chunk_size=batch_size):
+                batch.append(row)
+                if len(batch) == batch_size:
+                    cls._write_batch(client, tmp_scores, tmp_names, batch)
+                    client.expire(LOCK_KEY, LOCK_TTL)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                cls._write_batch(client, tmp_scores, tmp_names, batch)
+                count += len(batch)
+
+            while True:
+                dirty = client.spop(DIRTY_KEY, batch_size)
+                if dirty:
+                    cls._refresh(client, tmp_scores, tmp_names, dirty)
+                    continue
+                with client.pipeline() as pipe:
+                    try:
+                        pipe.watch(DIRTY_KEY, LOCK_KEY)
+                        if pipe.scard(DIRTY_KEY):
+                            continue
+                        if pipe.get(LOCK_KEY) != token:
+                            logger.error("Leaderboard: Sperre beim Neuaufbau verloren, verworfen")
+                            return None
+                        has_scores, has_names = pipe.exists(tmp_scores), pipe.exists(tmp_names)
+                        pipe.multi()
+                        # Atomar austauschen, damit Leser nie eine halbe Rangliste sehen
+                        if has_scores:
+                            pipe.rename(tmp_scores, SCORES_KEY)
+                            pipe.persist(SCORES_KEY)
+                        else:
+                            pipe.delete(SCORES_KEY)
+                        if has_names:
+                            pipe.rename(tmp_names, NAMES_KEY)
+                            pipe.persist(NAMES_KEY)
+                        else:
+                            pipe.delete(NAMES_KEY)
+                        pipe.set(BUILT_KEY, 1)
+                        pipe.delete(LOCK_KEY)
+                        pipe.execute()
+                        return count
+                    except redis.WatchError:
+                        continue
+        finally:
+            cls._release(client, token, tmp_scores, tmp_names)
+
     @staticmethod
-    def get_top_players(limit=10):
+    def _refresh(client, scores_key, names_key, user_ids):
+        """Liest die User erneut aus der DB in die temporären Keys; gelöschte werden entfernt"""
+        rows = list(CustomUser.objects.filter(pk__in=user_ids).values_list('pk', 'username', 'score'))
+        found = {str(pk) for pk, _, _ in rows}
+        gone = [user_id for user_id in user_ids if str(user_id) not in found]
+        pipe = client.pipeline(transaction=False)
+        if rows:
+            pipe.zadd(scores_key, {pk: score for pk, _, score in rows})
+            pipe.hset(names_key, mapping={pk: username for pk, username, _ in rows})
+        if gone:
+            pipe.zrem(scores_key, *gone)
+            pipe.hdel(names_key, *gone)
+        pipe.expire(scores_key, LOCK_TTL)
+        pipe.expire(names_key, LOCK_TTL)
+        pipe.execute()
+
+    @staticmethod
+    def _release(client, token, tmp_scores, tmp_names):
+        """Aufräumen nach Abbruch (nach erfolgreichem Austausch ist nichts mehr da)"""
+        try:
+            client.delete(tmp_scores, tmp_names)
+            if client.get(LOCK_KEY) == token:
+                client.delete(LOCK_KEY)
+        except redis.RedisError:
+            pass
+
+    @staticmethod
+    def _write_batch(client, scores_key, names_key, rows):
+        pipe = client.pipeline(transaction=False)
+        pipe.zadd(scores_key, {pk: score for pk, _, score in rows})
+        pipe.hset(names_key, mapping={pk: username for pk, username, _ in rows})
+        pipe.expire(scores_key, LOCK_TTL)
+        pipe.expire(names_key, LOCK_TTL)
+        pipe.execute()
+
+    @classmethod
+    def _entries(cls, client, members, first_rank):
+        """[(user_id, score)] aus ZREVRANGE -> Einträge mit Rang und Username"""
+        if not members:
+            return []
+        names = client.hmget(NAMES_KEY, [member for member, _ in members])
+        return [
+            {'rank': first_rank + offset, 'username': name, 'score': int(score)}
+            for offset, ((member, score), name) in enumerate(zip(members, names))
+        ]
+
+    @classmethod
+    def get_top_players(cls, limit=10):
         """
-        Holt die Top-Spieler aus der Datenbank, sortiert nach Score
+        Holt die Top-Spieler, sortiert nach Score
         """
-        return CustomUser.objects.order_by('-score')[:limit].values(
-            'username',
-            'score'
-        ) 
\ No newline at end of file
+        if cls.is_built():
+            try:
+                client = cls.get_client()
+                return cls._entries(client, client.zrevrange(SCORES_KEY, 0, limit - 1, withscores=True), 1)
+            except redis.RedisError as e:
+                logger.warning(f"Leaderboard: Redis-Fehler, lese aus der DB ({e})")
+        users = CustomUser.objects.order_by('-score', 'pk')[:limit].values_list('username', 'score')
+        return [
+            {'rank': rank, 'username': username, 'score': score}
+            for rank, (username, score) in enumerate(users, 1)
+        ]
+
+    @classmethod
+    def get_rank(cls, user):
+        """1-basierter Rang des Users"""
+        if cls.is_built():
+            try:
+                rank = cls.get_client().zrevrank(SCORES_KEY, user.pk)
+                if rank is not None:
+                    return rank + 1
+            except redis.RedisError as e:
+                logger.warning(f"Leaderboard: Redis-Fehler, lese aus der DB ({e})")
+        # Fallback: zählen statt die komplette id-Liste zu laden (gleiche Reihenfolge wie get_around)
+        ahead = CustomUser.objects.filter(
+            models.Q(score__gt=user.score) | models.Q(score=user.score, pk__lt=user.pk)
+        )
+        return ahead.count() + 1
+
+    @classmethod
+    def get_around(cls, user, radius=5):
+        """Die `radius` Spieler vor und nach dem User, inklusive ihm selbst"""
+        if cls.is_built():
+            try:
+                client = cls.get_client()
+                rank = client.zrevrank(SCORES_KEY, user.pk)
+                if rank is not None:
+                    start = max(0, rank - radius)
+                    members = client.zrevrange(SCORES_KEY, start, rank + radius, withscores=True)
+                    return cls._entries(client, members, start + 1)
+            except redis.RedisError as e:
+                logger.warning(f"Leaderboard: Redis-Fehler, lese aus der DB ({e})")
+        rank = cls.get_rank(user)
+        start = max(0, rank - 1 - radius)
+        users = CustomUser.objects.order_by('-score', 'pk')[start:rank + radius].values_list('username', 'score')
+        return [
+            {'rank': start + offset + 1, 'username': username, 'score': score}
+            for offset, (username, score) in enumerate(users)
+        ]
@@ -0,0 +1,19 @@
+import time
+from django.core.management.base import BaseCommand
+from users.leaderboard import Leaderboard
+
+
+class Command(BaseCommand):
+    help = "Baut die Redis-Rangliste (Sorted Set) komplett aus der Datenbank neu auf"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=10000)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = Leaderboard.rebuild(batch_size=options["batch_size"])
+        if count is None:
+            self.stdout.write(self.style.WARNING("Leaderboard rebuild already running, skipped"))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"Leaderboard rebuilt: {count} users in {time.perf_counter() - started:.2f}s"))
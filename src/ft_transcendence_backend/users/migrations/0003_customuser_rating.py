@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_customuser_is_verified_customuser_verification_code'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='rating',
+            field=models.FloatField(default=1000.0),
+        ),
+    ]
@@ -1,7 +1,12 @@
+from contextlib import contextmanager
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 import random
 import string
+import threading
+
+_score_batch = threading.local()  # offene score_batch() des aktuellen Threads
 
 class CustomUser(AbstractUser):
     avatar = models.ImageField(upload_to='avatars/', null=True, blank=True)
@@ -9,6 +14,7 @@ class CustomUser(AbstractUser):
     is_verified = models.BooleanField(default=False)  # 2FA aktiviert?
     verification_code = models.CharField(max_length=6, blank=True, null=True)  # 6-stelliger Code
     score = models.IntegerField(default=0)  # Neues Feld für den Score
+    rating = models.FloatField(default=1000.0)  # Elo-Rating für das Online-Matchmaking
     tournament_name = models.CharField(max_length=50, unique=True, blank=True, null=True)
     friends = models.ManyToManyField("self", blank=True)
 
@@ -49,6 +55,49 @@ class CustomUser(AbstractUser):
         return user in self.friends.all()
     
     def add_score(self, points):
-        """Erhöht den Score des Users um eine bestimmte Punktzahl."""
-        self.score += points
-        self.save()
+        """Erhöht den Score des Users um eine bestimmte Punktzahl (atomar, nur die Spalte score)."""
+        CustomUser.add_scores([(self.pk, points)])
+        if getattr(_score_batch, "totals", None) is None:
+            self.refresh_from_db(fields=['score'])
+
+    @classmethod
+    def add_scores(cls, increments):
+        """
+        Score-Änderungen [(user_id, punkte), ...] in einer Transaktion. Jede ist ein
+        UPDATE ... SET score = score + n, parallele Ergebnisse gehen also nicht verloren.
+        Innerhalb von score_batch() werden sie nur gesammelt und beim Verlassen geschrieben.
+        """
+        batch = getattr(_score_batch, "totals", None)
+        totals = batch if batch is not None else {}
+        for user_id, points in increments:
+            if user_id is not None and points:
+                totals[user_id] = totals.get(user_id, 0) + points
+        if batch is None:
+            cls._write_scores(totals)
+
+    @classmethod
+    @contextmanager
+    def score_batch(cls):
+        """Fasst alle add_score/add_scores im Block zu einem UPDATE pro User zusammen"""
+        if getattr(_score_batch, "totals", None) is not None:
+            yield  # verschachtelt: der äußere Block schreibt
+            return
+        _score_batch.totals = {}
+        try:
+            yield
+            totals = _score_batch.totals
+        finally:
+            _score_batch.totals = None
+        cls._write_scores(totals)
+
+    @classmethod
+    def _write_scores(cls, totals):
+        if not totals:
+            return
+        from .leaderboard import Leaderboard
+        with transaction.atomic():
+            # Feste Reihenfolge (pk), damit sich parallele Transaktionen nicht gegenseitig blockieren
+            for user_id in sorted(totals):
+                cls.objects.filter(pk=user_id).update(score=F('score') + totals[user_id])
+            # update() löst kein post_save aus: Rangliste erst nach dem Commit nachziehen
+            transaction.on_commit(lambda: Leaderboard.add_points(totals))
@@ -0,0 +1,17 @@
+"""Elo-Rating für das skill-basierte Matchmaking"""
+
+K_FACTOR = 32
+
+
+def expected_score(rating, opponent_rating):
+    """Erwartete Punktzahl (0..1) gegen einen Gegner"""
+    return 1.0 / (1.0 + 10 ** ((opponent_rating - rating) / 400.0))
+
+
+def elo_update(rating1, rating2, score1, k=K_FACTOR):
+    """
+    Neue Ratings nach einem Spiel. score1 ist das Ergebnis aus Sicht von
+    Spieler 1: 1 = Sieg, 0 = Niederlage, 0.5 = Unentschieden.
+    """
+    change = k * (score1 - expected_score(rating1, rating2))
+    return rating1 + change, rating2 - change
@@ -8,8 +8,8 @@ class UserSerializer(serializers.ModelSerializer):
     avatar = serializers.ImageField(allow_null=True, required=False)
     class Meta:
         model = User
-        fields = ('id', 'username', 'email', 'avatar', 'bio', 'tournament_name', 'password')
-        extra_kwargs = {'password': {'write_only': True}}
+        fields = ('id', 'username', 'email', 'avatar', 'bio', 'tournament_name', 'rating', 'password')
+        extra_kwargs = {'password': {'write_only': True}, 'rating': {'read_only': True}}
 
     def create(self, validated_data):
         user = User.objects.create_user(**validated_data)
@@ -0,0 +1,20 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .leaderboard import Leaderboard
+from .models import CustomUser
+
+
+@receiver(post_save, sender=CustomUser)
+def sync_leaderboard(sender, instance, update_fields=None, **kwargs):
+    """Score oder Username geändert: Rangliste in Redis nachziehen (z.B. nicht bei Login/last_login)"""
+    if update_fields is not None and not {"score", "username"} & set(update_fields):
+        return
+    # Erst nach dem Commit (wie add_points): ein Rollback hinterlässt so keinen Score in Redis
+    transaction.on_commit(lambda: Leaderboard.set_score(instance))
+
+
+@receiver(post_delete, sender=CustomUser)
+def remove_from_leaderboard(sender, instance, **kwargs):
+    user_id = instance.pk
+    transaction.on_commit(lambda: Leaderboard.remove(user_id))
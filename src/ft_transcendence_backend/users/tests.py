@@ -1,3 +1,168 @@
-from django.test import TestCase
+import threading
+from io import StringIO
 
-# Create your tests here.
+import fakeredis
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from unittest import skipIf
+from unittest.mock import patch
+from rest_framework.test import APIClient
+
+from .leaderboard import Leaderboard
+from .models import CustomUser
+
+
+class LeaderboardTests(TestCase):
+    def setUp(self):
+        Leaderboard.client = fakeredis.FakeStrictRedis(decode_responses=True)
+        self.addCleanup(setattr, Leaderboard, "client", None)
+        Leaderboard.rebuild_in_background = False
+        self.addCleanup(setattr, Leaderboard, "rebuild_in_background", True)
+        self.users = [
+            CustomUser.objects.create_user(username=f"user{i}", password="pw", score=score)
+            for i, score in enumerate([30, 10, 50, 20, 40])
+        ]
+        call_command("rebuild_leaderboard", stdout=StringIO())
+
+    def test_top_players_rank_and_window(self):
+        top = Leaderboard.get_top_players(3)
+        self.assertEqual([(e["rank"], e["username"], e["score"]) for e in top],
+                         [(1, "user2", 50), (2, "user4", 40), (3, "user0", 30)])
+        self.assertEqual(Leaderboard.get_rank(self.users[3]), 4)
+        around = Leaderboard.get_around(self.users[0], radius=1)
+        self.assertEqual([e["username"] for e in around], ["user4", "user0", "user3"])
+        self.assertEqual(around[0]["rank"], 2)
+
+    def test_score_changes_are_synced(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.users[1].add_score(100)
+        self.assertEqual(Leaderboard.get_rank(self.users[1]), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            CustomUser.objects.create_user(username="newbie", password="pw")
+        self.assertEqual(Leaderboard.get_top_players(10)[-1]["username"], "newbie")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.users[2].delete()
+        self.assertEqual(len(Leaderboard.get_top_players(10)), 5)
+
+    def test_saves_reach_redis_only_after_commit(self):
+        deleted = self.users[0].pk
+        self.users[1].score = 100
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.users[1].save(update_fields=["score"])
+            self.users[0].delete()
+        # Vor dem Commit (bzw. bei einem Rollback) steht in Redis noch der alte Stand
+        self.assertEqual(Leaderboard.get_client().zscore("leaderboard:score", self.users[1].pk), 10)
+        self.assertIsNotNone(Leaderboard.get_client().zscore("leaderboard:score", deleted))
+        for callback in callbacks:
+            callback()
+        self.assertEqual(Leaderboard.get_rank(self.users[1]), 1)
+        self.assertEqual(len(Leaderboard.get_top_players(10)), 4)
+
+    def test_falls_back_to_database_until_rebuilt(self):
+        Leaderboard.client.flushall()
+        self.assertEqual(Leaderboard.get_rank(self.users[3]), 4)
+        self.assertEqual(Leaderboard.get_top_players(1)[0]["username"], "user2")
+        self.assertEqual([e["rank"] for e in Leaderboard.get_around(self.users[2], radius=2)], [1, 2, 3])
+
+    def test_invalidated_leaderboard_is_rebuilt_on_read(self):
+        Leaderboard.invalidate()
+        Leaderboard.client.zadd("leaderboard:score", {self.users[1].pk: 999})  # veraltet
+        self.assertEqual(Leaderboard.get_top_players(1)[0]["username"], "user2")  # noch aus der DB
+        self.assertTrue(Leaderboard.is_built())
+        self.assertEqual(Leaderboard.get_rank(self.users[1]), 5)
+
+    def test_writes_during_rebuild_are_not_overwritten(self):
+        write_batch = Leaderboard._write_batch
+        calls = []
+
+        def write_then_score(client, scores_key, names_key, rows):
+            write_batch(client, scores_key, names_key, rows)
+            calls.append(rows)
+            if len(calls) == 3:
+                # Alle Zeilen sind gelesen, der Austausch steht noch aus
+                with self.captureOnCommitCallbacks(execute=True):
+                    CustomUser.add_scores([(self.users[1].pk, 100)])
+                    self.users[3].delete()
+
+        with patch.object(Leaderboard, "_write_batch", staticmethod(write_then_score)):
+            self.assertEqual(Leaderboard.rebuild(batch_size=2), 5)
+        self.assertEqual(Leaderboard.get_top_players(1), [{"rank": 1, "username": "user1", "score": 110}])
+        self.assertEqual(len(Leaderboard.get_top_players(10)), 4)
+        self.assertIsNone(Leaderboard.client.get("leaderboard:rebuilding"))
+        self.assertEqual(Leaderboard.client.ttl("leaderboard:score"), -1)
+
+    def test_only_one_rebuild_at_a_time(self):
+        token = Leaderboard.acquire_lock()
+        self.assertIsNone(Leaderboard.rebuild())
+        self.assertEqual(Leaderboard.client.get("leaderboard:rebuilding"), token)
+
+    def test_current_user_stats_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(self.users[0])
+        response = client.get("/api/users/current-stats/")
+        self.assertEqual(response.data, {"username": "user0", "score": 30, "rank": 3})
+        response = client.get("/api/users/leaderboard/around/?radius=0")
+        self.assertEqual(response.data, [{"rank": 3, "username": "user0", "score": 30}])
+
+
+class AddScoreTests(TransactionTestCase):
+    def setUp(self):
+        Leaderboard.client = fakeredis.FakeStrictRedis(decode_responses=True)
+        self.addCleanup(setattr, Leaderboard, "client", None)
+        Leaderboard.rebuild_in_background = False
+        self.addCleanup(setattr, Leaderboard, "rebuild_in_background", True)
+        self.alice = CustomUser.objects.create_user(username="alice", password="pw")
+        self.bob = CustomUser.objects.create_user(username="bob", password="pw")
+
+    def test_stale_instances_do_not_overwrite_each_other(self):
+        first = CustomUser.objects.get(pk=self.alice.pk)
+        second = CustomUser.objects.get(pk=self.alice.pk)
+        first.add_score(3)
+        second.add_score(4)  # früher: 0 + 4 gespeichert, die 3 Punkte gingen verloren
+        self.assertEqual(second.score, 7)
+        self.assertEqual(CustomUser.objects.get(pk=self.alice.pk).score, 7)
+
+    @skipIf(connection.vendor == "sqlite", "SQLite sperrt bei parallelen Schreibzugriffen die ganze Tabelle")
+    def test_concurrent_increments_are_not_lost(self):
+        threads, rounds = 8, 25
+        errors = []
+
+        def worker():
+            try:
+                # Jeder Thread hält eigene, schnell veraltete Instanzen (wie parallele Requests)
+                alice = CustomUser.objects.get(pk=self.alice.pk)
+                for _ in range(rounds):
+                    alice.add_score(1)
+                    CustomUser.add_scores([(self.alice.pk, 2), (self.bob.pk, 1)])
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.alice.refresh_from_db()
+        self.bob.refresh_from_db()
+        self.assertEqual(self.alice.score, threads * rounds * 3)
+        self.assertEqual(self.bob.score, threads * rounds)
+        self.assertEqual(Leaderboard.get_top_players(2)[0], {"rank": 1, "username": "alice", "score": 600})
+
+    def test_score_batch_coalesces_updates(self):
+        with CustomUser.score_batch():
+            for _ in range(50):
+                CustomUser.add_scores([(self.alice.pk, 5), (self.bob.pk, 1)])
+            self.assertEqual(CustomUser.objects.get(pk=self.alice.pk).score, 0)  # noch nicht geschrieben
+        self.assertEqual(CustomUser.objects.get(pk=self.alice.pk).score, 250)
+
+        with self.assertNumQueries(4):  # SAVEPOINT/BEGIN, 2 UPDATEs, RELEASE/COMMIT
+            with CustomUser.score_batch():
+                for _ in range(50):
+                    self.alice.add_score(1)
+                    self.bob.add_score(1)
+        self.assertEqual(CustomUser.objects.get(pk=self.bob.pk).score, 100)
@@ -141,29 +141,26 @@ def user_profile(request):
 @api_view(['GET'])
 def get_leaderboard(request):
     """Gibt die Top 10 Spieler zurück"""
-    users = CustomUser.objects.order_by('-score')[:10]
-    leaderboard_data = []
-
-    for rank, user in enumerate(users, 1):
-        leaderboard_data.append({
-            'rank': rank,
-            'username': user.username,
-            'score': user.score
-        })
+    return Response(Leaderboard.get_top_players(10))
 
-    return Response(leaderboard_data)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_leaderboard_around(request):
+    """Spieler rund um den eingeloggten User (?radius=5, max. 50)"""
+    try:
+        radius = min(max(int(request.query_params.get('radius', 5)), 0), 50)
+    except ValueError:
+        radius = 5
+    return Response(Leaderboard.get_around(request.user, radius))
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_current_user_stats(request):
     """Gibt die Stats des aktuell eingeloggten Users zurück"""
     try:
-        # Hole alle User, sortiert nach Score
-        all_users = CustomUser.objects.order_by('-score')
-
-        # Finde die Position des aktuellen Users
+        # Rang aus der Redis-Rangliste (O(log n)), ohne alle User zu laden
         current_user = request.user
-        user_rank = list(all_users.values_list('id', flat=True)).index(current_user.id) + 1
+        user_rank = Leaderboard.get_rank(current_user)
 
         return Response({
             'username': current_user.username,
@@ -6,6 +6,10 @@ import { updateProfile, logoutUser, getProfile } from '../authLib.js';
 import { fillProfileFields } from '../profileHandler.js';
 import { FriendsHandler } from '../friendsHandler.js';
 
+// Turnier-Menü: Größen- und Format-Buttons (ids wie in menu.py)
+const TOURNAMENT_SIZES = { "4_players": 4, "6_players": 6, "8_players": 8 };
+const TOURNAMENT_FORMATS = ["knockout", "swiss", "round_robin"];
+
 export class MenuDisplay {
     constructor(userProfile) {
         // console.log("MenuDisplay loaded!");
@@ -15,7 +19,12 @@ export class MenuDisplay {
         const wsHost = window.location.hostname;
         const wsPort = window.location.protocol === "https:" ? "" : ":8001";
 
-        const wsUrl = `${wsProtocol}${wsHost}${wsPort}/ws/menu`;
+        // Mit dem Session-Token des Game-Service bleiben Menü-Zustand und Settings über Reconnects
+        // erhalten, mit dem Platz-Token übernimmt der Spieler nach einem Neustart seinen Turnierplatz
+        const query = new URLSearchParams({ session: sessionStorage.getItem("gameSessionToken") || "" });
+        const tournamentToken = sessionStorage.getItem("tournamentToken");
+        if (tournamentToken) query.set("tournament_token", tournamentToken);
+        const wsUrl = `${wsProtocol}${wsHost}${wsPort}/ws/menu?${query}`;
         // console.log("Versuche WebSocket-Verbindung zu:", wsUrl);
 
         this.ws = new WebSocket(wsUrl);
@@ -29,6 +38,9 @@ export class MenuDisplay {
         this.friendsHandler = new FriendsHandler();
         this.menuHistory = [];
         this.currentMenuState = null;
+        // Auswahl im Turnier-Menü, wird beim Beitritt mitgeschickt
+        this.tournamentSize = null;
+        this.tournamentFormat = null;
 
         // Browser-History-Event-Listener nur hinzufügen, wenn wir im Menü-Template sind
         if (window.location.hash === '#menu') {
@@ -407,6 +419,7 @@ export class MenuDisplay {
             JSON.stringify({
                 action: "menu_selection",
                 selection: "online",
+                userProfile: this.userProfile,
             })
             );
             return;
@@ -429,14 +442,25 @@ export class MenuDisplay {
             }
         }
         if (itemId === "play_tournament") {
+            // Server zeigt zuerst die Größen-, dann die Format-Auswahl
+            this.tournamentSize = null;
+            this.tournamentFormat = null;
+        }
+        if (itemId in TOURNAMENT_SIZES) {
+            this.tournamentSize = TOURNAMENT_SIZES[itemId];
+        }
+        if (TOURNAMENT_FORMATS.includes(itemId)) {
+            this.tournamentFormat = itemId;
             this.ws.send(
             JSON.stringify({
                 action: "menu_selection",
                 selection: "play_tournament",
                 userProfile: this.userProfile,
+                tournament_size: this.tournamentSize,
+                tournament_format: this.tournamentFormat,
             })
             );
-            this.updateSearchStatus("ACHTUNG!!! 2 von 4 Spielern gefunden...");
+            this.updateSearchStatus(`Warte auf ${this.tournamentSize} Spieler...`);
             // console.log("ACHTUNG!!! Tournament started");
             // Log all player details
             // console.log("Tournament started with players:", this.userProfile);
@@ -515,7 +539,10 @@ export class MenuDisplay {
               player1: data.player1,
               player2: data.player2,
               playerRole: data.playerRole,
+              seatToken: data.seatToken,
+              tournamentToken: data.tournamentToken,
               game_id: data.game_id,
+              game_url: data.game_url,
               settings: {
                 ...data.settings,
                 mode: "online",
@@ -556,7 +583,9 @@ export class MenuDisplay {
               player1: data.player1,
               player2: data.player2,
               playerRole: data.playerRole,
+              seatToken: data.seatToken,
               game_id: data.game_id,
+              game_url: data.game_url,
               settings: data.settings,
               userProfile: this.userProfile,
             });
@@ -584,10 +613,17 @@ export class MenuDisplay {
           case "exit_game":
             console.log("Exiting game...");
             break;
+          case "menu_session":
+            sessionStorage.setItem("gameSessionToken", data.session_token);
+            break;
           case "tournament_ready":
             console.log("YES!!!Tournament is ready to start!");
+            if (data.tournamentToken) {
+              sessionStorage.setItem("tournamentToken", data.tournamentToken);
+            }
             showTemplate("tournament", {
               userProfile: this.userProfile,
+              tournament_id: data.tournament_id,
               players: data.players,
               round: data.round,
               total_rounds: data.total_rounds,
@@ -607,7 +643,8 @@ export class MenuDisplay {
                 data.total_rounds,
                 data.matchups,
                 data.players,
-                tournament_winner
+                tournament_winner,
+                data.standings
               );
             }
             break;
@@ -1,5 +1,6 @@
 import { ThreeJSManager } from "./3dmanager.js";
 import { getGlobalAudioManager } from './audioManger.js';
+import { GAME_PROTOCOL, applyKeyframe, applyStateFrame } from './protocol.js';
 
 export class GameScreen {
   constructor(gameData, onBackToMenu) {
@@ -15,10 +16,17 @@ export class GameScreen {
           ball: [0, 0]
       };
       this.playerRole = gameData.playerRole;
+      // Vom Server vergebenes Token für diese Rolle (Online/Turnier), der Server leitet die Rolle daraus ab
+      this.seatToken = gameData.seatToken;
+      // Turnierplatz-Token: nur damit zählt die Ergebnismeldung am Ende des Matches
+      this.tournamentToken = gameData.tournamentToken;
       this.onBackToMenu = onBackToMenu;
       this.gameId = gameData.game_id;
+      // Basis-URL des Game-Workers, der dieses Spiel hostet (leer = gleicher Host wie die Seite)
+      this.gameUrl = gameData.game_url || "";
 
       this.ws = null;
+      this.isReady = false; // nach einem Reconnect wird "player_ready" erneut gesendet
       this.keyState = {};
       this.scoreBoard = null;
       // Setze den Spielmodus basierend auf der Spielerrolle und den Spielernamen
@@ -70,10 +78,17 @@ export class GameScreen {
       const wsHost = window.location.hostname;
       const wsPort = wsProtocol === "ws://" ? ":8001" : ""; // Port nur für ws:// setzen
   
-      const wsUrl = `${wsProtocol}${wsHost}${wsPort}/ws/game/${this.gameId}`;
+      // Relative Worker-URLs ("/game-2") laufen über den Reverse Proxy der Seite
+      const wsBase = this.gameUrl.startsWith("/")
+        ? `${wsProtocol}${window.location.host}${this.gameUrl}`
+        : this.gameUrl || `${wsProtocol}${wsHost}${wsPort}`;
+      const seat = this.seatToken ? `&seat=${encodeURIComponent(this.seatToken)}` : "";
+      const wsUrl = `${wsBase}/ws/game/${this.gameId}?protocol=${GAME_PROTOCOL}${seat}`;
       // console.log("Versuche WebSocket-Verbindung zu:", wsUrl);
   
-      this.ws = new WebSocket(wsUrl);
+      const socket = new WebSocket(wsUrl);
+      this.ws = socket;
+      this.ws.binaryType = "arraybuffer";
   
       this.ws.onopen = () => {
         // console.log("🎯 Settings werden mitgeschickt:", this.settings);
@@ -90,10 +105,43 @@ export class GameScreen {
             })
           );
         }
+        if (this.isReady) {
+          // Wiederverbunden (z.B. nach Neustart des Game-Servers): Spiel wird fortgesetzt
+          this.ws.send(
+            JSON.stringify({ action: "player_ready", player_role: this.playerRole })
+          );
+        }
+      };
+
+      this.ws.onclose = () => {
+        // Unerwartet getrennt und Spiel noch offen: neu verbinden, der Server stellt das Spiel wieder her
+        if (this.ws !== socket || this.gameState?.winner) return;
+        setTimeout(() => {
+          if (this.ws === socket) this.setupWebSocket();
+        }, 1000);
       };
   
       this.ws.onmessage = (event) => {
-        this.gameState = JSON.parse(event.data);
+        if (event.data instanceof ArrayBuffer) {
+          // Binär-Frame: nur die geänderten Felder werden übernommen
+          if (!this.gameState.paddleHeight) return; // noch kein Keyframe erhalten
+          applyStateFrame(this.gameState, event.data);
+        } else {
+          const message = JSON.parse(event.data);
+          if (message.type === "keyframe") {
+            applyKeyframe(this.gameState, message);
+            return;
+          }
+          if (message.action === "redirect") {
+            // Spiel läuft auf einem anderen Game-Worker: dort neu verbinden
+            this.gameUrl = message.game_url;
+            this.ws.onclose = null;
+            this.ws.close();
+            this.setupWebSocket();
+            return;
+          }
+          this.gameState = message; // JSON-Protokoll (Fallback)
+        }
         this.updateScoreBoard();
         this.threeJSManager.updatePositions(this.gameState);
         this.threeJSManager.render();
@@ -126,17 +174,26 @@ export class GameScreen {
         if (this.playerRole === "both") {
           if (this.keyState.hasOwnProperty(e.key)) {
             e.preventDefault();
-            this.keyState[e.key] = true;
+            if (!this.keyState[e.key]) {
+              this.keyState[e.key] = true;
+              this.sendKeyState();
+            }
           }
         } else if (this.playerRole === "player1") {
           if (e.key === "a" || e.key === "d") {
             e.preventDefault();
-            this.keyState[e.key] = true;
+            if (!this.keyState[e.key]) {
+              this.keyState[e.key] = true;
+              this.sendKeyState();
+            }
           }
         } else if (this.playerRole === "player2") {
           if (e.key === "ArrowLeft" || e.key === "ArrowRight") {
             e.preventDefault();
-            this.keyState[e.key] = true;
+            if (!this.keyState[e.key]) {
+              this.keyState[e.key] = true;
+              this.sendKeyState();
+            }
           }
         }
       };
@@ -149,7 +206,10 @@ export class GameScreen {
     
         if (this.keyState.hasOwnProperty(e.key)) {
           e.preventDefault();
-          this.keyState[e.key] = false;
+          if (this.keyState[e.key]) {
+            this.keyState[e.key] = false;
+            this.sendKeyState();
+          }
         }
       };
     
@@ -157,15 +217,24 @@ export class GameScreen {
       document.addEventListener("keydown", this.keydownHandler);
       document.addEventListener("keyup", this.keyupHandler);
     
-      this.controlInterval = setInterval(() => {
-        if (Object.values(this.keyState).some(key => key)) {
-          console.log(`Sending key update (${this.gameMode}):`, this.keyState);
-          this.ws.send(JSON.stringify({
-            action: 'key_update',
-            keys: this.keyState
-          }));
-        }
-      }, 16); // ~60 FPS
+      // Eingaben werden nur bei Änderung mit fortlaufender seq gesendet; der Server
+      // wendet den gehaltenen Zustand pro Tick an und bestätigt die seq im Spielzustand
+      // (input_seq). Eine lokale Vorhersage gibt es noch nicht, angezeigt wird der Serverstand.
+      this.inputSeq = 0;
+    }
+
+    sendKeyState() {
+      if (!this.ws || this.ws.readyState !== WebSocket.OPEN) {
+        return;
+      }
+      this.inputSeq += 1;
+      const keys = { ...this.keyState };
+      this.ws.send(JSON.stringify({
+        action: 'key_update',
+        seq: this.inputSeq,
+        player_role: this.playerRole,
+        keys: keys
+      }));
     }
 
         // this.keydownHandler = (e) => {
@@ -309,6 +378,7 @@ export class GameScreen {
                 })
               );
               console.log("Ready state sent for role:", this.playerRole);
+              this.isReady = true;
     
               // Deaktiviere den Button und ändere den Text
               readyButton.disabled = true;
@@ -443,6 +513,7 @@ export class GameScreen {
         // Baue die Tournament-Daten
         const tournamentData = {
           userProfile: this.userProfile,
+          tournament_id: this.settings?.tournament_id,
           round: this.settings?.tournament_round || 1,
           total_rounds: this.settings?.tournament_totalRounds || 1,
           players: this.settings?.tournament_players || [],
@@ -462,7 +533,11 @@ export class GameScreen {
         if (this.settings?.is_tournament && winnerName) {
           const message = {
             action: "tournament_result",
+            tournament_id: this.settings?.tournament_id,
+            tournament_match_id: this.settings?.tournament_match_id,
+            tournament_token: this.tournamentToken,
             winner: winnerName,
+            winner_role: this.gameState?.winner?.role,
           };
       
           const wsProtocol = window.location.protocol === "https:" ? "wss://" : "ws://";
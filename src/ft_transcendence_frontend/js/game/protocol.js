@@ -0,0 +1,80 @@
+// Binäres Spielzustands-Protokoll (siehe game/protocol.py im Game-Service)
+// Header: u8 frameType | u32 seq | u16 fieldMask, danach nur die gesetzten Felder.
+
+const FIELD_BALL = 1 << 0;
+const FIELD_BALL_DIRECTION = 1 << 1;
+const FIELD_BALL_SPEED = 1 << 2;
+const FIELD_PADDLE1 = 1 << 3;
+const FIELD_PADDLE2 = 1 << 4;
+const FIELD_SCORES = 1 << 5;
+const FIELD_FLAGS = 1 << 6;
+const FIELD_INPUT_SEQ = 1 << 7;
+
+const FLAG_GAME_ACTIVE = 1 << 0;
+
+export const GAME_PROTOCOL = "binary";
+
+function paddle(center, height) {
+  return { top: center - height / 2, bottom: center + height / 2, center: center };
+}
+
+// Übernimmt die statischen Felder eines Keyframes in den Spielzustand
+export function applyKeyframe(gameState, keyframe) {
+  gameState.player1 = { ...(gameState.player1 || {}), name: keyframe.player1.name };
+  gameState.player2 = { ...(gameState.player2 || {}), name: keyframe.player2.name };
+  gameState.paddleHeight = keyframe.paddle_height;
+  if (keyframe.winner) {
+    gameState.winner = keyframe.winner;
+  }
+  return gameState;
+}
+
+// Wendet einen Binär-Frame (Delta oder Vollbild) auf den Spielzustand an
+export function applyStateFrame(gameState, buffer) {
+  const view = new DataView(buffer);
+  let offset = 0;
+  offset += 1; // frameType: Delta und Vollbild werden gleich angewendet
+  gameState.seq = view.getUint32(offset, true);
+  offset += 4;
+  const mask = view.getUint16(offset, true);
+  offset += 2;
+
+  const height = gameState.paddleHeight || 0;
+  if (mask & FIELD_BALL) {
+    gameState.ball = [view.getFloat32(offset, true), view.getFloat32(offset + 4, true)];
+    offset += 8;
+  }
+  if (mask & FIELD_BALL_DIRECTION) {
+    gameState.ball_direction = [view.getFloat32(offset, true), view.getFloat32(offset + 4, true)];
+    offset += 8;
+  }
+  if (mask & FIELD_BALL_SPEED) {
+    gameState.ball_speed = view.getFloat32(offset, true);
+    offset += 4;
+  }
+  if (mask & FIELD_PADDLE1) {
+    gameState.player1.paddle = paddle(view.getFloat32(offset, true), height);
+    offset += 4;
+  }
+  if (mask & FIELD_PADDLE2) {
+    gameState.player2.paddle = paddle(view.getFloat32(offset, true), height);
+    offset += 4;
+  }
+  if (mask & FIELD_SCORES) {
+    gameState.player1.score = view.getUint16(offset, true);
+    gameState.player2.score = view.getUint16(offset + 2, true);
+    offset += 4;
+  }
+  if (mask & FIELD_FLAGS) {
+    gameState.game_active = (view.getUint8(offset) & FLAG_GAME_ACTIVE) !== 0;
+    offset += 1;
+  }
+  if (mask & FIELD_INPUT_SEQ) {
+    gameState.input_seq = {
+      player1: view.getUint32(offset, true),
+      player2: view.getUint32(offset + 4, true),
+    };
+    offset += 8;
+  }
+  return gameState;
+}
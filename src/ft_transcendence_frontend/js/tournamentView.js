@@ -59,6 +59,7 @@ export class TournamentView {
                       if (msg.players) {
                           this.data.players = msg.players;
                       }
+                      this.data.standings = msg.standings || null;
                        // Wichtig: Gewinner aktualisieren, falls gesendet
                       this.data.tournament_winner = msg.winner || this.data.tournament_winner || null;
                       // console.log("   -> Updated this.data.tournament_winner to:", this.data.tournament_winner);
@@ -207,6 +208,16 @@ export class TournamentView {
           });
       }
 
+      // Tabelle für Swiss/Rundenturnier (Siege, Buchholz)
+      const standings = this.data.standings || null;
+      let standingsHTML = "";
+      if (standings && standings.length > 0) {
+          standingsHTML = `<h5 class="text-center fw-bold mt-3 mb-2">Standings</h5>
+            <table class="table table-sm text-center"><thead><tr><th>#</th><th>Player</th><th>Wins</th><th>Buchholz</th></tr></thead><tbody>
+            ${standings.map((row, index) => `<tr><td>${index + 1}</td><td>${row.name}</td><td>${row.wins}</td><td>${row.buchholz}</td></tr>`).join("")}
+            </tbody></table>`;
+      }
+
       // Logik zur Bestimmung des richtigen Aktionsbuttons
       let buttonHTML = "";
       if (isTournamentOver && playerName === currentWinner) {
@@ -239,6 +250,7 @@ export class TournamentView {
           <div class="card-body profile-card">
             <h5 class="text-center mb-3">Player Status</h5>
             <ul class="list-group list-group-flush mb-4">${playerListHTML}</ul>
+            ${standingsHTML}
             ${matchupsHTML}
             <div class="d-grid gap-2 col-lg-6 col-md-8 mx-auto mt-4">
               ${buttonHTML}
@@ -388,7 +400,7 @@ export class TournamentView {
        const wsPort = window.location.protocol === "https:" ? "" : ":8001";
        const wsUrl = `${wsProtocol}${wsHost}${wsPort}/ws/menu`;
        const tempSocket = new WebSocket(wsUrl);
-       tempSocket.onopen = () => { tempSocket.send(JSON.stringify({ action: "start_tournament_now" })); setTimeout(()=>tempSocket.close(), 500);};
+       tempSocket.onopen = () => { tempSocket.send(JSON.stringify({ action: "start_tournament_now", tournament_id: this.data.tournament_id })); setTimeout(()=>tempSocket.close(), 500);};
        tempSocket.onerror = (e) => console.error("Error sending start signal:", e);
   }
 
@@ -406,12 +418,12 @@ export class TournamentView {
        const wsPort = window.location.protocol === "https:" ? "" : ":8001";
        const wsUrl = `${wsProtocol}${wsHost}${wsPort}/ws/menu`;
        const tempSocket = new WebSocket(wsUrl);
-       tempSocket.onopen = () => { tempSocket.send(JSON.stringify({ action: "start_next_round" })); setTimeout(()=>tempSocket.close(), 500); };
+       tempSocket.onopen = () => { tempSocket.send(JSON.stringify({ action: "start_next_round", tournament_id: this.data.tournament_id })); setTimeout(()=>tempSocket.close(), 500); };
        tempSocket.onerror = (e) => console.error("Error sending next round signal:", e);
   }
 
   // --- Methode zum Aktualisieren des Zustands von außen (falls noch genutzt) ---
-  updateResults(results, round, totalRounds, matchups, players, tournament_winner) {
+  updateResults(results, round, totalRounds, matchups, players, tournament_winner, standings) {
       // console.log("📊 External updateResults called:", { results, round, totalRounds, /*matchups, players,*/ tournament_winner });
       this.data.results = results || {};
       this.data.round = round;
@@ -419,6 +431,7 @@ export class TournamentView {
       this.data.matchups = matchups || [];
       if (players) this.data.players = players;
       if (tournament_winner !== undefined) this.data.tournament_winner = tournament_winner;
+      if (standings !== undefined) this.data.standings = standings;
       this.renderTournamentGrid(); // Neu rendern
   }
 
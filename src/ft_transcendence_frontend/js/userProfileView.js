@@ -173,7 +173,7 @@ export class UserProfileView {
 			const accessToken = localStorage.getItem('accessToken');
 			
 			// Hole die Spielstatistiken direkt mit dem Benutzernamen
-			const statsResponse = await fetch(`/api/gamestats/username/${username}/`, {
+			const statsResponse = await fetch(`/api/gamestats/username/${username}/?limit=5`, {
 				method: 'GET',
 				headers: {
 					'Content-Type': 'application/json',
@@ -185,11 +185,12 @@ export class UserProfileView {
 				throw new Error('Fehler beim Abrufen der Spielstatistiken');
 			}
 			
+			// Seitenweise Antwort {next, results}; angezeigt werden nur die letzten 5 Spiele
 			const matchData = await statsResponse.json();
 			// console.log('Match-Historie für Benutzer:', matchData);
 			
 			// Zeige die Match-Historie an
-			this.displayMatchHistory(matchData, username);
+			this.displayMatchHistory(matchData.results, username);
 		} catch (error) {
 			console.error('Fehler beim Laden der Match-Historie:', error);
 			// Zeige eine leere Match-Historie an
@@ -2,56 +2,63 @@ import matplotlib.pyplot as plt
 import matplotlib.patches as patches
 from matplotlib.widgets import Slider, Button
 import matplotlib.animation as animation
-import ast
-import datetime
+import glob
+import os
+import sys
 from matplotlib.lines import Line2D
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "ft_transcendence_backend", "game"))
+from replay_recorder import read_replay
+
 BALL_RADIUS = 0.02  # Radius des Balls
 
-def parse_log_file(log_filename):
+def load_replay_states(path):
     """
-    Liest die Log-Datei und extrahiert alle Zeilen, die einen Spielzustand ("Game State:")
-    enthalten. Der Zustand wird als Dictionary geparst und mit einem Zeitstempel versehen.
+    Liest eine Replay-Datei des ReplayRecorders und wandelt jeden Tick-Record
+    in das Zustands-Dict um, das die Animation erwartet.
     """
+    replay = read_replay(path)
+    half = replay["paddle_height"] / 2
     states = []
-    with open(log_filename, "r") as f:
-        for line in f:
-            if "Game State:" in line:
-                try:
-                    # Extrahiere den Teil nach "Game State:" und entferne Leerzeichen
-                    state_str = line.split("Game State:", 1)[1].strip()
-                    state = ast.literal_eval(state_str)
-
-                    # Extrahiere den Zeitstempel (Format: "YYYY-MM-DD HH:MM:SS,ms")
-                    timestamp_str = line.split(" - ")[0].strip()
-                    timestamp = datetime.datetime.strptime(timestamp_str, "%Y-%m-%d %H:%M:%S,%f")
-                    state["timestamp"] = timestamp
-                    states.append(state)
-                except Exception as e:
-                    print(f"Fehler beim Parsen der Zeile:\n{line}\n{e}")
+    for record in replay["records"]:
+        states.append({
+            "ball": record["ball"],
+            "player1": {
+                "paddle": {"top": record["paddle1"] - half, "bottom": record["paddle1"] + half},
+                "score": record["score1"],
+                "name": replay["player1"],
+            },
+            "player2": {
+                "paddle": {"top": record["paddle2"] - half, "bottom": record["paddle2"] + half},
+                "score": record["score2"],
+                "name": replay["player2"],
+            },
+        })
     return states
 
-# Log-Datei einlesen und Zustände extrahieren
-states = parse_log_file("game.log")
+# Replay-Dateien einlesen: Argumente oder alle Dateien im Replay-Verzeichnis (GAME_REPLAY_DIR)
+replay_files = sys.argv[1:] or sorted(
+    glob.glob(os.path.join(os.environ.get("GAME_REPLAY_DIR", "replays"), "*.replay")),
+    key=os.path.getmtime
+)
+
+# Jede Datei ist ein Spiel: Startindizes ergeben sich aus den Dateigrenzen
+states = []
+game_start_indices = []
+for replay_file in replay_files:
+    try:
+        game_states = load_replay_states(replay_file)
+    except (OSError, ValueError) as e:
+        print(f"Fehler beim Lesen von {replay_file}: {e}")
+        continue
+    if game_states:
+        game_start_indices.append(len(states))
+        states.extend(game_states)
+
 if not states:
-    print("Keine 'Game State'-Einträge im Log gefunden.")
+    print("Keine Replay-Daten gefunden.")
     exit(1)
 
-# Sortiere die Zustände nach Zeitstempel
-states.sort(key=lambda s: s["timestamp"])
-
-# Erstelle Liste der Spielstart-Indizes:
-# Wir nehmen an, dass ein neues Spiel beginnt, wenn beide Spieler wieder 0 Punkte haben,
-# nachdem in der vorherigen Zeile schon Punkte vorhanden waren.
-game_start_indices = [0]  # erster Zustand ist immer Spielstart
-for i in range(1, len(states)):
-    prev = states[i-1]
-    curr = states[i]
-    prev_score = prev["player1"]["score"] + prev["player2"]["score"]
-    curr_score = curr["player1"]["score"] + curr["player2"]["score"]
-    if prev_score > 0 and curr_score == 0:
-        game_start_indices.append(i)
-
 print("Spielstart-Indizes:", game_start_indices)
 
 # --- Plot und grafische Elemente erstellen ---
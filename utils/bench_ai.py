@@ -0,0 +1,48 @@
+"""
+Misst die Kosten der AI pro Tick: direkte Vorhersage aus den PongGame-Feldern
+gegenüber dem Aufbau eines get_game_state()-Dicts, den der alte Pfad pro Tick brauchte.
+
+Aufruf: python utils/bench_ai.py [ticks]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "ft_transcendence_backend", "game"))
+
+from models.game import PongGame
+from models.player import Player, PlayerType, Controls
+from models.ai_player import AI
+
+
+def make_game():
+    player1 = Player(id="p1", name="a", player_type=PlayerType.HUMAN, controls=Controls.WASD)
+    player2 = Player(id="p2", name="AI Bot", player_type=PlayerType.AI, controls=Controls.ARROWS)
+    game = PongGame({"winning_score": 1000}, player1, player2)
+    game.start_game()
+    return game
+
+
+def bench(label, func, ticks, cooldown=1.0):
+    game = make_game()
+    ai = AI("impossible")
+    ai.decision_cooldown = cooldown
+    start = time.perf_counter()
+    for _ in range(ticks):
+        func(ai, game)
+        game.update_game_state()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed / ticks * 1e6:8.2f} µs/tick")
+
+
+def main():
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    bench("nur Physik", lambda ai, game: None, ticks)
+    bench("get_game_state() (alt)", lambda ai, game: game.get_game_state(), ticks)
+    bench("AI.decide(game)", lambda ai, game: ai.decide(game), ticks)
+    # Cooldown 0: jeder Tick ist eine neue Entscheidung (schlechtester Fall)
+    bench("AI.decide(game), Cooldown 0", lambda ai, game: ai.decide(game), ticks, cooldown=0.0)
+
+
+if __name__ == "__main__":
+    main()
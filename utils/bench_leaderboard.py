@@ -0,0 +1,92 @@
+"""
+Rangliste mit 1M synthetischen Usern: Redis Sorted Set (wie users/leaderboard.py)
+gegen den alten Weg in get_current_user_stats (alle ids nach Score laden, dann .index()).
+
+Gemessen werden Aufbau (Pipeline in Batches wie rebuild_leaderboard), Rang eines Users,
+Top-10 und das Fenster um einen User. Ohne erreichbares Redis (REDIS_HOST/REDIS_PORT)
+läuft der Benchmark gegen fakeredis; das ist deutlich langsamer als ein echter Server,
+das Wachstum (O(log n) gegen O(n)) ist aber dasselbe.
+
+Aufruf: python utils/bench_leaderboard.py [user] [abfragen]
+"""
+import os
+import random
+import sys
+import time
+
+import redis
+
+SCORES_KEY = "bench:leaderboard:score"
+NAMES_KEY = "bench:leaderboard:names"
+BATCH = 10_000
+
+
+def connect():
+    client = redis.StrictRedis(host=os.environ.get("REDIS_HOST", "localhost"),
+                               port=int(os.environ.get("REDIS_PORT", 6379)), decode_responses=True)
+    try:
+        client.ping()
+        return client, "redis"
+    except redis.RedisError:
+        import fakeredis
+        return fakeredis.FakeStrictRedis(decode_responses=True), "fakeredis"
+
+
+def percentile(values, p):
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def timed(label, func, probes):
+    durations = []
+    for probe in probes:
+        start = time.perf_counter()
+        func(probe)
+        durations.append(time.perf_counter() - start)
+    durations.sort()
+    print(f"  {label:<28} p50 {percentile(durations, 0.5) * 1e6:9.1f} µs  "
+          f"p99 {percentile(durations, 0.99) * 1e6:9.1f} µs")
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000
+    rng = random.Random(1)
+    scores = [int(rng.expovariate(1 / 500)) for _ in range(users)]
+    client, backend = connect()
+    client.delete(SCORES_KEY, NAMES_KEY)
+
+    start = time.perf_counter()
+    for first in range(0, users, BATCH):
+        pipe = client.pipeline(transaction=False)
+        pipe.zadd(SCORES_KEY, {pk: scores[pk] for pk in range(first, min(users, first + BATCH))})
+        pipe.hset(NAMES_KEY, mapping={pk: f"user{pk}" for pk in range(first, min(users, first + BATCH))})
+        pipe.execute()
+    print(f"{users} User, Backend {backend}: Aufbau in {time.perf_counter() - start:.2f}s")
+
+    probes = [rng.randrange(users) for _ in range(queries)]
+
+    def rank(pk):
+        return client.zrevrank(SCORES_KEY, pk)
+
+    def top10(_):
+        members = client.zrevrange(SCORES_KEY, 0, 9, withscores=True)
+        return client.hmget(NAMES_KEY, [member for member, _ in members])
+
+    def around(pk):
+        position = client.zrevrank(SCORES_KEY, pk)
+        members = client.zrevrange(SCORES_KEY, max(0, position - 5), position + 5, withscores=True)
+        return client.hmget(NAMES_KEY, [member for member, _ in members])
+
+    timed("ZREVRANK (Rang)", rank, probes)
+    timed("Top 10", top10, probes)
+    timed("Fenster +-5 um den User", around, probes)
+
+    # Alter Weg: ORDER BY score liefert alle ids (hier schon sortiert vorgegeben), dann .index()
+    ordered_ids = sorted(range(users), key=lambda pk: -scores[pk])
+    timed("alt: list(ids).index()", lambda pk: list(ordered_ids).index(pk), probes[:max(1, queries // 20)])
+
+    client.delete(SCORES_KEY, NAMES_KEY)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Time-to-match des Online-Matchmakings: Spieler treten mit fester Rate bei,
+gemessen wird die Zeit vom Beitritt bis zum "game_found" (p50/p99/max).
+Ein Teil der Spieler bricht die Suche wieder ab. Ratings sind normalverteilt,
+zusätzlich wird die Rating-Differenz der Paarungen und die Suchzeit im vollen Pool gemessen.
+
+Aufruf: python utils/bench_matchmaking.py [spieler] [beitritte_pro_sekunde]
+"""
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "ft_transcendence_backend", "game"))
+
+from matchmaker import Matchmaker, Ticket
+
+CANCEL_EVERY = 10  # jeder zehnte Spieler bricht ab
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.joined_at = None
+        self.matched_at = None
+
+
+def percentile(values, p):
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+async def run(players, rate):
+    latencies = []      # Beitritt -> gepaart, je Spieler
+    pairing_delays = []  # Beitritt des zweiten Spielers -> gepaart
+    rating_gaps = []
+    rng = random.Random(1)
+
+    async def on_match(ticket1, ticket2):
+        now = time.perf_counter()
+        for ticket in (ticket1, ticket2):
+            latencies.append(now - ticket.websocket.joined_at)
+        pairing_delays.append(now - max(ticket1.websocket.joined_at, ticket2.websocket.joined_at))
+        rating_gaps.append(abs(ticket1.rating - ticket2.rating))
+
+    matchmaker = Matchmaker(on_match)
+    interval = 1 / rate
+    start = time.perf_counter()
+    for i in range(players):
+        # Beitritte gleichmäßig verteilen
+        delay = start + i * interval - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        websocket = FakeWebSocket()
+        websocket.joined_at = time.perf_counter()
+        matchmaker.enqueue(websocket, f"p{i}", rating=rng.gauss(1000, 200))
+        if i % CANCEL_EVERY == CANCEL_EVERY - 1:
+            matchmaker.cancel(websocket)
+        await asyncio.sleep(0)
+    await asyncio.sleep(1.5)  # Nachzügler über das wachsende Fenster paaren lassen
+    elapsed = time.perf_counter() - start
+    matchmaker.stop()
+
+    print(f"{players} Spieler mit {rate}/s in {elapsed:.2f}s, {len(latencies)} gepaart, "
+          f"{len(matchmaker)} wartend")
+    for label, values in (("time-to-match", latencies), ("Paarungsverzögerung", pairing_delays)):
+        values.sort()
+        print(f"  {label:<20} p50 {percentile(values, 0.5) * 1e3:.3f} ms  "
+              f"p99 {percentile(values, 0.99) * 1e3:.3f} ms  max {values[-1] * 1e3:.3f} ms")
+    rating_gaps.sort()
+    print(f"  Rating-Differenz     p50 {percentile(rating_gaps, 0.5):.1f}  "
+          f"p99 {percentile(rating_gaps, 0.99):.1f}  max {rating_gaps[-1]:.1f}")
+    print(f"  (mittlerer Abstand zwischen Beitritten: {interval * 1e3:.3f} ms; "
+          f"die alte 1-s-Schleife wartete im Mittel zusätzlich ~500 ms)")
+
+
+def bench_lookup(pool_size, lookups=100_000):
+    """Gegnersuche in einem Pool mit vielen wartenden Spielern (ohne Paarung)"""
+    rng = random.Random(2)
+    matchmaker = Matchmaker(None)
+    for i in range(pool_size):
+        matchmaker.insert(Ticket(i, f"p{i}", rng.gauss(1000, 200), 0.0))
+    probes = [Ticket(None, "probe", rng.gauss(1000, 200), 0.0) for _ in range(1000)]
+    start = time.perf_counter()
+    for i in range(lookups):
+        matchmaker.find_opponent(probes[i % len(probes)], 0.0)
+    elapsed = time.perf_counter() - start
+    print(f"  Gegnersuche bei {pool_size:>7} Wartenden: {elapsed / lookups * 1e6:.2f} µs")
+
+
+def main():
+    players = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    rate = int(sys.argv[2]) if len(sys.argv) > 2 else 5_000
+    asyncio.run(run(players, rate))
+    for pool_size in (1_000, 10_000, 100_000):
+        bench_lookup(pool_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Vergleicht skalare und vektorisierte (NumPy) Physik: Zeit pro Tick und Spiele pro Kern bei 60 Hz.
+
+Aufruf: python utils/bench_physics.py [spiele] [ticks]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "ft_transcendence_backend", "game"))
+
+from models.game import PongGame
+from models.player import Player, PlayerType, Controls
+from batch_physics import BatchPhysicsEngine
+
+TICK_RATE = 60
+
+
+def make_games(count):
+    games = []
+    for i in range(count):
+        player1 = Player(id="p1", name=f"a{i}", player_type=PlayerType.HUMAN, controls=Controls.WASD)
+        player2 = Player(id="p2", name=f"b{i}", player_type=PlayerType.HUMAN, controls=Controls.ARROWS)
+        game = PongGame({"winning_score": 20}, player1, player2)
+        game.start_game()
+        games.append(game)
+    return games
+
+
+def scalar_step(games):
+    for game in games:
+        game.update_game_state()
+
+
+def bench(engine, count, ticks):
+    games = make_games(count)
+    if engine:
+        # Die Arrays bleiben über alle Ticks bestehen, nur Start/Punkte werden abgeglichen
+        for game in games:
+            engine.add(game)
+        step = lambda games: engine.step()
+    else:
+        step = scalar_step
+    start = time.perf_counter()
+    for _ in range(ticks):
+        step(games)
+        # beendete Spiele neu starten, damit die Last konstant bleibt
+        for game in games:
+            if not game.game_active:
+                game.player1.score = game.player2.score = 0
+                game.winner = None
+                game.start_game()
+    return (time.perf_counter() - start) / ticks
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    ticks = int(sys.argv[2]) if len(sys.argv) > 2 else 600
+
+    print(f"{count} Spiele, {ticks} Ticks")
+    for name, engine in (("scalar", None), ("batch", BatchPhysicsEngine())):
+        per_tick = bench(engine, count, ticks)
+        games_per_core = count / (per_tick * TICK_RATE)
+        print(f"{name:>6}: {per_tick * 1e3:7.3f} ms/Tick, {per_tick / count * 1e6:6.2f} µs/Spiel, "
+              f"~{games_per_core:,.0f} Spiele pro Kern bei {TICK_RATE} Hz (nur Physik)")
+
+
+if __name__ == "__main__":
+    main()
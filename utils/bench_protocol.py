@@ -0,0 +1,73 @@
+"""
+Vergleicht JSON- und Binär-Protokoll für /ws/game: Bytes pro Sekunde und CPU pro Tick.
+
+Aufruf: python utils/bench_protocol.py [ticks]
+"""
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "ft_transcendence_backend", "game"))
+
+from models.game import PongGame
+from models.player import Player, PlayerType, Controls
+from protocol import StateEncoder
+
+TICK_RATE = 60
+
+
+def make_game():
+    player1 = Player(id="p1", name="Player 1", player_type=PlayerType.HUMAN, controls=Controls.WASD)
+    player2 = Player(id="p2", name="Player 2", player_type=PlayerType.HUMAN, controls=Controls.ARROWS)
+    game = PongGame({"winning_score": 1000}, player1, player2)
+    game.start_game()
+    return game
+
+
+def record_states(ticks):
+    game = make_game()
+    states = []
+    for i in range(ticks):
+        # ein bisschen Paddle-Bewegung, damit nicht nur der Ball wechselt
+        if i % 3 == 0:
+            game.move_paddle(game.player1, 1 if (i // 90) % 2 else -1)
+        states.append(game.update_game_state())
+    return states
+
+
+def bench_json(states):
+    total = 0
+    start = time.perf_counter()
+    for state in states:
+        total += len(json.dumps(state).encode("utf-8"))
+    return total, time.perf_counter() - start
+
+
+def bench_binary(states):
+    encoder = StateEncoder()
+    total = 0
+    start = time.perf_counter()
+    for state in states:
+        keyframe, delta, _full = encoder.encode(state)
+        total += len(delta)
+        if keyframe:
+            total += len(keyframe.encode("utf-8"))
+    return total, time.perf_counter() - start
+
+
+def main():
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 36000
+    # Zustände vorab erzeugen, damit nur die Kodierung gemessen wird
+    states = [json.loads(json.dumps(s)) for s in record_states(ticks)]
+    seconds = ticks / TICK_RATE
+
+    print(f"{ticks} Ticks ({seconds:.0f} s Spielzeit bei {TICK_RATE} Hz)")
+    for name, bench in (("json", bench_json), ("binary", bench_binary)):
+        total, elapsed = bench(states)
+        print(f"{name:>6}: {total / seconds / 1024:8.2f} KiB/s pro Client, "
+              f"{total / ticks:6.1f} B/Tick, {elapsed / ticks * 1e6:6.2f} µs CPU/Tick")
+
+
+if __name__ == "__main__":
+    main()